@@ -0,0 +1,156 @@
+"""Compare WSGI and ASGI under many concurrent clients.
+
+    python -m benchmarks.bench_asgi_concurrency --clients 1000 --threads 32
+
+Every client sends --requests-per-client requests to the book list, book
+detail and borrowings list endpoints one after another. Under WSGI the
+clients share a pool of --threads worker threads, like a threaded WSGI
+server, and wait for a free thread. Under ASGI they all run on one event
+loop, once with the sync views and once with their async variants
+(ASYNC_VIEWS). Latency includes the time spent waiting, throughput is for
+the whole process. Every server runs in a fresh process.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.load import ASGIDriver, WSGIDriver, get_scenarios
+from benchmarks.utils import percentile, print_table, setup_django, test_database
+
+SCENARIOS = ["books list", "book detail", "borrowings list"]
+SERVERS = {
+    "wsgi": {"DJANGO_ASYNC_VIEWS": "false"},
+    "asgi, sync views": {"DJANGO_ASYNC_VIEWS": "false"},
+    "asgi, async views": {"DJANGO_ASYNC_VIEWS": "true"},
+}
+
+
+def get_requests(seeded, clients: int, requests_per_client: int) -> list[list]:
+    generator = random.Random(0)
+    scenarios = [
+        scenario
+        for scenario in get_scenarios(seeded, generator)
+        if scenario.name in SCENARIOS
+    ]
+    return [
+        [generator.choice(scenarios).make_request() for _ in range(requests_per_client)]
+        for _ in range(clients)
+    ]
+
+
+def summarize(name: str, latencies: list[float], errors: int, seconds: float) -> list:
+    return [
+        name,
+        len(latencies),
+        errors,
+        f"{len(latencies) / seconds:.0f}/s",
+        f"{percentile(latencies, 50):.1f} ms",
+        f"{percentile(latencies, 95):.1f} ms",
+        f"{percentile(latencies, 99):.1f} ms",
+    ]
+
+
+def run_wsgi(name: str, clients: list[list], threads: int) -> list:
+    driver = WSGIDriver()
+    latencies = []
+    errors = 0
+
+    def run_client(requests: list, start: float) -> None:
+        nonlocal errors
+        for request in requests:
+            status, _ = driver.request(
+                request.method, request.path, request.data, request.headers
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += status != 200
+            start = time.perf_counter()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for requests in clients:
+            executor.submit(run_client, requests, start)
+    return summarize(name, latencies, errors, time.perf_counter() - start)
+
+
+def run_asgi(name: str, clients: list[list]) -> list:
+    driver = ASGIDriver()
+    latencies = []
+    errors = 0
+
+    async def run_client(requests: list) -> None:
+        nonlocal errors
+        for request in requests:
+            start = time.perf_counter()
+            status, _ = await driver.send_request(
+                request.method, request.path, request.data, request.headers
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += status != 200
+
+    async def run_clients() -> None:
+        await asyncio.gather(*(run_client(requests) for requests in clients))
+
+    start = time.perf_counter()
+    driver.loop.run_until_complete(run_clients())
+    return summarize(name, latencies, errors, time.perf_counter() - start)
+
+
+def measure(server: str, args: argparse.Namespace) -> list:
+    """Seed the database and run the clients in the worker process,
+    after a few warm-up requests."""
+    from benchmarks.seed import seed
+
+    seeded = seed(args.users, args.books, args.borrowings)
+    clients = get_requests(seeded, args.clients, args.requests_per_client)
+    if server == "wsgi":
+        run_wsgi(server, clients[:10], args.threads)
+        return run_wsgi(f"wsgi, {args.threads} threads", clients, args.threads)
+    run_asgi(server, clients[:10])
+    return run_asgi(server, clients)
+
+
+def run_worker(server: str, argv: list[str]) -> list:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_asgi_concurrency"]
+        + ["--worker", server, *argv],
+        env={**os.environ, **SERVERS[server]},
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests-per-client", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--books", type=int, default=20000)
+    parser.add_argument("--borrowings", type=int, default=100000)
+    parser.add_argument("--worker", choices=SERVERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        setup_django()
+        with test_database():
+            print(json.dumps(measure(args.worker, args)))
+        return
+
+    argv = sys.argv[1:]
+    print_table(
+        ["server", "requests", "errors", "throughput", "p50", "p95", "p99"],
+        [run_worker(server, argv) for server in SERVERS],
+    )
+
+
+if __name__ == "__main__":
+    main()
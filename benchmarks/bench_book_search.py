@@ -0,0 +1,111 @@
+"""Time catalog search against the full-text index and an unindexed scan.
+
+    python -m benchmarks.bench_book_search --books 100000 1000000 --repeat 5
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.utils import median, print_table, setup_django, test_database, timed
+
+BATCH_SIZE = 10_000
+
+
+def get_vocabulary() -> tuple[list[str], list[str]]:
+    from faker import Faker
+
+    Faker.seed(0)
+    fake = Faker()
+    words = fake.words(nb=900, unique=True)
+    names = sorted({fake.last_name() for _ in range(5_000)})
+    return words, names
+
+
+def get_queries(words: list[str], names: list[str]) -> dict[str, str]:
+    first, second, third = [word for word in words if len(word) >= 7][:3]
+    return {
+        "prefix": first[:-2],
+        "two terms": f"{second} {third[:3]}",
+        "author": names[0][:-2],
+        "typo": first[:2] + first[3] + first[2] + first[4:],
+    }
+
+
+def seed_books(count: int, words: list[str], names: list[str]) -> float:
+    from book.models import Book
+
+    generator = random.Random(count)
+    start = time.perf_counter()
+    for offset in range(0, count, BATCH_SIZE):
+        # The base manager skips the per-book cache invalidation.
+        Book._base_manager.bulk_create(
+            Book(
+                title=" ".join(generator.sample(words, generator.randint(2, 5))),
+                author=f"{generator.choice(names)} {generator.choice(names)}",
+                cover=generator.randint(0, 1),
+                inventory=generator.randint(0, 5),
+                daily_fee=generator.randint(10, 300) / 100,
+            )
+            for _ in range(min(BATCH_SIZE, count - offset))
+        )
+    return time.perf_counter() - start
+
+
+def run(books: list[int], repeat: int, page_size: int) -> None:
+    from django.db.models import Q
+
+    from book.models import Book
+    from book.search import get_terms, search_books
+
+    def scan(query: str) -> list:
+        queryset = Book.objects.all()
+        for term in get_terms(query):
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(author__icontains=term)
+            )
+        return list(queryset[:page_size])
+
+    def search(query: str, **filters) -> list:
+        return list(search_books(Book.objects.filter(**filters), query)[:page_size])
+
+    words, names = get_vocabulary()
+    queries = get_queries(words, names)
+    rows = []
+    seeded = 0
+    for count in sorted(books):
+        seed_seconds = seed_books(count - seeded, words, names)
+        seeded = count
+        rows.append([count, "seed (with index)", f"{seed_seconds * 1000:.0f}", "-"])
+
+        for name, query in queries.items():
+            search_ms = median([timed(lambda: search(query)) for _ in range(repeat)])
+            scan_ms = median([timed(lambda: scan(query)) for _ in range(repeat)])
+            rows.append([count, name, f"{search_ms:.1f}", f"{scan_ms:.1f}"])
+
+        filtered_ms = median(
+            [
+                timed(lambda: search(queries["prefix"], inventory__gt=0, cover=0))
+                for _ in range(repeat)
+            ]
+        )
+        rows.append([count, "search + filters", f"{filtered_ms:.1f}", "-"])
+
+    print(", ".join(f"{name}: {query!r}" for name, query in queries.items()))
+    print_table(["books", "query", "search ms", "scan ms"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.books, args.repeat, args.page_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Compare N single borrow/return requests with one bulk request.
+
+    python -m benchmarks.bench_bulk_borrowing --items 10 20 30 --repeat 5
+"""
+
+import argparse
+import datetime
+
+from benchmarks.utils import (
+    count_queries,
+    median,
+    print_table,
+    setup_django,
+    test_database,
+    timed,
+)
+
+
+def run(items: list[int], repeat: int) -> None:
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from book.models import Book
+
+    borrowing_list_url = reverse("borrowing:borrowing-list")
+    bulk_create_url = reverse("borrowing:borrowing-bulk-create")
+    bulk_return_url = reverse("borrowing:borrowing-bulk-return")
+    expected_return_date = datetime.date.today() + datetime.timedelta(days=14)
+
+    user = get_user_model().objects.create_user(email="bench@test.com")
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    def create_books(count: int) -> list[Book]:
+        return Book.objects.bulk_create(
+            Book(
+                title=f"Book {number}",
+                author="Author",
+                cover=Book.CoverChoices.HARD,
+                inventory=5,
+                daily_fee=1,
+            )
+            for number in range(count)
+        )
+
+    def borrow_single(books: list[Book]) -> list[int]:
+        return [
+            client.post(
+                borrowing_list_url,
+                data={"book": book.id, "expected_return_date": expected_return_date},
+                format="json",
+            ).data["id"]
+            for book in books
+        ]
+
+    def borrow_bulk(books: list[Book]) -> list[int]:
+        response = client.post(
+            bulk_create_url,
+            data=[
+                {"book": book.id, "expected_return_date": expected_return_date}
+                for book in books
+            ],
+            format="json",
+        )
+        return [borrowing["id"] for borrowing in response.data]
+
+    def return_single(borrowing_ids: list[int]) -> None:
+        for borrowing_id in borrowing_ids:
+            client.post(reverse("borrowing:borrowing-return", args=[borrowing_id]))
+
+    def return_bulk(borrowing_ids: list[int]) -> None:
+        client.post(bulk_return_url, data={"borrowings": borrowing_ids}, format="json")
+
+    rows = []
+    for count in items:
+        timings = {"borrow": ([], []), "return": ([], [])}
+        for _ in range(repeat):
+            borrowing_ids = []
+            books = create_books(count)
+            timings["borrow"][0].append(
+                timed(lambda: borrowing_ids.extend(borrow_single(books)))
+            )
+            timings["return"][0].append(timed(lambda: return_single(borrowing_ids)))
+
+            borrowing_ids = []
+            books = create_books(count)
+            timings["borrow"][1].append(
+                timed(lambda: borrowing_ids.extend(borrow_bulk(books)))
+            )
+            timings["return"][1].append(timed(lambda: return_bulk(borrowing_ids)))
+
+        borrowing_ids = []
+        single_borrow_queries = count_queries(
+            lambda: borrowing_ids.extend(borrow_single(create_books(count)))
+        )
+        single_return_queries = count_queries(lambda: return_single(borrowing_ids))
+        borrowing_ids = []
+        bulk_borrow_queries = count_queries(
+            lambda: borrowing_ids.extend(borrow_bulk(create_books(count)))
+        )
+        bulk_return_queries = count_queries(lambda: return_bulk(borrowing_ids))
+
+        for operation, single_queries, bulk_queries in (
+            ("borrow", single_borrow_queries, bulk_borrow_queries),
+            ("return", single_return_queries, bulk_return_queries),
+        ):
+            single_ms = median(timings[operation][0])
+            bulk_ms = median(timings[operation][1])
+            rows.append(
+                [
+                    operation,
+                    count,
+                    f"{single_ms:.1f}",
+                    f"{bulk_ms:.1f}",
+                    f"{single_ms / bulk_ms:.1f}x",
+                    single_queries,
+                    bulk_queries,
+                ]
+            )
+
+    print_table(
+        [
+            "operation",
+            "items",
+            "single ms",
+            "bulk ms",
+            "speedup",
+            "single queries",
+            "bulk queries",
+        ],
+        rows,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 20, 30])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.items, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Time the nightly fine accrual against a loop over the borrowings.
+
+    python -m benchmarks.bench_fines --loans 100000 1000000 --loop-sample 10000
+
+Seeds active borrowings overdue by 1 to 60 days. For every volume the
+fines ledger is emptied, then accrue_fines() runs for the first night,
+which inserts a row for every loan and accrues one group per due date, and
+for the next night, which accrues a single group. The loop computes the
+fine of each borrowing in Python and saves it with update_or_create(),
+in one transaction; it runs on the first --loop-sample loans only and its
+time per loan is extrapolated.
+"""
+
+import argparse
+import datetime
+import random
+import time
+
+from benchmarks.seed import without_auto_now_add
+from benchmarks.utils import count_queries, print_table, setup_django, test_database
+
+BATCH_SIZE = 10_000
+MAX_DAYS_OVERDUE = 60
+
+
+def seed_loans(count: int, user_ids: list[int], book_ids: list[int]) -> float:
+    from borrowing.models import Borrowing
+
+    generator = random.Random(count)
+    today = datetime.date.today()
+    start = time.perf_counter()
+    with without_auto_now_add(Borrowing, "borrow_date"):
+        for offset in range(0, count, BATCH_SIZE):
+            loans = []
+            for _ in range(min(BATCH_SIZE, count - offset)):
+                due = today - datetime.timedelta(
+                    days=generator.randint(1, MAX_DAYS_OVERDUE)
+                )
+                loans.append(
+                    Borrowing(
+                        user_id=generator.choice(user_ids),
+                        book_id=generator.choice(book_ids),
+                        borrow_date=due - datetime.timedelta(days=14),
+                        expected_return_date=due,
+                    )
+                )
+            Borrowing.objects.bulk_create(loans)
+    return time.perf_counter() - start
+
+
+def accrue_in_loop(until: datetime.date, limit: int) -> None:
+    from django.conf import settings
+    from django.db import transaction
+
+    from borrowing.models import Borrowing, Fine
+
+    multiplier = settings.BORROWING_FINE_MULTIPLIER
+    borrowings = Borrowing.objects.filter(
+        actual_return_date__isnull=True, expected_return_date__lt=until
+    ).select_related("book")
+    with transaction.atomic():
+        for borrowing in borrowings.order_by("id")[:limit]:
+            days = (until - borrowing.expected_return_date).days
+            daily_fee = borrowing.book.daily_fee * multiplier
+            Fine.objects.update_or_create(
+                borrowing=borrowing,
+                defaults={
+                    "user_id": borrowing.user_id,
+                    "daily_fee": daily_fee,
+                    "days": days,
+                    "amount": daily_fee * days,
+                    "accrued_until": until,
+                },
+            )
+
+
+def run(loans: list[int], loop_sample: int) -> None:
+    from django.contrib.auth import get_user_model
+
+    from book.models import Book
+    from borrowing.fines import accrue_fines
+    from borrowing.models import Fine
+
+    user_ids = [
+        user.pk
+        for user in get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{number}@bench.com") for number in range(1000)
+        )
+    ]
+    book_ids = [
+        book.pk
+        for book in Book._base_manager.bulk_create(
+            Book(
+                title=f"Book {number}",
+                author="Author",
+                cover=Book.CoverChoices.HARD,
+                inventory=5,
+                daily_fee=random.randint(10, 500) / 100,
+            )
+            for number in range(1000)
+        )
+    ]
+    today = datetime.date.today()
+    tomorrow = today + datetime.timedelta(days=1)
+
+    def measure(function) -> tuple[float, int]:
+        start = time.perf_counter()
+        queries = count_queries(function)
+        return time.perf_counter() - start, queries
+
+    rows = []
+    seeded = 0
+    for count in sorted(loans):
+        seed_seconds = seed_loans(count - seeded, user_ids, book_ids)
+        seeded = count
+        rows.append([count, "seed", f"{seed_seconds * 1000:.0f}", "-", "-"])
+
+        sample = min(loop_sample, count)
+        Fine.objects.all().delete()
+        seconds, queries = measure(lambda: accrue_in_loop(today, sample))
+        rows.append(
+            [
+                count,
+                f"loop ({sample} loans)",
+                f"{seconds * count / sample * 1000:.0f} (est.)",
+                f"{seconds / sample * 1e6:.1f}",
+                f"{queries * count // sample} (est.)",
+            ]
+        )
+
+        Fine.objects.all().delete()
+        for name, until in [("first night", today), ("next night", tomorrow)]:
+            seconds, queries = measure(lambda: accrue_fines(until))
+            rows.append(
+                [
+                    count,
+                    name,
+                    f"{seconds * 1000:.0f}",
+                    f"{seconds / count * 1e6:.2f}",
+                    queries,
+                ]
+            )
+    print_table(["loans", "job", "ms", "us per loan", "queries"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loans", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--loop-sample", type=int, default=10_000)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.loans, args.loop_sample)
+
+
+if __name__ == "__main__":
+    main()
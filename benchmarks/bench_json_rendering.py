@@ -0,0 +1,108 @@
+"""Compare JSON rendering speed and the peak memory of a full book export.
+
+    python -m benchmarks.bench_json_rendering --rows 10000 100000 --repeat 5
+"""
+
+import argparse
+import tracemalloc
+from typing import Any, Callable
+
+from benchmarks.utils import median, print_table, setup_django, test_database, timed
+
+
+def peak_memory(function: Callable[[], Any]) -> float:
+    """Return the peak memory allocated during one call in megabytes."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def run(rows: list[int], repeat: int) -> None:
+    from django.conf import settings
+    from rest_framework.renderers import JSONRenderer
+
+    from book.models import Book
+    from book.serializers import BookValuesSerializer
+    from library_service.renderers import FastJSONRenderer, StreamingJSONResponse
+
+    def export_in_memory() -> int:
+        rows = BookValuesSerializer.get_rows(Book.objects.all())
+        return len(JSONRenderer().render(BookValuesSerializer.serialize(rows)))
+
+    def export_streaming() -> int:
+        rows = BookValuesSerializer.get_rows(Book.objects.all())
+        response = StreamingJSONResponse(
+            rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE),
+            BookValuesSerializer.serialize,
+            settings.EXPORT_CHUNK_SIZE,
+        )
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    table = []
+    seeded = 0
+    for count in sorted(rows):
+        Book._base_manager.bulk_create(
+            Book(
+                title=f"Book «{number}»",
+                author="Author",
+                cover=number % 2,
+                inventory=5,
+                daily_fee=1.25,
+            )
+            for number in range(seeded, count)
+        )
+        seeded = count
+
+        data = BookValuesSerializer.serialize(
+            BookValuesSerializer.get_rows(Book.objects.all())
+        )
+        drf_ms = median(
+            [timed(lambda: JSONRenderer().render(data)) for _ in range(repeat)]
+        )
+        fast_ms = median(
+            [timed(lambda: FastJSONRenderer().render(data)) for _ in range(repeat)]
+        )
+        table.append(
+            [
+                count,
+                "render",
+                f"{drf_ms:.1f} ms",
+                f"{fast_ms:.1f} ms",
+                f"{drf_ms / fast_ms:.1f}x",
+            ]
+        )
+
+        assert export_in_memory() == export_streaming()
+        in_memory_mb = peak_memory(export_in_memory)
+        streaming_mb = peak_memory(export_streaming)
+        table.append(
+            [
+                count,
+                "export peak memory",
+                f"{in_memory_mb:.1f} MB",
+                f"{streaming_mb:.1f} MB",
+                f"{in_memory_mb / streaming_mb:.1f}x",
+            ]
+        )
+
+    print_table(
+        ["rows", "measure", "drf / in memory", "fast / streaming", "ratio"], table
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Compare login bursts with the password hashing profiles.
+
+    python -m benchmarks.bench_login_storm --logins 16 --readers 8 --seconds 10
+
+--logins clients log in through the token endpoint in a loop while
+--readers clients fetch book details, all on a pool of --threads worker
+threads like a threaded WSGI server. The profiles are PBKDF2 with Django's
+iterations and the tuned scrypt, both hashing on the request threads, and
+scrypt on the bounded hashing pool (PASSWORD_HASHING_WORKERS). Every profile
+runs in a fresh process.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import percentile, print_table, setup_django, test_database
+
+PROFILES = {
+    "pbkdf2, request threads": {
+        "PASSWORD_HASHERS": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "PASSWORD_HASHING_WORKERS": "none",
+    },
+    "scrypt, request threads": {"PASSWORD_HASHING_WORKERS": "none"},
+    "scrypt, hashing pool": {},
+}
+
+
+def measure(args: argparse.Namespace) -> dict:
+    """Seed users and books and run the clients in the worker process."""
+    from django.urls import reverse
+
+    from benchmarks.load import WSGIDriver
+    from benchmarks.seed import SEED_PASSWORD, seed
+    from user.models import User
+
+    seeded = seed(args.users, args.books, 0)
+    emails = list(User.objects.values_list("email", flat=True))
+    token_path = reverse("user:token_obtain_pair")
+    driver = WSGIDriver()
+    deadline = time.perf_counter() + args.seconds
+    results = {"login": ([], []), "read": ([], [])}
+    lock = threading.Lock()
+
+    def login(generator: random.Random) -> int:
+        status, _ = driver.request(
+            "POST",
+            token_path,
+            {"email": generator.choice(emails), "password": SEED_PASSWORD},
+        )
+        return status
+
+    def read(generator: random.Random) -> int:
+        book_id = generator.choice(seeded.book_ids)
+        status, _ = driver.request("GET", f"/api/v1/books/{book_id}/")
+        return status
+
+    def run_client(name: str, operation, seed_value: int) -> None:
+        generator = random.Random(seed_value)
+        timings, statuses = [], []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            statuses.append(operation(generator))
+            timings.append((time.perf_counter() - start) * 1000)
+        with lock:
+            results[name][0].extend(timings)
+            results[name][1].extend(statuses)
+
+    clients = [("login", login)] * args.logins + [("read", read)] * args.readers
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        for number, (name, operation) in enumerate(clients):
+            executor.submit(run_client, name, operation, number)
+    return {
+        name: {
+            "timings": timings,
+            "ok": statuses.count(200),
+            "rejected": statuses.count(503),
+        }
+        for name, (timings, statuses) in results.items()
+    }
+
+
+def run_worker(profile: str, argv: list[str]) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_login_storm"]
+        + ["--worker", profile, *argv],
+        env={**os.environ, **PROFILES[profile]},
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--worker", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        setup_django()
+        with test_database():
+            print(json.dumps(measure(args)))
+        return
+
+    argv = sys.argv[1:]
+    table = []
+    for profile in PROFILES:
+        result = run_worker(profile, argv)
+        for name, outcome in result.items():
+            timings = outcome["timings"]
+            table.append(
+                [
+                    profile,
+                    name,
+                    f"{outcome['ok'] / args.seconds:.1f}/s",
+                    f"{percentile(timings, 50):.1f} ms" if timings else "-",
+                    f"{percentile(timings, 95):.1f} ms" if timings else "-",
+                    outcome["rejected"],
+                ]
+            )
+    print_table(["profile", "client", "throughput", "p50", "p95", "503"], table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compare the DRF list serializers with the values() read path in rows per second.
+
+    python -m benchmarks.bench_serializers --rows 1000 10000 --repeat 5
+"""
+
+import argparse
+import datetime
+
+from benchmarks.utils import median, print_table, setup_django, test_database, timed
+
+
+def seed(count: int) -> None:
+    from django.contrib.auth import get_user_model
+
+    from book.models import Book
+    from borrowing.models import Borrowing
+
+    user = get_user_model().objects.create_user(email=f"bench{count}@test.com")
+    books = Book._base_manager.bulk_create(
+        Book(
+            title=f"Book {number}",
+            author="Author",
+            cover=number % 2,
+            inventory=5,
+            daily_fee=1.25,
+        )
+        for number in range(count)
+    )
+    expected_return_date = datetime.date.today() + datetime.timedelta(days=14)
+    Borrowing.objects.bulk_create(
+        Borrowing(user=user, book=book, expected_return_date=expected_return_date)
+        for book in books
+    )
+
+
+def run(rows: list[int], repeat: int) -> None:
+    from book.models import Book
+    from book.serializers import BookSerializer, BookValuesSerializer
+    from borrowing.models import Borrowing
+    from borrowing.serializers import BorrowingSerializer, BorrowingValuesSerializer
+
+    cases = {
+        "book": (
+            lambda count: Book.objects.all()[:count],
+            BookSerializer,
+            BookValuesSerializer,
+        ),
+        "borrowing": (
+            lambda count: Borrowing.objects.select_related("book", "user")[:count],
+            BorrowingSerializer,
+            BorrowingValuesSerializer,
+        ),
+    }
+
+    seed(max(rows))
+    table = []
+    for count in rows:
+        for name, (get_queryset, serializer, values_serializer) in cases.items():
+            instances = list(get_queryset(count))
+            values = list(values_serializer.get_rows(get_queryset(count)))
+            timings = {
+                "serialize": (
+                    lambda: serializer(instances, many=True).data,
+                    lambda: values_serializer.serialize(values),
+                ),
+                "fetch + serialize": (
+                    lambda: serializer(get_queryset(count), many=True).data,
+                    lambda: values_serializer.serialize(
+                        values_serializer.get_rows(get_queryset(count))
+                    ),
+                ),
+            }
+            for stage, (drf, fast) in timings.items():
+                drf_ms = median([timed(drf) for _ in range(repeat)])
+                fast_ms = median([timed(fast) for _ in range(repeat)])
+                table.append(
+                    [
+                        name,
+                        stage,
+                        count,
+                        f"{count / drf_ms * 1000:,.0f}",
+                        f"{count / fast_ms * 1000:,.0f}",
+                        f"{drf_ms / fast_ms:.1f}x",
+                    ]
+                )
+
+    print_table(
+        ["serializer", "stage", "rows", "drf rows/s", "values rows/s", "speedup"],
+        table,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure the overhead of ServerTimingMiddleware at several sample rates.
+
+    python -m benchmarks.bench_server_timing --calls 5000 --repeat 5
+
+Times a view that runs one query and returns an empty response, called
+directly and through the middleware with SERVER_TIMING_SAMPLE_RATE at 0,
+0.01 and 1. The difference is the cost of the middleware and of the query
+wrapper. Timing log lines go to a null handler, so that formatting them is
+measured but not writing them.
+"""
+
+import argparse
+import logging
+
+from benchmarks.utils import median, print_table, setup_django, test_database, timed
+
+SAMPLE_RATES = [0, 0.01, 1]
+
+
+def run(calls: int, repeat: int) -> None:
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from book.models import Book
+    from library_service.timing import ServerTimingMiddleware
+
+    logging.getLogger("library_service.timing").handlers = [logging.NullHandler()]
+    request = RequestFactory().get("/api/v1/books/")
+
+    def view(request) -> HttpResponse:
+        Book.objects.filter(pk=0).exists()
+        return HttpResponse()
+
+    def measure(handler) -> float:
+        def call() -> None:
+            for _ in range(calls):
+                handler(request)
+
+        call()
+        return median([timed(call) * 1000 / calls for _ in range(repeat)])
+
+    baseline = measure(view)
+    table = [["off", f"{baseline:.1f} us", "-"]]
+    for rate in SAMPLE_RATES:
+        with override_settings(SERVER_TIMING_SAMPLE_RATE=rate):
+            duration = measure(ServerTimingMiddleware(view))
+        table.append([rate, f"{duration:.1f} us", f"{duration - baseline:+.1f} us"])
+    print_table(["sample rate", "per request", "overhead"], table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.calls, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Compare the startup time and per-request overhead of the settings profiles.
+
+    python -m benchmarks.bench_settings --processes 5 --requests 500
+
+Every sample runs in a fresh process, which loads the WSGI application with
+one profile, then times book list and detail requests through it with the
+DEBUG value of the profile.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.utils import median, percentile, print_table, test_database
+
+PROFILES = ["library_service.settings.dev", "library_service.settings.prod"]
+ENDPOINTS = {
+    "books list": "/api/v1/books/",
+    "book detail": "/api/v1/books/{book_id}/",
+}
+
+
+def measure(requests: int) -> dict:
+    """Load the application with the settings from the environment and
+    time requests to it, run inside the worker process."""
+    start = time.perf_counter()
+    import django
+
+    django.setup()
+    from benchmarks.load import WSGIDriver
+
+    driver = WSGIDriver()
+    result = {"startup_ms": (time.perf_counter() - start) * 1000}
+
+    with test_database(debug=None):
+        from book.models import Book
+
+        book = Book.objects.create(
+            title="Book", author="Author", cover=0, inventory=5, daily_fee=1
+        )
+        for name, path in ENDPOINTS.items():
+            path = path.format(book_id=book.id)
+            driver.request("GET", path)
+            timings = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                status, _ = driver.request("GET", path)
+                timings.append((time.perf_counter() - start) * 1000)
+                assert status == 200, (path, status)
+            result[name] = timings
+    return result
+
+
+def run_worker(profile: str, requests: int) -> dict:
+    env = {
+        "DJANGO_SECRET_KEY": "benchmark",
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": profile,
+        "DJANGO_ALLOWED_HOSTS": "testserver",
+    }
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_settings", "--worker"]
+        + ["--requests", str(requests)],
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run(processes: int, requests: int) -> None:
+    table = []
+    for profile in PROFILES:
+        samples = [run_worker(profile, requests) for _ in range(processes)]
+        name = profile.rsplit(".", 1)[-1]
+        startup = [sample["startup_ms"] for sample in samples]
+        table.append([name, "startup", f"{median(startup):.1f} ms", "-"])
+        for endpoint in ENDPOINTS:
+            timings = [timing for sample in samples for timing in sample[endpoint]]
+            table.append(
+                [
+                    name,
+                    endpoint,
+                    f"{median(timings):.2f} ms",
+                    f"{percentile(timings, 95):.2f} ms",
+                ]
+            )
+    print_table(["profile", "measure", "median", "p95"], table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.requests)))
+    else:
+        run(args.processes, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Compare SQLite throughput under concurrent readers and writers with the
+default rollback journal and with the pragmas from SQLITE_PRAGMAS.
+
+    python -m benchmarks.bench_sqlite_contention --readers 8 --writers 4 --seconds 10
+
+Readers list the borrowings of random users, writers borrow a random book
+and return it, both through the API views in separate processes. Every profile runs against a
+fresh database file, since the journal mode is stored in the file.
+"""
+
+import argparse
+import random
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.utils import percentile, print_table, setup_django, test_database
+
+DEFAULT_PRAGMAS = {"journal_mode": "delete", "synchronous": "full"}
+
+
+def work(operation, deadline: float, seed_value: int, results) -> None:
+    """Repeat the operation until the deadline in a worker process and put
+    the timings and the number of "database is locked" errors in results."""
+    from django.db import OperationalError, connection
+
+    generator = random.Random(seed_value)
+    timings = []
+    errors = 0
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                operation(generator)
+            except OperationalError:
+                errors += 1
+            else:
+                timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        connection.close()
+        results.put((timings, errors))
+
+
+def run_profile(
+    pragmas: dict, readers: int, writers: int, seconds: float, size: int
+) -> list:
+    import datetime
+
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+    from django.test import override_settings
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from benchmarks.seed import seed
+    from borrowing.views import BorrowingViewSet
+
+    factory = APIRequestFactory()
+    list_view = BorrowingViewSet.as_view({"get": "list"})
+    create_view = BorrowingViewSet.as_view({"post": "create"})
+    return_view = BorrowingViewSet.as_view({"post": "return_borrowing"})
+    expected_return_date = datetime.date.today() + datetime.timedelta(days=7)
+
+    with tempfile.TemporaryDirectory() as directory, override_settings(
+        SQLITE_PRAGMAS=pragmas
+    ):
+        connections["default"].settings_dict["TEST"]["NAME"] = str(
+            Path(directory) / "contention.sqlite3"
+        )
+        with test_database():
+            seeded = seed(users=size // 10, books=size, borrowings=size * 10)
+            users = list(get_user_model().objects.filter(pk__in=seeded.user_ids))
+            connections["default"].close()
+
+            def read(generator: random.Random) -> None:
+                request = factory.get("/api/v1/borrowings/")
+                force_authenticate(request, user=generator.choice(users))
+                assert list_view(request).status_code == 200
+
+            def write(generator: random.Random) -> None:
+                user = generator.choice(users)
+                request = factory.post(
+                    "/api/v1/borrowings/",
+                    {
+                        "book": generator.choice(seeded.book_ids),
+                        "expected_return_date": expected_return_date,
+                    },
+                )
+                force_authenticate(request, user=user)
+                response = create_view(request)
+                if response.status_code != 201:
+                    return
+                request = factory.post("/api/v1/borrowings/return/")
+                force_authenticate(request, user=user)
+                return_view(request, pk=response.data["id"])
+
+            # Processes rather than threads, so that the GIL doesn't
+            # serialize the workers before SQLite does.
+            context = multiprocessing.get_context("fork")
+            results = {"read": context.Queue(), "write": context.Queue()}
+            deadline = time.perf_counter() + seconds
+            processes = [
+                context.Process(
+                    target=work,
+                    args=(operation, deadline, number, results[name]),
+                )
+                for number, (name, operation) in enumerate(
+                    [("read", read)] * readers + [("write", write)] * writers
+                )
+            ]
+            for process in processes:
+                process.start()
+            outcomes = {
+                "read": [results["read"].get() for _ in range(readers)],
+                "write": [results["write"].get() for _ in range(writers)],
+            }
+            for process in processes:
+                process.join()
+
+    rows = []
+    for name, group in outcomes.items():
+        timings = [timing for worker_timings, _ in group for timing in worker_timings]
+        rows.append(
+            [
+                name,
+                f"{len(timings) / seconds:.0f}/s",
+                f"{percentile(timings, 50):.1f} ms" if timings else "-",
+                f"{percentile(timings, 95):.1f} ms" if timings else "-",
+                sum(errors for _, errors in group),
+            ]
+        )
+    return rows
+
+
+def run(readers: int, writers: int, seconds: float, size: int) -> None:
+    from django.conf import settings
+
+    table = []
+    for name, pragmas in [
+        ("rollback journal", DEFAULT_PRAGMAS),
+        ("SQLITE_PRAGMAS", settings.SQLITE_PRAGMAS),
+    ]:
+        for row in run_profile(pragmas, readers, writers, seconds, size):
+            table.append([name, *row])
+    print_table(["profile", "operation", "throughput", "p50", "p95", "errors"], table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument(
+        "--books", type=int, default=10000, help="Also seeds 10x borrowings."
+    )
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.readers, args.writers, args.seconds, args.books)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measure the per-request cost of the token bucket throttle.
+
+    python -m benchmarks.bench_throttling --calls 10000 --repeat 5
+
+Times allow_request() for a view without a scope, the token bucket for an
+anonymous client and a user, and a rejected request. The buckets live in
+the configured default cache, local memory unless CACHE_BACKEND is set.
+"""
+
+import argparse
+from types import SimpleNamespace
+
+from benchmarks.utils import median, print_table, setup_django, test_database, timed
+
+
+def run(calls: int, repeat: int) -> None:
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import cache
+    from django.test import override_settings
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from library_service.throttling import ScopedTokenBucketThrottle
+    from user.models import ClaimsUser
+
+    rates = {"bench_anon": "1000000000/s", "bench_user": "1000000000/s"}
+
+    factory = APIRequestFactory()
+    anonymous = Request(factory.get("/"))
+    anonymous.user = AnonymousUser()
+    authenticated = Request(factory.get("/"))
+    authenticated.user = ClaimsUser.from_claims(1, "user@test.com", False)
+    scoped = SimpleNamespace(throttle_scope="bench")
+    rejected = SimpleNamespace(throttle_scope="rejected")
+
+    cases = [
+        ("no scope", anonymous, SimpleNamespace()),
+        ("token bucket, anonymous", anonymous, scoped),
+        ("token bucket, user", authenticated, scoped),
+        ("token bucket, rejected", anonymous, rejected),
+    ]
+
+    table = []
+    with override_settings(
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {**rates, "rejected_anon": "1/day"},
+        }
+    ):
+        for name, request, view in cases:
+            cache.clear()
+
+            def call() -> None:
+                for _ in range(calls):
+                    ScopedTokenBucketThrottle().allow_request(request, view)
+
+            timings = [timed(call) * 1000 / calls for _ in range(repeat)]
+            table.append([name, f"{median(timings):.1f} us"])
+    print_table(["throttle", "per request"], table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.calls, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,480 @@
+"""Load test the API in-process through the WSGI or ASGI application.
+
+Seeds a throwaway database with realistic volumes, drives the book,
+borrowing, return and token endpoints, and reports latency percentiles,
+throughput and queries per request for every endpoint:
+
+    python -m benchmarks.load --users 100000 --books 200000 --borrowings 1000000
+    python -m benchmarks.load --server asgi --save benchmarks/baselines/main.json
+    python -m benchmarks.load --compare benchmarks/baselines/main.json
+
+Requests are sent one at a time, so throughput is per worker process.
+With ``--compare`` the command exits with status 1 if the p95 latency of
+any endpoint grew by more than ``--threshold`` and ``--min-delta-ms``,
+or if it makes more queries than in the baseline.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from benchmarks.utils import (
+    median,
+    percentile,
+    print_table,
+    setup_django,
+    test_database,
+)
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+class WSGIDriver:
+    def __init__(self) -> None:
+        from django.core.wsgi import get_wsgi_application
+        from django.test import RequestFactory
+
+        self.application = get_wsgi_application()
+        self.factory = RequestFactory()
+
+    def request(
+        self, method: str, path: str, data: Any = None, headers: dict = None
+    ) -> tuple[int, bytes]:
+        body = json.dumps(data) if data is not None else ""
+        environ = self.factory.generic(
+            method,
+            path,
+            body,
+            content_type=JSON_CONTENT_TYPE,
+            headers={"Accept": JSON_CONTENT_TYPE, **(headers or {})},
+        ).environ
+        statuses = []
+
+        def start_response(status: str, response_headers: list, exc_info=None):
+            statuses.append(int(status.split()[0]))
+
+        response = self.application(environ, start_response)
+        try:
+            content = b"".join(response)
+        finally:
+            if hasattr(response, "close"):
+                response.close()
+        return statuses[0], content
+
+
+class ASGIDriver:
+    def __init__(self) -> None:
+        from django.core.asgi import get_asgi_application
+
+        self.application = get_asgi_application()
+        self.loop = asyncio.new_event_loop()
+
+    def request(
+        self, method: str, path: str, data: Any = None, headers: dict = None
+    ) -> tuple[int, bytes]:
+        return self.loop.run_until_complete(
+            self.send_request(method, path, data, headers or {})
+        )
+
+    async def send_request(
+        self, method: str, path: str, data: Any, headers: dict
+    ) -> tuple[int, bytes]:
+        path, _, query_string = path.partition("?")
+        body = json.dumps(data).encode() if data is not None else b""
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query_string.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"accept", JSON_CONTENT_TYPE.encode()),
+                (b"content-type", JSON_CONTENT_TYPE.encode()),
+                (b"content-length", str(len(body)).encode()),
+                *(
+                    (name.lower().encode(), value.encode())
+                    for name, value in headers.items()
+                ),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        requests = [{"type": "http.request", "body": body, "more_body": False}]
+        disconnected = asyncio.Event()
+        response = {"status": None, "body": []}
+
+        async def receive() -> dict:
+            if requests:
+                return requests.pop()
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+
+        await self.application(scope, receive, send)
+        disconnected.set()
+        return response["status"], b"".join(response["body"])
+
+
+DRIVERS = {"wsgi": WSGIDriver, "asgi": ASGIDriver}
+
+
+class QueryCounter:
+    """Count queries on every connection, including the ones opened
+    by the threads that run sync views under ASGI."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self) -> None:
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        for connection in connections.all():
+            connection.execute_wrappers.append(self)
+        connection_created.connect(self.add_to_connection, weak=False)
+
+    def add_to_connection(self, sender, connection, **kwargs) -> None:
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    data: Any = None
+    headers: dict = field(default_factory=dict)
+    on_response: Optional[Callable[[bytes], None]] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    make_request: Callable[[], Request]
+    expected_status: int = 200
+    share: float = 1.0
+    before: Optional[Callable[[], None]] = None
+
+
+@dataclass
+class Result:
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self) -> dict:
+        return {
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "p50_ms": round(percentile(self.latencies, 50), 3),
+            "p95_ms": round(percentile(self.latencies, 95), 3),
+            "p99_ms": round(percentile(self.latencies, 99), 3),
+            "throughput_rps": round(
+                len(self.latencies) / sum(self.latencies) * 1000, 1
+            ),
+            "queries": float(median(self.queries)),
+        }
+
+
+def get_scenarios(seeded, generator: random.Random) -> list[Scenario]:
+    from django.core.cache import cache
+    from django.urls import reverse
+    from faker import Faker
+
+    from benchmarks.seed import SEED_PASSWORD
+    from book.models import Book
+    from user.models import User
+    from user.serializers import ClaimsTokenObtainPairSerializer
+
+    users = list(
+        User.objects.filter(
+            pk__in=generator.sample(seeded.user_ids, min(len(seeded.user_ids), 100))
+        )
+    )
+    admin = User.objects.get(pk=seeded.admin_id)
+    available_book_ids = list(
+        Book.objects.filter(inventory__gte=10).values_list("id", flat=True)[:1000]
+    )
+    search_terms = Faker().words(nb=50)
+    expected_return_date = (
+        datetime.date.today() + datetime.timedelta(days=14)
+    ).isoformat()
+    borrowed = []
+
+    def auth_headers(user) -> dict:
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        return {"Authorize": f"Bearer {token}"}
+
+    user_headers = [auth_headers(user) for user in users]
+    admin_headers = auth_headers(admin)
+
+    def remember_borrowing(headers: dict) -> Callable[[bytes], None]:
+        return lambda content: borrowed.append((headers, json.loads(content)["id"]))
+
+    def borrow() -> Request:
+        headers = generator.choice(user_headers)
+        return Request(
+            "POST",
+            reverse("borrowing:borrowing-list"),
+            {
+                "book": generator.choice(available_book_ids),
+                "expected_return_date": expected_return_date,
+            },
+            headers,
+            on_response=remember_borrowing(headers),
+        )
+
+    def return_borrowing() -> Request:
+        headers, borrowing_id = borrowed.pop()
+        return Request(
+            "POST",
+            reverse("borrowing:borrowing-return", args=[borrowing_id]),
+            headers=headers,
+        )
+
+    return [
+        Scenario(
+            "books list",
+            lambda: Request("GET", reverse("book:book-list")),
+        ),
+        Scenario(
+            "books list uncached",
+            lambda: Request("GET", reverse("book:book-list")),
+            before=cache.clear,
+        ),
+        Scenario(
+            "books search",
+            lambda: Request(
+                "GET",
+                reverse("book:book-list") + f"?search={generator.choice(search_terms)}",
+            ),
+            before=cache.clear,
+        ),
+        Scenario(
+            "book detail",
+            lambda: Request(
+                "GET",
+                reverse("book:book-detail", args=[generator.choice(seeded.book_ids)]),
+            ),
+        ),
+        Scenario(
+            "borrowings list",
+            lambda: Request(
+                "GET",
+                reverse("borrowing:borrowing-list"),
+                headers=generator.choice(user_headers),
+            ),
+        ),
+        Scenario(
+            "borrowings list admin active",
+            lambda: Request(
+                "GET",
+                reverse("borrowing:borrowing-list") + "?is_active=true",
+                headers=admin_headers,
+            ),
+        ),
+        Scenario("borrow", borrow, expected_status=201),
+        Scenario("return", return_borrowing, expected_status=204),
+        Scenario(
+            "token",
+            lambda: Request(
+                "POST",
+                reverse("user:token_obtain_pair"),
+                {"email": generator.choice(users).email, "password": SEED_PASSWORD},
+            ),
+            share=0.1,
+        ),
+    ]
+
+
+def run_scenario(
+    driver, counter: QueryCounter, scenario: Scenario, requests: int, warmup: int
+) -> Result:
+    result = Result()
+    total = max(int(requests * scenario.share), 1)
+    for number in range(warmup + total):
+        if scenario.before:
+            scenario.before()
+        request = scenario.make_request()
+        queries_before = counter.count
+        start = time.perf_counter()
+        status, content = driver.request(
+            request.method, request.path, request.data, request.headers
+        )
+        latency = (time.perf_counter() - start) * 1000
+        if status == scenario.expected_status and request.on_response:
+            request.on_response(content)
+        if number < warmup:
+            continue
+        result.latencies.append(latency)
+        result.queries.append(counter.count - queries_before)
+        if status != scenario.expected_status:
+            result.errors += 1
+    return result
+
+
+def compare(
+    report: dict, baseline: dict, threshold: float, min_delta_ms: float
+) -> bool:
+    """Print the change against the baseline, return False on a regression."""
+    for key in ("server", "volumes", "requests"):
+        if report[key] != baseline[key]:
+            print(
+                f"warning: {key} differs from the baseline, "
+                f"{report[key]} != {baseline[key]}",
+                file=sys.stderr,
+            )
+    rows = []
+    passed = True
+    for name, summary in report["endpoints"].items():
+        base = baseline["endpoints"].get(name)
+        if base is None:
+            rows.append(
+                [name, "-", summary["p95_ms"], "-", "-", summary["queries"], "new"]
+            )
+            continue
+        p95_change = summary["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0
+        regressed = (
+            p95_change > threshold and summary["p95_ms"] - base["p95_ms"] > min_delta_ms
+        ) or summary["queries"] > base["queries"]
+        passed = passed and not regressed
+        rows.append(
+            [
+                name,
+                base["p95_ms"],
+                summary["p95_ms"],
+                f"{p95_change:+.0%}",
+                base["queries"],
+                summary["queries"],
+                "REGRESSION" if regressed else "ok",
+            ]
+        )
+    print_table(
+        [
+            "endpoint",
+            "base p95 ms",
+            "p95 ms",
+            "change",
+            "base queries",
+            "queries",
+            "status",
+        ],
+        rows,
+    )
+    return passed
+
+
+def run(args: argparse.Namespace) -> dict:
+    import django
+    from django.db import connection
+
+    from benchmarks.seed import seed
+
+    seeded = seed(args.users, args.books, args.borrowings)
+    print(
+        f"seeded {args.users} users, {args.books} books and "
+        f"{args.borrowings} borrowings in {seeded.seconds:.0f}s",
+        file=sys.stderr,
+    )
+
+    driver = DRIVERS[args.server]()
+    counter = QueryCounter()
+    counter.install()
+    generator = random.Random(args.seed)
+
+    endpoints = {}
+    for scenario in get_scenarios(seeded, generator):
+        result = run_scenario(driver, counter, scenario, args.requests, args.warmup)
+        endpoints[scenario.name] = result.summary()
+
+    return {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "server": args.server,
+        "volumes": {
+            "users": args.users,
+            "books": args.books,
+            "borrowings": args.borrowings,
+        },
+        "requests": args.requests,
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": (
+                f"{connection.vendor} {connection.Database.sqlite_version}"
+                if connection.vendor == "sqlite"
+                else connection.vendor
+            ),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", choices=DRIVERS, default="wsgi")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--borrowings", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the report as a JSON baseline")
+    parser.add_argument("--compare", help="compare with a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        report = run(args)
+
+    print_table(
+        [
+            "endpoint",
+            "requests",
+            "errors",
+            "p50 ms",
+            "p95 ms",
+            "p99 ms",
+            "req/s",
+            "queries",
+        ],
+        [[name, *summary.values()] for name, summary in report["endpoints"].items()],
+    )
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if not compare(report, baseline, args.threshold, args.min_delta_ms):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Seed realistic data volumes for the load test.
+
+Titles, authors and emails come from Faker. Dates, inventories and which
+borrowings are still active are drawn from a seeded random generator,
+so two runs with the same volumes produce the same data.
+"""
+
+import datetime
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+SEED_PASSWORD = "bench-password"
+BATCH_SIZE = 10_000
+HISTORY_DAYS = 3 * 365
+ACTIVE_SHARE = 0.1
+
+
+@dataclass
+class SeededData:
+    user_ids: list[int]
+    book_ids: list[int]
+    admin_id: int
+    seconds: float
+
+
+@contextmanager
+def without_auto_now_add(model, field_name: str) -> Iterator[None]:
+    """Let bulk_create keep historical values of an auto_now_add field."""
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def seed_users(count: int, generator: random.Random) -> list[int]:
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from faker import Faker
+
+    User = get_user_model()
+    fake = Faker()
+    fake.seed_instance(generator.random())
+    # Hashing once keeps seeding fast, every user can log in with it.
+    password = make_password(SEED_PASSWORD)
+    user_ids = []
+    for offset in range(0, count, BATCH_SIZE):
+        users = User.objects.bulk_create(
+            User(
+                email=f"{number}.{fake.user_name()}@{fake.free_email_domain()}",
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+                password=password,
+            )
+            for number in range(offset, min(offset + BATCH_SIZE, count))
+        )
+        user_ids.extend(user.pk for user in users)
+    return user_ids
+
+
+def seed_books(count: int, generator: random.Random) -> list[int]:
+    from faker import Faker
+
+    from book.models import Book
+
+    fake = Faker()
+    fake.seed_instance(generator.random())
+    book_ids = []
+    for offset in range(0, count, BATCH_SIZE):
+        # The base manager skips the per-book cache invalidation.
+        books = Book._base_manager.bulk_create(
+            Book(
+                title=fake.sentence(nb_words=generator.randint(1, 6))[:100],
+                author=fake.name(),
+                cover=generator.randint(0, 1),
+                inventory=generator.randint(0, 20),
+                daily_fee=generator.randint(10, 500) / 100,
+            )
+            for _ in range(min(BATCH_SIZE, count - offset))
+        )
+        book_ids.extend(book.pk for book in books)
+    return book_ids
+
+
+def seed_borrowings(
+    count: int, user_ids: list[int], book_ids: list[int], generator: random.Random
+) -> None:
+    from borrowing.models import Borrowing
+
+    today = datetime.date.today()
+
+    def sample_borrowing() -> Borrowing:
+        borrow_date = today - datetime.timedelta(
+            days=generator.randint(0, HISTORY_DAYS)
+        )
+        expected_return_date = borrow_date + datetime.timedelta(
+            days=generator.randint(7, 30)
+        )
+        actual_return_date = None
+        if generator.random() > ACTIVE_SHARE:
+            actual_return_date = min(
+                borrow_date + datetime.timedelta(days=generator.randint(0, 40)), today
+            )
+        return Borrowing(
+            user_id=generator.choice(user_ids),
+            book_id=generator.choice(book_ids),
+            borrow_date=borrow_date,
+            expected_return_date=expected_return_date,
+            actual_return_date=actual_return_date,
+        )
+
+    with without_auto_now_add(Borrowing, "borrow_date"):
+        for offset in range(0, count, BATCH_SIZE):
+            Borrowing.objects.bulk_create(
+                sample_borrowing() for _ in range(min(BATCH_SIZE, count - offset))
+            )
+
+
+def seed(users: int, books: int, borrowings: int, seed_value: int = 0) -> SeededData:
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    generator = random.Random(seed_value)
+    start = time.perf_counter()
+    user_ids = seed_users(users, generator)
+    book_ids = seed_books(books, generator)
+    seed_borrowings(borrowings, user_ids, book_ids, generator)
+    admin = get_user_model().objects.create(
+        email="admin@bench.com",
+        password=make_password(SEED_PASSWORD),
+        is_staff=True,
+        is_superuser=True,
+    )
+    return SeededData(user_ids, book_ids, admin.pk, time.perf_counter() - start)
@@ -0,0 +1,95 @@
+"""Helpers shared by the benchmark scripts.
+
+Benchmarks run against a throwaway test database and never touch the
+configured one. Run them from the project root, for example:
+
+    python -m benchmarks.bench_bulk_borrowing
+"""
+
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+
+def setup_django() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings.dev")
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+
+    from rest_framework.settings import api_settings
+
+    # The clients of a benchmark share one address and send far more
+    # requests than the rate limits allow. The throttle still runs.
+    settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {}
+    api_settings.reload()
+
+
+@contextmanager
+def test_database(verbosity: int = 0, debug: Optional[bool] = False) -> Iterator[None]:
+    """Run the block against a throwaway database. DEBUG is turned off
+    unless debug is None, which keeps the value of the settings."""
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment(debug=debug)
+    old_config = setup_databases(verbosity=verbosity, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def timed(function: Callable[[], Any]) -> float:
+    """Return the wall time of one call in milliseconds."""
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def count_queries(function: Callable[[], Any]) -> int:
+    """Count the queries of one call. Unlike the query log, which keeps
+    the last 9000 queries only, the count has no limit."""
+    from django.db import connection
+
+    count = 0
+
+    def counter(execute: Callable, *args: Any) -> Any:
+        nonlocal count
+        count += 1
+        return execute(*args)
+
+    with connection.execute_wrapper(counter):
+        function()
+    return count
+
+
+def median(values: Sequence[float]) -> float:
+    return statistics.median(values)
+
+
+def percentile(values: Sequence[float], percent: int) -> float:
+    """Return the percentile with linear interpolation between samples."""
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def print_table(header: Sequence[str], rows: Sequence[Sequence[Any]]) -> None:
+    rows = [[str(value) for value in row] for row in rows]
+    widths = [
+        max(len(str(column)), *(len(row[index]) for row in rows))
+        for index, column in enumerate(header)
+    ]
+    print("  ".join(str(column).rjust(width) for column, width in zip(header, widths)))
+    for row in rows:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
@@ -0,0 +1,152 @@
+import hashlib
+import time
+from typing import Awaitable, Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+CATALOG_VERSION_KEY = "book:catalog:version"
+BOOK_VERSION_KEY = "book:{book_id}:version"
+RESPONSE_KEY = "book:response:{version}:{path}"
+
+
+def get_version(key: str) -> int:
+    """Versions are nanosecond timestamps of the last change,
+    so they double as the Last-Modified value of cached responses."""
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+async def aget_version(key: str) -> int:
+    version = await cache.aget(key)
+    if version is None:
+        version = time.time_ns()
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def get_catalog_version() -> int:
+    return get_version(CATALOG_VERSION_KEY)
+
+
+async def aget_catalog_version() -> int:
+    return await aget_version(CATALOG_VERSION_KEY)
+
+
+def bump_versions(book_ids: list[int]) -> None:
+    version = time.time_ns()
+    versions = {
+        BOOK_VERSION_KEY.format(book_id=book_id): version for book_id in book_ids
+    }
+    versions[CATALOG_VERSION_KEY] = version
+    cache.set_many(versions, timeout=None)
+
+
+def invalidate_books(book_ids: Iterable[int]) -> None:
+    """Bump the versions now and once more after commit, so that a response
+    cached by a concurrent request in between is never served."""
+    book_ids = list(book_ids)
+    bump_versions(book_ids)
+    transaction.on_commit(lambda: bump_versions(book_ids))
+
+
+def get_validators(request: Request, version: int) -> tuple[str, int, str]:
+    """Return the ETag, the Last-Modified timestamp and the cache key
+    of the response to the request."""
+    path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    etag = f'W/"{version:x}-{path_hash[:16]}"'
+    key = RESPONSE_KEY.format(version=version, path=path_hash)
+    return etag, version // 10**9, key
+
+
+def set_validators(response: Response, etag: str, last_modified: int) -> Response:
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def get_cached_response(
+    request: Request, version: int, build_response: Callable[[], Response]
+) -> Response:
+    """Serve serialized data cached under the given version, answering
+    conditional requests with 304 without touching the database."""
+    etag, last_modified, key = get_validators(request, version)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        data = cache.get(key)
+        if data is None:
+            response = build_response()
+            if response.status_code != 200:
+                return response
+            cache.set(key, response.data, settings.BOOK_CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+    return set_validators(response, etag, last_modified)
+
+
+async def aget_cached_response(
+    request: Request, version: int, build_response: Callable[[], Awaitable[Response]]
+) -> Response:
+    """Async variant of get_cached_response."""
+    etag, last_modified, key = get_validators(request, version)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        data = await cache.aget(key)
+        if data is None:
+            response = await build_response()
+            if response.status_code != 200:
+                return response
+            await cache.aset(key, response.data, settings.BOOK_CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+    return set_validators(response, etag, last_modified)
+
+
+def get_cached_book_response(
+    request: Request, book_id: int, build_response: Callable[[], Response]
+) -> Response:
+    """get_cached_response under the version of the book. A missing version
+    is created only once the book was read, so that requests for books that
+    do not exist leave no keys behind."""
+    key = BOOK_VERSION_KEY.format(book_id=book_id)
+    version = cache.get(key)
+    if version is not None:
+        return get_cached_response(request, version, build_response)
+
+    version = time.time_ns()
+    response = build_response()
+    # A change of the book since it was read has created the version already.
+    if response.status_code == 200 and cache.add(key, version, timeout=None):
+        etag, last_modified, response_key = get_validators(request, version)
+        cache.set(response_key, response.data, settings.BOOK_CACHE_TIMEOUT)
+        set_validators(response, etag, last_modified)
+    return response
+
+
+async def aget_cached_book_response(
+    request: Request, book_id: int, build_response: Callable[[], Awaitable[Response]]
+) -> Response:
+    """Async variant of get_cached_book_response."""
+    key = BOOK_VERSION_KEY.format(book_id=book_id)
+    version = await cache.aget(key)
+    if version is not None:
+        return await aget_cached_response(request, version, build_response)
+
+    version = time.time_ns()
+    response = await build_response()
+    if response.status_code == 200 and await cache.aadd(key, version, timeout=None):
+        etag, last_modified, response_key = get_validators(request, version)
+        await cache.aset(response_key, response.data, settings.BOOK_CACHE_TIMEOUT)
+        set_validators(response, etag, last_modified)
+    return response
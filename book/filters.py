@@ -0,0 +1,48 @@
+from django.db.models import QuerySet
+from django_filters import rest_framework as django_filters
+from rest_framework import filters
+
+from book.models import Book
+from book.search import search_books
+
+
+class BookSearchFilterBackend(filters.BaseFilterBackend):
+    search_param = "search"
+    search_description = (
+        "full-text search by title and author, results are ordered by relevance"
+    )
+
+    def filter_queryset(self, request, queryset, view) -> QuerySet:
+        query = request.query_params.get(self.search_param, "")
+        return search_books(queryset, query)
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": self.search_description,
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+class BookFilter(django_filters.FilterSet):
+    cover = django_filters.ChoiceFilter(
+        choices=Book.CoverChoices.choices, help_text="filtering by cover"
+    )
+    is_available = django_filters.BooleanFilter(
+        method="filter_is_available",
+        help_text="filtering by availability of copies",
+    )
+    daily_fee = django_filters.RangeFilter(
+        help_text="filtering by daily fee range, daily_fee_min and daily_fee_max"
+    )
+
+    def filter_is_available(
+        self, queryset: QuerySet, name: str, value: bool
+    ) -> QuerySet:
+        if value:
+            return queryset.filter(inventory__gt=0)
+        return queryset.filter(inventory=0)
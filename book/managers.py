@@ -0,0 +1,164 @@
+import datetime
+from typing import Optional
+
+from django.db import models
+from django.db.models import Case, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from book.cache import invalidate_books
+
+
+class BookManager(models.Manager):
+    def bulk_create(self, objs, *args, **kwargs) -> list:
+        books = super().bulk_create(objs, *args, **kwargs)
+        invalidate_books(book.pk for book in books if book.pk is not None)
+        return books
+
+    @staticmethod
+    def _next_due_date_after_borrowing(due_date: models.Expression) -> Least:
+        return Least(Coalesce(F("next_due_date"), due_date), due_date)
+
+    @staticmethod
+    def _next_due_date_after_return(due_date: datetime.date) -> Case:
+        """Keep the next due date if it is earlier than the due date of the
+        returned borrowings, otherwise look it up again."""
+        from borrowing.models import Borrowing
+
+        earliest = (
+            Borrowing.objects.filter(
+                book=OuterRef("pk"), actual_return_date__isnull=True
+            )
+            .order_by("expected_return_date")
+            .values("expected_return_date")[:1]
+        )
+        return Case(
+            When(next_due_date__lt=due_date, then=F("next_due_date")),
+            default=Subquery(earliest),
+        )
+
+    def decrease_inventory(
+        self,
+        book_id: int,
+        due_date: Optional[datetime.date] = None,
+        from_hold: bool = False,
+    ) -> bool:
+        """Take one copy of the book, due back on due_date, in a single
+        conditional UPDATE. The copy is taken from the copies on hold if
+        from_hold is True. Returns False if no copies are left."""
+        stock = "copies_on_hold" if from_hold else "inventory"
+        availability = {}
+        if due_date is not None:
+            availability["next_due_date"] = self._next_due_date_after_borrowing(
+                Value(due_date, output_field=models.DateField())
+            )
+        updated = self.filter(pk=book_id, **{f"{stock}__gt": 0}).update(
+            **{stock: F(stock) - 1},
+            copies_on_loan=F("copies_on_loan") + 1,
+            **availability,
+        )
+        if updated:
+            invalidate_books([book_id])
+        return bool(updated)
+
+    def increase_inventory(
+        self,
+        book_id: int,
+        due_date: Optional[datetime.date] = None,
+        on_hold: bool = False,
+    ) -> None:
+        """Put back one copy of the book that was due on due_date, among
+        the copies on hold if on_hold is True."""
+        stock = "copies_on_hold" if on_hold else "inventory"
+        availability = {}
+        if due_date is not None:
+            availability["next_due_date"] = self._next_due_date_after_return(due_date)
+        self.filter(pk=book_id).update(
+            **{stock: F(stock) + 1},
+            copies_on_loan=Greatest(F("copies_on_loan") - 1, Value(0)),
+            **availability,
+        )
+        invalidate_books([book_id])
+
+    @staticmethod
+    def _amount_per_book(amounts: dict[int, int]) -> Case:
+        return Case(
+            *[
+                When(pk=book_id, then=Value(amount))
+                for book_id, amount in amounts.items()
+            ],
+            output_field=models.PositiveIntegerField(),
+        )
+
+    def decrease_inventory_bulk(
+        self,
+        amounts: dict[int, int],
+        due_dates: Optional[dict[int, datetime.date]] = None,
+    ) -> bool:
+        """Take several copies of several books in a single conditional UPDATE,
+        due_dates are the earliest due dates of the new borrowings per book.
+        Returns False if any of the books has not enough copies left,
+        the caller is expected to roll back the transaction in that case."""
+        amount = self._amount_per_book(amounts)
+        availability = {}
+        if due_dates:
+            due_date = Case(
+                *[
+                    When(pk=book_id, then=Value(date))
+                    for book_id, date in due_dates.items()
+                ],
+                output_field=models.DateField(),
+            )
+            availability["next_due_date"] = self._next_due_date_after_borrowing(
+                due_date
+            )
+        updated = self.filter(pk__in=amounts, inventory__gte=amount).update(
+            inventory=F("inventory") - amount,
+            copies_on_loan=F("copies_on_loan") + amount,
+            **availability,
+        )
+        if updated:
+            invalidate_books(amounts)
+        return updated == len(amounts)
+
+    def increase_inventory_bulk(
+        self,
+        amounts: dict[int, int],
+        due_date: Optional[datetime.date] = None,
+        on_hold: Optional[dict[int, int]] = None,
+    ) -> None:
+        """Put back several copies of several books, due_date is the earliest
+        due date of the returned borrowings. on_hold tells how many of the
+        copies of each book are put on hold instead of the inventory."""
+        amount = self._amount_per_book(amounts)
+        held = {}
+        if on_hold:
+            held["copies_on_hold"] = F("copies_on_hold") + self._amount_per_book(
+                {book_id: on_hold.get(book_id, 0) for book_id in amounts}
+            )
+            available = self._amount_per_book(
+                {
+                    book_id: count - on_hold.get(book_id, 0)
+                    for book_id, count in amounts.items()
+                }
+            )
+        else:
+            available = amount
+        availability = {}
+        if due_date is not None:
+            availability["next_due_date"] = self._next_due_date_after_return(due_date)
+        self.filter(pk__in=amounts).update(
+            inventory=F("inventory") + available,
+            copies_on_loan=Greatest(F("copies_on_loan") - amount, Value(0)),
+            **held,
+            **availability,
+        )
+        invalidate_books(amounts)
+
+    def release_held_copies(self, amounts: dict[int, int]) -> None:
+        """Put copies on hold back to the inventory of their books."""
+        amount = self._amount_per_book(amounts)
+        self.filter(pk__in=amounts).update(
+            inventory=F("inventory") + amount,
+            copies_on_hold=Greatest(F("copies_on_hold") - amount, Value(0)),
+        )
+        invalidate_books(amounts)
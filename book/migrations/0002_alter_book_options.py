@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:16
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="book",
+            options={"ordering": ["title", "id"]},
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE book_fts USING fts5(
+        title, author, content='book_book', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER book_fts_insert AFTER INSERT ON book_book
+    BEGIN
+        INSERT INTO book_fts(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    """
+    CREATE TRIGGER book_fts_delete AFTER DELETE ON book_book
+    BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    """
+    CREATE TRIGGER book_fts_update AFTER UPDATE OF title, author ON book_book
+    BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO book_fts(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    "INSERT INTO book_fts(book_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS book_fts_insert",
+    "DROP TRIGGER IF EXISTS book_fts_delete",
+    "DROP TRIGGER IF EXISTS book_fts_update",
+    "DROP TABLE IF EXISTS book_fts",
+]
+
+POSTGRESQL_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX book_search_vector_idx ON book_book USING gin (
+        (setweight(to_tsvector('simple', title), 'A')
+        || setweight(to_tsvector('simple', author), 'B'))
+    )
+    """,
+    """
+    CREATE INDEX book_search_trigram_idx ON book_book USING gin (
+        (title || ' ' || author) gin_trgm_ops
+    )
+    """,
+]
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS book_search_vector_idx",
+    "DROP INDEX IF EXISTS book_search_trigram_idx",
+]
+
+
+def run_for_vendor(statements: dict[str, list[str]]):
+    def run(apps, schema_editor) -> None:
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0002_alter_book_options"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(
+                {"sqlite": SQLITE_FORWARD, "postgresql": POSTGRESQL_FORWARD}
+            ),
+            run_for_vendor(
+                {"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRESQL_BACKWARD}
+            ),
+        ),
+    ]
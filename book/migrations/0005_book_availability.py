@@ -0,0 +1,46 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:02
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def compute_availability(apps, schema_editor) -> None:
+    Book = apps.get_model("book", "Book")
+    Borrowing = apps.get_model("borrowing", "Borrowing")
+
+    active = (
+        Borrowing.objects.filter(book=OuterRef("pk"), actual_return_date__isnull=True)
+        .order_by()
+        .values("book")
+    )
+    Book.objects.using(schema_editor.connection.alias).update(
+        copies_on_loan=Coalesce(
+            Subquery(active.annotate(count=Count("pk")).values("count")), 0
+        ),
+        next_due_date=Subquery(
+            active.annotate(due=Min("expected_return_date")).values("due")
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0004_book_book_title_id_idx"),
+        ("borrowing", "0006_overduenotificationrun"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="copies_on_loan",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="next_due_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(compute_availability, migrations.RunPython.noop),
+    ]
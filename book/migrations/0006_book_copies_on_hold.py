@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0005_book_availability"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="copies_on_hold",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from book.managers import BookManager
+
 
 class Book(models.Model):
     class CoverChoices(models.IntegerChoices):
@@ -9,15 +11,29 @@ class Book(models.Model):
     title = models.CharField(max_length=100)
     author = models.CharField(max_length=100)
     cover = models.IntegerField(choices=CoverChoices)
+    # Copies available for borrowing, the others are on loan or on hold.
     inventory = models.PositiveIntegerField()
     daily_fee = models.DecimalField(max_digits=5, decimal_places=2)
+    copies_on_loan = models.PositiveIntegerField(default=0)
+    # Returned copies kept for the ready holds, see borrowing/holds.py.
+    copies_on_hold = models.PositiveIntegerField(default=0)
+    next_due_date = models.DateField(blank=True, null=True)
+
+    objects = BookManager()
 
     class Meta:
-        ordering = ["title"]
+        ordering = ["title", "id"]
+        indexes = [
+            models.Index(fields=["title", "id"], name="book_title_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.inventory} {self.title}"
 
+    @property
+    def total_copies(self) -> int:
+        return self.inventory + self.copies_on_loan + self.copies_on_hold
+
     @property
     def daily_fee_display(self) -> str:
         return f"{self.daily_fee}$"
@@ -0,0 +1,158 @@
+"""Full-text search over book titles and authors.
+
+On SQLite the catalog is indexed by the ``book_fts`` FTS5 table with the
+trigram tokenizer, kept in sync with ``book_book`` by triggers. On PostgreSQL
+a GIN index on a weighted tsvector serves prefix queries and a pg_trgm GIN
+index serves fuzzy ones. Both are created by the ``0003_book_search`` migration.
+
+A query first matches books containing every term (as a prefix or substring);
+only if nothing matches it falls back to fuzzy matching, so that a typo still
+finds the book. Matches are annotated with ``search_rank``, lower is better.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_RANK = "search_rank"
+
+SQLITE_FTS_TABLE = "book_fts"
+SQLITE_TRIGGERS = {
+    "book_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS book_fts_insert AFTER INSERT ON book_book
+        BEGIN
+            INSERT INTO book_fts(rowid, title, author)
+            VALUES (new.id, new.title, new.author);
+        END
+    """,
+    "book_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS book_fts_delete AFTER DELETE ON book_book
+        BEGIN
+            INSERT INTO book_fts(book_fts, rowid, title, author)
+            VALUES ('delete', old.id, old.title, old.author);
+        END
+    """,
+    "book_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS book_fts_update
+        AFTER UPDATE OF title, author ON book_book
+        BEGIN
+            INSERT INTO book_fts(book_fts, rowid, title, author)
+            VALUES ('delete', old.id, old.title, old.author);
+            INSERT INTO book_fts(rowid, title, author)
+            VALUES (new.id, new.title, new.author);
+        END
+    """,
+}
+# Title matches weigh more than author matches.
+SQLITE_RANK = "bm25(book_fts, 10.0, 5.0)"
+
+POSTGRESQL_VECTOR = (
+    "(setweight(to_tsvector('simple', book_book.title), 'A')"
+    " || setweight(to_tsvector('simple', book_book.author), 'B'))"
+)
+POSTGRESQL_DOCUMENT = "(book_book.title || ' ' || book_book.author)"
+
+TRIGRAM_LENGTH = 3
+
+
+def get_terms(query: str) -> list[str]:
+    return re.findall(r"[^\W_]+", query.lower())
+
+
+def get_trigrams(terms: list[str]) -> list[str]:
+    return list(
+        dict.fromkeys(
+            term[start : start + TRIGRAM_LENGTH]
+            for term in terms
+            for start in range(len(term) - TRIGRAM_LENGTH + 1)
+        )
+    )
+
+
+def search_contains(queryset: QuerySet, terms: list[str]) -> QuerySet:
+    """Unindexed fallback for other databases and for terms too short
+    for the trigram index."""
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(author__icontains=term))
+    return queryset.annotate(**{SEARCH_RANK: Value(0.0, output_field=FloatField())})
+
+
+def search_sqlite(queryset: QuerySet, terms: list[str], fuzzy: bool) -> QuerySet:
+    if fuzzy:
+        match = " OR ".join(f'"{trigram}"' for trigram in get_trigrams(terms))
+    else:
+        match = " ".join(f'"{term}"' for term in terms)
+    return queryset.extra(
+        tables=[SQLITE_FTS_TABLE],
+        where=[
+            f"{SQLITE_FTS_TABLE}.rowid = book_book.id",
+            f"{SQLITE_FTS_TABLE} MATCH %s",
+        ],
+        params=[match],
+    ).annotate(**{SEARCH_RANK: RawSQL(SQLITE_RANK, (), output_field=FloatField())})
+
+
+def search_postgresql(queryset: QuerySet, terms: list[str], fuzzy: bool) -> QuerySet:
+    if fuzzy:
+        param = " ".join(terms)
+        condition = f"%s <%% {POSTGRESQL_DOCUMENT}"
+        rank = f"-word_similarity(%s, {POSTGRESQL_DOCUMENT})"
+    else:
+        param = " & ".join(f"{term}:*" for term in terms)
+        condition = f"{POSTGRESQL_VECTOR} @@ to_tsquery('simple', %s)"
+        rank = f"-ts_rank({POSTGRESQL_VECTOR}, to_tsquery('simple', %s))"
+    return queryset.filter(
+        RawSQL(condition, (param,), output_field=BooleanField())
+    ).annotate(**{SEARCH_RANK: RawSQL(rank, (param,), output_field=FloatField())})
+
+
+def search_books(queryset: QuerySet, query: str) -> QuerySet:
+    """Filter books matching the query and order them by relevance."""
+    terms = get_terms(query)
+    if not terms:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite" and any(len(term) >= TRIGRAM_LENGTH for term in terms):
+        search = search_sqlite
+        terms = [term for term in terms if len(term) >= TRIGRAM_LENGTH]
+    elif vendor == "postgresql":
+        search = search_postgresql
+    else:
+        return search_contains(queryset, terms).order_by(SEARCH_RANK, "id")
+
+    results = search(queryset, terms, fuzzy=False)
+    if not results.exists():
+        results = search(queryset, terms, fuzzy=True)
+    return results.order_by(SEARCH_RANK, "id")
+
+
+def install_sqlite_triggers(using: str) -> None:
+    """Recreate the sync triggers if they are missing and rebuild the index.
+
+    SQLite has no ALTER for most column changes, so Django rebuilds
+    ``book_book`` from a copy in later migrations, which drops its triggers."""
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [SQLITE_FTS_TABLE],
+        )
+        if cursor.fetchone() is None:
+            return
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+            ["book_book"],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing.issuperset(SQLITE_TRIGGERS):
+            return
+        for sql in SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"
+        )
@@ -1,10 +1,13 @@
+from django.db.models import QuerySet
 from rest_framework import serializers
 
 from book.models import Book
+from library_service.timing import TimedSerializerMixin, timer
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     cover = serializers.CharField(source="get_cover_display", read_only=True)
+    total_copies = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Book
@@ -14,11 +17,69 @@ class BookSerializer(serializers.ModelSerializer):
             "author",
             "cover",
             "inventory",
+            "total_copies",
+            "next_due_date",
             "daily_fee_display",
         ]
 
 
-class BookCreateSerializer(serializers.ModelSerializer):
+class BookValuesSerializer:
+    """Fast read-only equivalent of BookSerializer for lists.
+
+    Builds the same output straight from ``values_list()`` rows, skipping
+    model instances and DRF fields. Rows are named tuples, so pagination
+    can still read the ordering fields from them."""
+
+    fields = [
+        "id",
+        "title",
+        "author",
+        "cover",
+        "inventory",
+        "copies_on_loan",
+        "copies_on_hold",
+        "next_due_date",
+        "daily_fee",
+    ]
+    cover_labels = {value: str(label) for value, label in Book.CoverChoices.choices}
+
+    @classmethod
+    def get_rows(cls, queryset: QuerySet) -> QuerySet:
+        return queryset.values_list(
+            *cls.fields, *queryset.query.annotations, named=True
+        )
+
+    @classmethod
+    @timer("serialize")
+    def serialize(cls, rows: list[tuple]) -> list[dict]:
+        cover_labels = cls.cover_labels
+        return [
+            {
+                "id": book_id,
+                "title": title,
+                "author": author,
+                "cover": cover_labels.get(cover, str(cover)),
+                "inventory": inventory,
+                "total_copies": inventory + copies_on_loan + copies_on_hold,
+                "next_due_date": next_due_date.isoformat() if next_due_date else None,
+                "daily_fee_display": f"{daily_fee}$",
+            }
+            for (
+                book_id,
+                title,
+                author,
+                cover,
+                inventory,
+                copies_on_loan,
+                copies_on_hold,
+                next_due_date,
+                daily_fee,
+                *_,
+            ) in rows
+        ]
+
+
+class BookCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Book
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from book.cache import invalidate_books
+from book.models import Book
+from book.search import install_sqlite_triggers
+
+
+@receiver([post_save, post_delete], sender=Book)
+def invalidate_book_cache(sender, instance: Book, **kwargs) -> None:
+    invalidate_books([instance.pk])
+
+
+@receiver(post_migrate)
+def install_search_triggers(sender, using: str, **kwargs) -> None:
+    if sender.name == "book":
+        install_sqlite_triggers(using)
@@ -47,7 +47,7 @@ class UnAuthenticatedBookApiTest(APITestCase):
 
         qs = Book.objects.all()
         serializer = BookSerializer(qs, many=True)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_retrieve(self) -> None:
         response = self.client.get(self.detail_url)
@@ -99,7 +99,7 @@ class AuthenticatedBookApiTest(APITestCase):
 
         qs = Book.objects.all()
         serializer = BookSerializer(qs, many=True)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_retrieve(self) -> None:
         response = self.client.get(self.detail_url)
@@ -151,7 +151,7 @@ class IsAdminBookApiTest(APITestCase):
 
         qs = Book.objects.all()
         serializer = BookSerializer(qs, many=True)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_book_retrieve(self) -> None:
         response = self.client.get(self.detail_url)
@@ -0,0 +1,144 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from book.cache import BOOK_VERSION_KEY
+from book.models import Book
+from book.tests.test_book_api import BOOK_DETAIL_VIEW_NAME, BOOK_LIST_URL, sample_book
+
+
+class BookCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.book = sample_book(inventory=5)
+        self.detail_url = reverse(BOOK_DETAIL_VIEW_NAME, kwargs={"pk": self.book.id})
+        self.client = APIClient()
+
+    def test_cached_list_does_not_query_database(self) -> None:
+        first_response = self.client.get(BOOK_LIST_URL)
+
+        with self.assertNumQueries(0):
+            second_response = self.client.get(BOOK_LIST_URL)
+
+        self.assertEqual(second_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(second_response.data, first_response.data)
+
+    def test_cached_detail_does_not_query_database(self) -> None:
+        self.client.get(self.detail_url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.data["id"], self.book.id)
+
+    def test_query_parameters_are_cached_separately(self) -> None:
+        sample_book()
+        self.client.get(BOOK_LIST_URL)
+
+        response = self.client.get(BOOK_LIST_URL + "?page_size=1")
+
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_book_changes_invalidate_cache(self) -> None:
+        self.client.get(BOOK_LIST_URL)
+        self.client.get(self.detail_url)
+
+        self.book.title = "updated title"
+        self.book.save()
+
+        self.assertEqual(
+            self.client.get(BOOK_LIST_URL).data["results"][0]["title"],
+            "updated title",
+        )
+        self.assertEqual(
+            self.client.get(self.detail_url).data["title"], "updated title"
+        )
+
+    def test_book_delete_invalidates_cache(self) -> None:
+        self.client.get(BOOK_LIST_URL)
+
+        self.book.delete()
+
+        self.assertEqual(self.client.get(BOOK_LIST_URL).data["results"], [])
+        self.assertEqual(
+            self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_detail_with_leading_zeros_is_invalidated(self) -> None:
+        url = BOOK_LIST_URL + f"0{self.book.id}/"
+        self.client.get(url)
+
+        self.book.title = "updated title"
+        self.book.save()
+
+        self.assertEqual(self.client.get(url).data["title"], "updated title")
+
+    def test_missing_book_creates_no_version(self) -> None:
+        for path in ["abc", "1_0", str(self.book.id + 1)]:
+            with self.subTest(path=path):
+                response = self.client.get(BOOK_LIST_URL + f"{path}/")
+
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(cache.get(BOOK_VERSION_KEY.format(book_id=10)))
+        self.assertIsNone(cache.get(BOOK_VERSION_KEY.format(book_id=self.book.id + 1)))
+
+    def test_inventory_changes_invalidate_cache(self) -> None:
+        self.client.get(self.detail_url)
+
+        Book.objects.decrease_inventory(self.book.id)
+        self.assertEqual(self.client.get(self.detail_url).data["inventory"], 4)
+
+        Book.objects.increase_inventory_bulk({self.book.id: 2})
+        self.assertEqual(self.client.get(self.detail_url).data["inventory"], 6)
+
+    def test_borrowing_invalidates_cache(self) -> None:
+        user = get_user_model().objects.create_user(email="test@test.com")
+        self.client.get(BOOK_LIST_URL)
+        self.client.force_authenticate(user=user)
+
+        self.client.post(
+            reverse("borrowing:borrowing-list"),
+            data={
+                "book": self.book.id,
+                "expected_return_date": datetime.date.today()
+                + datetime.timedelta(days=1),
+            },
+        )
+
+        response = self.client.get(BOOK_LIST_URL)
+        self.assertEqual(response.data["results"][0]["inventory"], 4)
+
+    def test_etag_returns_not_modified(self) -> None:
+        response = self.client.get(self.detail_url)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.book.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_last_modified_returns_not_modified(self) -> None:
+        response = self.client.get(BOOK_LIST_URL)
+
+        response = self.client.get(
+            BOOK_LIST_URL, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_depends_on_query_parameters(self) -> None:
+        response = self.client.get(BOOK_LIST_URL)
+
+        response = self.client.get(
+            BOOK_LIST_URL + "?page_size=1", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,55 @@
+import json
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.http import urlencode
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from book.models import Book
+from book.serializers import BookSerializer
+from book.tests.test_book_pagination import create_books
+
+BOOK_EXPORT_URL = reverse("book:book-export")
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class BookExportApiTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        create_books(5)
+
+    def test_export_streams_all_books_in_chunks(self) -> None:
+        response = self.client.get(BOOK_EXPORT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(
+            json.loads(b"".join(chunks)),
+            BookSerializer(Book.objects.all(), many=True).data,
+        )
+
+    def test_export_applies_filters(self) -> None:
+        Book.objects.filter(title="book 001").update(inventory=0)
+
+        response = self.client.get(
+            BOOK_EXPORT_URL + "?" + urlencode({"is_available": False})
+        )
+
+        self.assertEqual(
+            [
+                book["title"]
+                for book in json.loads(b"".join(response.streaming_content))
+            ],
+            ["book 001"],
+        )
+
+    def test_export_of_no_books_is_an_empty_array(self) -> None:
+        Book.objects.all().delete()
+
+        response = self.client.get(BOOK_EXPORT_URL)
+
+        self.assertEqual(b"".join(response.streaming_content), b"[]")
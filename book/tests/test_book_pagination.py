@@ -0,0 +1,117 @@
+import base64
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import urlencode
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from book.models import Book
+from book.tests.test_book_api import BOOK_LIST_URL
+
+
+def collect_pages(client: APIClient, url: str, link: str = "next") -> list[list[int]]:
+    """Follow pagination links and return ids of results of every page."""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK, response.data
+        pages.append([item["id"] for item in response.data["results"]])
+        url = response.data[link]
+    return pages
+
+
+def create_books(count: int, title: str = None) -> list[Book]:
+    return Book.objects.bulk_create(
+        Book(
+            title=title or f"book {number:03}",
+            author="author",
+            cover=Book.CoverChoices.HARD,
+            inventory=1,
+            daily_fee=0.25,
+        )
+        for number in range(count)
+    )
+
+
+class BookPaginationTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_pages_follow_title_and_id_ordering(self) -> None:
+        create_books(3, title="same title")
+        create_books(4)
+        create_books(2, title="a title")
+
+        pages = collect_pages(
+            self.client, BOOK_LIST_URL + "?" + urlencode({"page_size": 2})
+        )
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 2, 1])
+        self.assertEqual(
+            [book_id for page in pages for book_id in page],
+            list(Book.objects.values_list("id", flat=True)),
+        )
+
+    def test_previous_links_walk_back_to_the_first_page(self) -> None:
+        create_books(7, title="same title")
+        url = BOOK_LIST_URL + "?" + urlencode({"page_size": 3})
+        forward_pages = collect_pages(self.client, url)
+
+        response = self.client.get(url)
+        while response.data["next"]:
+            last_page_url = response.data["next"]
+            response = self.client.get(last_page_url)
+        backward_pages = collect_pages(
+            self.client, response.data["previous"], link="previous"
+        )
+
+        self.assertEqual(backward_pages, forward_pages[-2::-1])
+
+    def test_page_size_is_capped(self) -> None:
+        create_books(105)
+
+        response = self.client.get(BOOK_LIST_URL + "?" + urlencode({"page_size": 1000}))
+
+        self.assertEqual(len(response.data["results"]), 100)
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_default_page_size(self) -> None:
+        create_books(25)
+
+        response = self.client.get(BOOK_LIST_URL)
+
+        self.assertEqual(len(response.data["results"]), 20)
+
+    def test_invalid_cursor(self) -> None:
+        for cursor in ("invalid", "eyJwIjogWzFdLCAiciI6IDB9"):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    BOOK_LIST_URL + "?" + urlencode({"cursor": cursor})
+                )
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_values_of_wrong_type(self) -> None:
+        for position in (["title", "id"], ["title", None], ["title", [1]]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps({"p": position, "r": 0}).encode()
+            ).decode()
+            with self.subTest(position=position):
+                response = self.client.get(
+                    BOOK_LIST_URL + "?" + urlencode({"cursor": cursor})
+                )
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deep_page_uses_keyset_instead_of_offset(self) -> None:
+        create_books(30)
+        response = self.client.get(BOOK_LIST_URL + "?" + urlencode({"page_size": 10}))
+        next_url = self.client.get(response.data["next"]).data["next"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(next_url)
+
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("OFFSET", queries[0]["sql"].upper())
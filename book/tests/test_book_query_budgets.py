@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from book.tests.test_book_api import BOOK_DETAIL_VIEW_NAME, BOOK_LIST_URL
+from book.tests.test_book_export import BOOK_EXPORT_URL
+from book.tests.test_book_pagination import create_books
+from book.views import BookViewSet
+from borrowing.tests.test_borrowing_api import sample_borrowing
+from library_service.testing import QueryBudgetTestMixin
+
+BOOK_PAYLOAD = {
+    "title": "Title",
+    "author": "Author",
+    "cover": 0,
+    "inventory": 5,
+    "daily_fee": "1.00",
+}
+
+
+class BookQueryBudgetTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        admin = get_user_model().objects.create_superuser(email="admin@test.com")
+        self.authenticate(admin)
+        self.book = create_books(10)[0]
+        for _ in range(3):
+            sample_borrowing(user=admin, book=self.book)
+        self.detail_url = reverse(BOOK_DETAIL_VIEW_NAME, args=[self.book.id])
+
+    def test_budgets_are_declared_for_every_action(self) -> None:
+        self.assertQueryBudgetsDeclared(BookViewSet)
+
+    def test_list(self) -> None:
+        for query in ["", "?search=book", "?is_available=true&cover=0"]:
+            with self.assertQueryBudget(BookViewSet, "list"):
+                response = self.client.get(BOOK_LIST_URL + query)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve(self) -> None:
+        with self.assertQueryBudget(BookViewSet, "retrieve"):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_export(self) -> None:
+        with self.assertQueryBudget(BookViewSet, "export"):
+            response = self.client.get(BOOK_EXPORT_URL + "?search=book")
+            b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_create(self) -> None:
+        with self.assertQueryBudget(BookViewSet, "create"):
+            response = self.client.post(BOOK_LIST_URL, BOOK_PAYLOAD)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_update(self) -> None:
+        with self.assertQueryBudget(BookViewSet, "update"):
+            response = self.client.put(self.detail_url, BOOK_PAYLOAD)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_partial_update(self) -> None:
+        with self.assertQueryBudget(BookViewSet, "partial_update"):
+            response = self.client.patch(self.detail_url, {"inventory": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_destroy(self) -> None:
+        with self.assertQueryBudget(BookViewSet, "destroy"):
+            response = self.client.delete(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
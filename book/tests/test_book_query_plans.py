@@ -0,0 +1,15 @@
+from django.db import connection
+from django.test import TestCase
+
+from book.models import Book
+
+
+class BookQueryPlanTest(TestCase):
+    def test_catalog_page_uses_title_index(self) -> None:
+        if connection.vendor != "sqlite":
+            self.skipTest(f"Query plans are not checked on {connection.vendor}")
+
+        plan = Book.objects.filter(title__gte="m")[:20].explain()
+
+        self.assertIn("book_title_id_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
@@ -0,0 +1,124 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import urlencode
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from book.models import Book
+from book.search import install_sqlite_triggers
+from book.tests.test_book_api import BOOK_LIST_URL, sample_book
+from book.tests.test_book_pagination import collect_pages, create_books
+
+
+def search_url(**params) -> str:
+    return BOOK_LIST_URL + "?" + urlencode(params)
+
+
+class BookSearchApiTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        create_books(10, title="filler")
+        self.potter = sample_book(title="Harry Potter", author="Joanne Rowling")
+        self.hobbit = sample_book(title="The Hobbit", author="John Tolkien")
+        self.potts = sample_book(title="Cooking", author="Harriet Potts")
+
+    def search(self, query: str) -> list[int]:
+        response = self.client.get(search_url(search=query))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book["id"] for book in response.data["results"]]
+
+    def test_search_matches_prefix_of_title_and_author(self) -> None:
+        self.assertEqual(self.search("hobb"), [self.hobbit.id])
+        self.assertEqual(self.search("tolk"), [self.hobbit.id])
+        self.assertEqual(self.search("harry pot"), [self.potter.id])
+
+    def test_title_matches_rank_above_author_matches(self) -> None:
+        self.assertEqual(self.search("pott"), [self.potter.id, self.potts.id])
+
+    def test_search_falls_back_to_fuzzy_matching(self) -> None:
+        self.assertEqual(self.search("hary poter")[0], self.potter.id)
+        self.assertEqual(self.search("hobit"), [self.hobbit.id])
+
+    def test_short_terms_are_matched_by_substring(self) -> None:
+        self.assertEqual(self.search("ob"), [self.hobbit.id])
+
+    @skipUnless(connection.vendor == "sqlite", "checks the FTS5 query")
+    def test_search_uses_full_text_index(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            self.search("hobbit")
+
+        self.assertIn("book_fts MATCH", queries[-1]["sql"])
+
+    def test_search_results_are_paginated_by_rank(self) -> None:
+        create_books(7, title="paginated potter")
+        url = search_url(search="potter", page_size=3)
+
+        pages = collect_pages(self.client, url)
+        book_ids = [book_id for page in pages for book_id in page]
+
+        self.assertEqual(book_ids, self.search("potter"))
+        self.assertEqual(len(book_ids), 8)
+        self.assertEqual(len(set(book_ids)), 8)
+
+    def test_index_follows_updates_and_deletes(self) -> None:
+        self.hobbit.title = "The Silmarillion"
+        self.hobbit.save()
+        self.potter.delete()
+
+        self.assertEqual(self.search("silmar"), [self.hobbit.id])
+        self.assertNotIn(self.hobbit.id, self.search("hobbit"))
+        self.assertNotIn(self.potter.id, self.search("harry potter"))
+
+
+class BookFilterApiTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.hard = sample_book(cover=Book.CoverChoices.HARD, inventory=0, daily_fee=1)
+        self.soft = sample_book(cover=Book.CoverChoices.SOFT, inventory=3, daily_fee=2)
+
+    def filter(self, **params) -> set[int]:
+        response = self.client.get(search_url(**params))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {book["id"] for book in response.data["results"]}
+
+    def test_filter_by_cover(self) -> None:
+        self.assertEqual(self.filter(cover=Book.CoverChoices.SOFT), {self.soft.id})
+
+    def test_filter_by_availability(self) -> None:
+        self.assertEqual(self.filter(is_available=True), {self.soft.id})
+        self.assertEqual(self.filter(is_available=False), {self.hard.id})
+
+    def test_filter_by_daily_fee_range(self) -> None:
+        self.assertEqual(self.filter(daily_fee_min=1.5), {self.soft.id})
+        self.assertEqual(self.filter(daily_fee_max=1.5), {self.hard.id})
+        self.assertEqual(
+            self.filter(daily_fee_min=1, daily_fee_max=2),
+            {self.hard.id, self.soft.id},
+        )
+
+    def test_filters_combine_with_search(self) -> None:
+        self.soft.title = "Available title"
+        self.soft.save()
+        self.hard.title = "Unavailable title"
+        self.hard.save()
+
+        self.assertEqual(self.filter(search="title", is_available=True), {self.soft.id})
+
+
+@skipUnless(connection.vendor == "sqlite", "FTS5 triggers exist only on SQLite")
+class SearchTriggersTest(TestCase):
+    def test_missing_triggers_are_restored_and_index_rebuilt(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER book_fts_insert")
+        book = sample_book(title="Unindexed")
+
+        install_sqlite_triggers(connection.alias)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT rowid FROM book_fts WHERE book_fts MATCH %s", ['"unindexed"']
+            )
+            self.assertEqual(cursor.fetchall(), [(book.id,)])
@@ -0,0 +1,59 @@
+import datetime
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIClient
+
+from book.models import Book
+from book.search import search_books
+from book.serializers import BookSerializer, BookValuesSerializer
+from book.tests.test_book_api import BOOK_LIST_URL, sample_book
+
+
+def render(data) -> bytes:
+    return JSONRenderer().render(data)
+
+
+class BookValuesSerializerParityTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        sample_book(cover=Book.CoverChoices.HARD, inventory=0, daily_fee=0.25)
+        sample_book(
+            cover=Book.CoverChoices.SOFT,
+            inventory=15,
+            daily_fee=1,
+            copies_on_loan=3,
+            next_due_date=datetime.date(2026, 1, 2),
+        )
+        sample_book(title='Überbuch «déjà vu» "quoted"', daily_fee=999.99)
+        sample_book(title="", author="", daily_fee=0)
+
+    def assert_same_output(self, queryset) -> None:
+        self.assertEqual(
+            render(
+                BookValuesSerializer.serialize(BookValuesSerializer.get_rows(queryset))
+            ),
+            render(BookSerializer(queryset, many=True).data),
+        )
+
+    def test_output_is_identical_to_book_serializer(self) -> None:
+        self.assert_same_output(Book.objects.all())
+
+    def test_output_is_identical_for_annotated_queryset(self) -> None:
+        queryset = search_books(Book.objects.all(), "buch")
+
+        self.assertTrue(queryset.exists())
+        self.assert_same_output(queryset)
+
+    def test_list_response_is_identical_to_book_serializer(self) -> None:
+        response = self.client.get(BOOK_LIST_URL)
+
+        self.assertEqual(
+            response.content,
+            render(
+                {
+                    "next": None,
+                    "previous": None,
+                    "results": BookSerializer(Book.objects.all(), many=True).data,
+                }
+            ),
+        )
@@ -1,26 +1,114 @@
 from typing import Type, Any
 
+from django.conf import settings
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 
+from book.cache import (
+    aget_cached_book_response,
+    aget_cached_response,
+    aget_catalog_version,
+    get_cached_book_response,
+    get_cached_response,
+    get_catalog_version,
+)
+from book.filters import BookFilter, BookSearchFilterBackend
 from book.models import Book
 from book.permissions import IsAdminOrReadOnly
-from book.serializers import BookSerializer, BookCreateSerializer
+from book.serializers import (
+    BookSerializer,
+    BookCreateSerializer,
+    BookValuesSerializer,
+)
+from library_service.renderers import StreamingJSONResponse
+from library_service.viewsets import AsyncViewSetMixin
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(AsyncViewSetMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     permission_classes = [IsAdminOrReadOnly]
+    filter_backends = [DjangoFilterBackend, BookSearchFilterBackend]
+    filterset_class = BookFilter
+    query_budgets = {
+        "list": 2,
+        "retrieve": 1,
+        "export": 2,
+        "create": 1,
+        "update": 2,
+        "partial_update": 2,
+        "destroy": 7,
+    }
 
     def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """Return a list of books."""
-        return super().list(request, *args, **kwargs)
+        return get_cached_response(
+            request,
+            get_catalog_version(),
+            lambda: self.list_values(request),
+        )
+
+    def list_values(self, request: Request) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = BookValuesSerializer.get_rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(BookValuesSerializer.serialize(page))
+        return Response(BookValuesSerializer.serialize(rows))
+
+    async def alist(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return await aget_cached_response(
+            request,
+            await aget_catalog_version(),
+            lambda: self.alist_values(request, BookValuesSerializer),
+        )
+
+    @extend_schema(responses=BookSerializer(many=True))
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path="export",
+        url_name="export",
+        pagination_class=None,
+    )
+    def export(self, request: Request) -> StreamingJSONResponse:
+        """Stream all books matching the filters as one JSON array,
+        without pagination."""
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = BookValuesSerializer.get_rows(queryset)
+        return StreamingJSONResponse(
+            rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE),
+            BookValuesSerializer.serialize,
+            settings.EXPORT_CHUNK_SIZE,
+        )
 
     def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """Retrieve a book detail by its ID."""
-        return super().retrieve(request, *args, **kwargs)
+        return get_cached_book_response(
+            request,
+            self.get_book_id(),
+            lambda: super(BookViewSet, self).retrieve(request, *args, **kwargs),
+        )
+
+    async def aretrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        async def build_response() -> Response:
+            return Response(self.get_serializer(await self.aget_object()).data)
+
+        return await aget_cached_book_response(
+            request, self.get_book_id(), build_response
+        )
+
+    def get_book_id(self) -> int:
+        """The id of the book in the URL, part of its cache keys."""
+        try:
+            return int(self.kwargs[self.lookup_field])
+        except ValueError:
+            raise NotFound
 
     def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """Create a new book. Available only for an admin."""
@@ -39,6 +127,6 @@ class BookViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
     def get_serializer_class(self) -> Type[Serializer]:
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "export"]:
             return BookSerializer
         return BookCreateSerializer
@@ -0,0 +1,106 @@
+"""Availability of the books, denormalized from their active borrowings.
+
+Book.inventory counts the copies available for borrowing, Book.copies_on_loan
+the copies on loan and Book.next_due_date is the earliest due date of those.
+Book.copies_on_hold counts the copies kept for ready holds. The borrow and
+return transactions keep them up to date, see BookManager.decrease_inventory()
+and increase_inventory(). Borrowings changed in other ways make them drift
+until rebuild_book_availability() recomputes them from the borrowings and
+the holds.
+"""
+
+import datetime
+
+from django.db import transaction
+from django.db.models import Count, F, Min, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from book.cache import invalidate_books
+from book.models import Book
+from borrowing.models import Borrowing, Hold
+
+
+def get_actual_availability() -> dict:
+    """Correlated subqueries of the copies on loan, the next due date and
+    the copies on hold of the outer book, by field."""
+    active = (
+        Borrowing.objects.filter(book=OuterRef("pk"), actual_return_date__isnull=True)
+        .order_by()
+        .values("book")
+    )
+    return {
+        "copies_on_loan": Coalesce(
+            Subquery(active.annotate(count=Count("pk")).values("count")), 0
+        ),
+        "next_due_date": Subquery(
+            active.annotate(due=Min("expected_return_date")).values("due")
+        ),
+        "copies_on_hold": Coalesce(
+            Subquery(
+                Hold.objects.filter(
+                    book=OuterRef("pk"), status=Hold.StatusChoices.READY
+                )
+                .order_by()
+                .values("book")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        ),
+    }
+
+
+def get_drifted_books() -> QuerySet:
+    """Books whose availability differs from their borrowings, annotated
+    with the ``actual_`` values."""
+    actual = get_actual_availability()
+    # NULL never equals NULL, compare the due dates with a placeholder instead.
+    no_date = Value(datetime.date.min)
+    return (
+        Book.objects.annotate(
+            actual_copies_on_loan=actual["copies_on_loan"],
+            actual_next_due_date=actual["next_due_date"],
+            actual_copies_on_hold=actual["copies_on_hold"],
+        )
+        .alias(
+            stored_due=Coalesce(F("next_due_date"), no_date),
+            actual_due=Coalesce(F("actual_next_due_date"), no_date),
+        )
+        .filter(
+            ~Q(copies_on_loan=F("actual_copies_on_loan"))
+            | ~Q(stored_due=F("actual_due"))
+            | ~Q(copies_on_hold=F("actual_copies_on_hold"))
+        )
+        .order_by("pk")
+    )
+
+
+def find_availability_drift() -> list[dict]:
+    """Return the drifted books with the stored values and the ``actual_``
+    ones."""
+    return list(
+        get_drifted_books().values(
+            "pk",
+            "title",
+            "copies_on_loan",
+            "next_due_date",
+            "actual_copies_on_loan",
+            "actual_next_due_date",
+            "copies_on_hold",
+            "actual_copies_on_hold",
+        )
+    )
+
+
+def rebuild_book_availability() -> int:
+    """Recompute the availability of the drifted books and invalidate the
+    cached responses of those only. Returns the number of books updated."""
+    with transaction.atomic():
+        book_ids = list(get_drifted_books().values_list("pk", flat=True))
+        if not book_ids:
+            return 0
+        updated = Book.objects.filter(pk__in=book_ids).update(
+            **get_actual_availability()
+        )
+        invalidate_books(book_ids)
+    return updated
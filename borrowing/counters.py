@@ -0,0 +1,67 @@
+"""Counters of active and total borrowings, denormalized on the users.
+
+The borrow and return transactions keep them up to date, see
+UserManager.add_borrowings() and remove_active_borrowings(). Borrowings
+changed in other ways, e.g. in the admin or by a script, make them drift
+until reconcile_borrowing_counters() recomputes them from the borrowings.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from borrowing.models import Borrowing
+
+# Counter fields of the user and the borrowings they count.
+COUNTED_BORROWINGS = {
+    "active_borrowings_count": {"actual_return_date__isnull": True},
+    "total_borrowings_count": {},
+}
+RECONCILE_CHUNK_SIZE = 1000
+
+
+def count_borrowings(**filters) -> Coalesce:
+    """Count the borrowings of the outer user in a correlated subquery."""
+    borrowings = (
+        Borrowing.objects.filter(user=OuterRef("pk"), **filters)
+        .order_by()
+        .values("user")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(borrowings), 0)
+
+
+def find_counter_drift() -> list[dict]:
+    """Return the users whose counters differ from their borrowings, with
+    the stored counters and the ``actual_`` ones."""
+    drifted = Q()
+    annotations = {}
+    for field, filters in COUNTED_BORROWINGS.items():
+        annotations[f"actual_{field}"] = count_borrowings(**filters)
+        drifted |= ~Q(**{field: F(f"actual_{field}")})
+    return list(
+        get_user_model()
+        .objects.annotate(**annotations)
+        .filter(drifted)
+        .order_by("pk")
+        .values("pk", "email", *COUNTED_BORROWINGS, *annotations)
+    )
+
+
+def reconcile_borrowing_counters(fix: bool = True) -> list[dict]:
+    """Find the drifted counters and, unless fix is False, recompute them in
+    one UPDATE per chunk of users. Returns the drift found."""
+    drift = find_counter_drift()
+    if fix:
+        user_ids = [user["pk"] for user in drift]
+        for offset in range(0, len(user_ids), RECONCILE_CHUNK_SIZE):
+            get_user_model().objects.filter(
+                pk__in=user_ids[offset : offset + RECONCILE_CHUNK_SIZE]
+            ).update(
+                **{
+                    field: count_borrowings(**filters)
+                    for field, filters in COUNTED_BORROWINGS.items()
+                }
+            )
+    return drift
@@ -0,0 +1,130 @@
+"""Overdue fines of borrowings, kept in the ledger of the Fine model.
+
+A borrowing costs the daily fee of its book times BORROWING_FINE_MULTIPLIER
+for every day it is kept after the expected return date.
+
+accrue_fines() runs nightly and works on sets of rows rather than looping
+over the borrowings in Python. One INSERT ... SELECT adds a ledger row for
+every borrowing that became overdue, then one UPDATE per distinct
+``accrued_until`` day adds the days since to the unsettled rows of the
+unreturned borrowings. After the first run all of them share the same day,
+so a night is four statements whatever the number of loans, counting the
+lookup of borrowings returned outside of the API, whose fines it settles.
+Each statement commits on its own; an interrupted run is completed by the
+next one.
+
+settle_fines() runs in the transaction of a return and sets the exact fine
+of the returned borrowings, whether they were accrued before or not.
+"""
+
+import datetime
+from collections import defaultdict
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from book.models import Book
+from borrowing.models import Borrowing, Fine
+
+
+def insert_fines(until: datetime.date, condition: str, params: list) -> int:
+    """Add ledger rows, with no days accrued yet, for the borrowings matching
+    the condition that are overdue on the given day. Rows that exist already
+    are kept as they are."""
+    ops = connection.ops
+    fine_table = ops.quote_name(Fine._meta.db_table)
+    borrowing_table = ops.quote_name(Borrowing._meta.db_table)
+    book_table = ops.quote_name(Book._meta.db_table)
+    sql = f"""
+        {ops.insert_statement(on_conflict=OnConflict.IGNORE)} {fine_table}
+            (borrowing_id, user_id, daily_fee, days, amount, accrued_until,
+             is_settled)
+        SELECT borrowing.id, borrowing.user_id, book.daily_fee * %s, 0, 0,
+               borrowing.expected_return_date, %s
+        FROM {borrowing_table} borrowing
+        INNER JOIN {book_table} book ON book.id = borrowing.book_id
+        WHERE borrowing.expected_return_date < %s AND {condition}
+        AND NOT EXISTS (
+            SELECT 1 FROM {fine_table} fine
+            WHERE fine.borrowing_id = borrowing.id
+        )
+        {ops.on_conflict_suffix_sql([], OnConflict.IGNORE, None, None)}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [settings.BORROWING_FINE_MULTIPLIER, False, until, *params])
+        return cursor.rowcount
+
+
+def accrue_fines(until: Optional[datetime.date] = None) -> tuple[int, int]:
+    """Accrue the fines of the unreturned borrowings up to the given day,
+    today by default, and settle the fines of the borrowings returned
+    without settle_fines(). Returns the numbers of new and accrued ledger
+    rows."""
+    until = until or timezone.localdate()
+    returned = defaultdict(list)
+    for borrowing in Borrowing.objects.filter(
+        fine__is_settled=False, actual_return_date__isnull=False
+    ).only("expected_return_date", "actual_return_date"):
+        returned[borrowing.actual_return_date].append(borrowing)
+    for returned_on, borrowings in returned.items():
+        settle_fines(borrowings, returned_on)
+
+    created = insert_fines(until, "borrowing.actual_return_date IS NULL", [])
+
+    unsettled = Fine.objects.filter(
+        is_settled=False, borrowing__actual_return_date__isnull=True
+    )
+    days_accrued = (
+        unsettled.filter(accrued_until__lt=until)
+        .order_by("accrued_until")
+        .values_list("accrued_until", flat=True)
+        .distinct()
+    )
+    accrued = 0
+    for accrued_until in list(days_accrued):
+        days = (until - accrued_until).days
+        accrued += unsettled.filter(accrued_until=accrued_until).update(
+            days=F("days") + days,
+            amount=F("amount") + F("daily_fee") * days,
+            accrued_until=until,
+        )
+    return created, accrued
+
+
+def settle_fines(borrowings: list[Borrowing], returned_on: datetime.date) -> None:
+    """Set the exact fines of the borrowings returned on the given day in
+    two queries. Borrowings returned in time cost none."""
+    overdue = [
+        borrowing
+        for borrowing in borrowings
+        if borrowing.expected_return_date < returned_on
+    ]
+    if not overdue:
+        return
+
+    insert_fines(
+        returned_on,
+        f"borrowing.id IN ({', '.join(['%s'] * len(overdue))})",
+        [borrowing.pk for borrowing in overdue],
+    )
+    borrowings_by_days = defaultdict(list)
+    for borrowing in overdue:
+        days = (returned_on - borrowing.expected_return_date).days
+        borrowings_by_days[days].append(borrowing.pk)
+    days_overdue = Case(
+        *[
+            When(borrowing__in=borrowing_ids, then=Value(days))
+            for days, borrowing_ids in borrowings_by_days.items()
+        ],
+        output_field=PositiveIntegerField(),
+    )
+    Fine.objects.filter(borrowing__in=[borrowing.pk for borrowing in overdue]).update(
+        days=days_overdue,
+        amount=F("daily_fee") * days_overdue,
+        accrued_until=returned_on,
+        is_settled=True,
+    )
@@ -1,7 +1,5 @@
-from django.conf import settings
-import requests
-
-from borrowing.models import Borrowing
+from borrowing.models import Borrowing, BorrowingNotification
+from borrowing.telegram import get_telegram_client
 
 
 def get_borrowings_notification_message(borrowing: Borrowing) -> str:
@@ -15,15 +13,29 @@ def get_borrowings_notification_message(borrowing: Borrowing) -> str:
     )
 
 
+def send_telegram_message(text: str) -> None:
+    get_telegram_client().send_message(text)
+
+
 def send_telegram_borrowing_notification(borrowing: Borrowing) -> None:
-    url = f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_API_KEY}/sendMessage"
-    payload = {
-        "chat_id": settings.TELEGRAM_CHAT_ID,
-        "text": get_borrowings_notification_message(borrowing),
-    }
-    response = requests.post(url, data=payload)
+    send_telegram_message(get_borrowings_notification_message(borrowing))
 
-    if response.status_code != 200 or response.json().get("ok") is False:
-        print(response.json().get("errors"))
 
-    print("Notification sent successfully")
+def enqueue_borrowing_notification(borrowing: Borrowing) -> BorrowingNotification:
+    """Store the notification in the outbox.
+    Must be called inside the transaction that creates the borrowing."""
+    return BorrowingNotification.objects.create(
+        message=get_borrowings_notification_message(borrowing)
+    )
+
+
+def enqueue_borrowings_notification(
+    borrowings: list[Borrowing],
+) -> list[BorrowingNotification]:
+    """Store the notifications of several borrowings in one INSERT, one per
+    borrowing. The worker coalesces them into as few Telegram messages as
+    the length limit allows."""
+    return BorrowingNotification.objects.bulk_create(
+        BorrowingNotification(message=get_borrowings_notification_message(borrowing))
+        for borrowing in borrowings
+    )
@@ -0,0 +1,250 @@
+"""Holds of out-of-stock books, served first come, first served.
+
+Every book with holds has a HoldQueue row. Waiting holds take increasing
+tickets from its ``tail`` and the tickets below ``head`` are not waiting
+anymore. Cancelling a waiting hold only marks it cancelled and leaves a gap
+in the tickets, so the position of a hold in the queue is the number of
+waiting holds of the book up to its ticket, counted on the partial index
+of the waiting tickets.
+
+allocate_copies() gives returned copies to the first waiting holds of
+their books, in the transaction of the return. A hold is then ready for
+HOLD_PICKUP_DAYS and its copy counts in Book.copies_on_hold until the user
+borrows it. expire_holds() releases the copies of the ready holds that
+were not picked up in time, a batch per transaction, to the next waiting
+holds or back to the inventory.
+
+Transactions lock the queue of a book before giving or allocating its
+tickets, so that two of them never do it at once. Cancelling a waiting hold
+doesn't take the lock, it only updates the status of a hold still waiting.
+allocate_copies() readies holds under the same condition, so of a cancel
+and an allocation racing for a hold only one wins.
+"""
+
+import datetime
+from collections import Counter
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    PositiveBigIntegerField,
+    Q,
+    QuerySet,
+    Subquery,
+    Value,
+    When,
+    Window,
+)
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+
+from book.models import Book
+from borrowing.models import BorrowingNotification, Hold, HoldQueue
+
+
+def get_hold_ready_message(hold: Hold) -> str:
+    return (
+        "Hold ready:\n"
+        f"id: {hold.id}\n"
+        f"expires_at: {timezone.localtime(hold.expires_at):%Y-%m-%d %H:%M}\n"
+        f"book: {hold.book.title}\n"
+        f"user: {hold.user.email}\n"
+    )
+
+
+def count_waiting(**filters) -> Coalesce:
+    """Count the waiting holds matching the filters in a subquery, on the
+    index of the waiting tickets."""
+    waiting = (
+        Hold.objects.filter(status=Hold.StatusChoices.WAITING, **filters)
+        .order_by()
+        .values("book")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(waiting), 0, output_field=PositiveBigIntegerField())
+
+
+def with_positions(queryset: QuerySet) -> QuerySet:
+    """Annotate the holds with their position in the queue of their book,
+    None unless they are waiting."""
+    return queryset.annotate(
+        position=Case(
+            When(
+                status=Hold.StatusChoices.WAITING,
+                then=count_waiting(
+                    book=OuterRef("book"), ticket__lte=OuterRef("ticket")
+                ),
+            ),
+            default=None,
+            output_field=PositiveBigIntegerField(),
+        )
+    )
+
+
+def place_hold(book: Book, user: AbstractBaseUser) -> Optional[Hold]:
+    """Queue a hold of the user at the tail of the queue of the book.
+    Returns None if the book has copies available by then, the caller is
+    expected to roll back the transaction in that case."""
+    HoldQueue.objects.bulk_create([HoldQueue(book=book)], ignore_conflicts=True)
+    HoldQueue.objects.filter(pk=book.pk).update(tail=F("tail") + 1)
+    tail, inventory, waiting = (
+        HoldQueue.objects.filter(pk=book.pk)
+        .values_list("tail", "book__inventory", count_waiting(book=OuterRef("pk")))
+        .get()
+    )
+    if inventory > 0:
+        return None
+    hold = Hold.objects.create(book=book, user=user, ticket=tail - 1)
+    hold.position = waiting + 1
+    return hold
+
+
+def allocate_copies(
+    amounts: dict[int, int], now: Optional[datetime.datetime] = None
+) -> dict[int, int]:
+    """Make the first waiting holds of the books ready, as many per book as
+    given by amounts, and enqueue a notification per hold. Must be called
+    inside a transaction. Returns the number of copies given to holds per
+    book.
+
+    The waiting holds of all the books are read in one query, numbered per
+    book from the head of its queue, so the cancelled ones are skipped."""
+    queues = HoldQueue.objects.select_for_update().filter(
+        pk__in=amounts, head__lt=F("tail")
+    )
+    tickets = Q()
+    for book_id, head in queues.values_list("pk", "head"):
+        tickets |= Q(book_id=book_id, ticket__gte=head)
+    if not tickets:
+        return {}
+
+    holds = [
+        hold
+        for hold in Hold.objects.filter(tickets, status=Hold.StatusChoices.WAITING)
+        .annotate(rank=Window(RowNumber(), partition_by="book_id", order_by="ticket"))
+        .filter(rank__lte=max(amounts.values()))
+        .select_related("book", "user")
+        .order_by("book_id", "ticket")
+        if hold.rank <= amounts[hold.book_id]
+    ]
+    if not holds:
+        return {}
+
+    now = now or timezone.now()
+    expires_at = now + datetime.timedelta(days=settings.HOLD_PICKUP_DAYS)
+    ready = Hold.objects.filter(
+        pk__in=[hold.pk for hold in holds], status=Hold.StatusChoices.WAITING
+    ).update(status=Hold.StatusChoices.READY, ready_at=now, expires_at=expires_at)
+    heads = {hold.book_id: hold.ticket + 1 for hold in holds}
+    if ready < len(holds):
+        # Holds cancelled since they were read keep their status, their
+        # copies are released to the inventory by the caller.
+        ready_ids = set(
+            Hold.objects.filter(
+                pk__in=[hold.pk for hold in holds], status=Hold.StatusChoices.READY
+            ).values_list("pk", flat=True)
+        )
+        holds = [hold for hold in holds if hold.pk in ready_ids]
+    HoldQueue.objects.filter(pk__in=heads).update(
+        head=Case(
+            *[When(pk=book_id, then=Value(head)) for book_id, head in heads.items()],
+            output_field=PositiveBigIntegerField(),
+        )
+    )
+    for hold in holds:
+        hold.status, hold.ready_at, hold.expires_at = (
+            Hold.StatusChoices.READY,
+            now,
+            expires_at,
+        )
+    BorrowingNotification.objects.bulk_create(
+        BorrowingNotification(message=get_hold_ready_message(hold)) for hold in holds
+    )
+    return dict(Counter(hold.book_id for hold in holds))
+
+
+def release_copies(
+    book_ids: Iterable[int], now: Optional[datetime.datetime] = None
+) -> None:
+    """Pass the copies of holds that are no longer ready, one per book id,
+    to the next waiting holds, or back to the inventory if there are none."""
+    amounts = Counter(book_ids)
+    allocated = allocate_copies(amounts, now)
+    released = {
+        book_id: amount - allocated.get(book_id, 0)
+        for book_id, amount in amounts.items()
+        if amount > allocated.get(book_id, 0)
+    }
+    if released:
+        Book.objects.release_held_copies(released)
+
+
+def get_ready_hold(book: Book, user: AbstractBaseUser) -> Optional[Hold]:
+    return Hold.objects.filter(
+        book=book, user=user, status=Hold.StatusChoices.READY
+    ).first()
+
+
+def fulfill_hold(hold: Hold) -> bool:
+    """Mark the ready hold as borrowed. Returns False if it is not ready
+    anymore."""
+    return bool(
+        Hold.objects.filter(pk=hold.pk, status=Hold.StatusChoices.READY).update(
+            status=Hold.StatusChoices.FULFILLED
+        )
+    )
+
+
+def cancel_hold(hold: Hold) -> bool:
+    """Cancel a waiting or a ready hold. Returns False if it is neither by
+    now, the caller is expected to roll back the transaction in that case."""
+    if hold.status == Hold.StatusChoices.WAITING:
+        # The holds behind keep their tickets, their positions count the
+        # waiting holds ahead.
+        return bool(
+            Hold.objects.filter(pk=hold.pk, status=Hold.StatusChoices.WAITING).update(
+                status=Hold.StatusChoices.CANCELLED
+            )
+        )
+
+    if hold.status == Hold.StatusChoices.READY:
+        if not Hold.objects.filter(pk=hold.pk, status=Hold.StatusChoices.READY).update(
+            status=Hold.StatusChoices.CANCELLED
+        ):
+            return False
+        release_copies([hold.book_id])
+        return True
+
+    return False
+
+
+def expire_holds(
+    now: Optional[datetime.datetime] = None, batch_size: Optional[int] = None
+) -> int:
+    """Expire the ready holds not picked up by now and release their copies,
+    a batch of holds per transaction. Returns the number of expired holds."""
+    now = now or timezone.now()
+    batch_size = batch_size or settings.HOLD_EXPIRY_BATCH_SIZE
+    expired = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Hold.objects.select_for_update(skip_locked=True)
+                .filter(status=Hold.StatusChoices.READY, expires_at__lte=now)
+                .order_by("expires_at")
+                .values_list("pk", "book_id")[:batch_size]
+            )
+            if not batch:
+                return expired
+            Hold.objects.filter(pk__in=[pk for pk, _ in batch]).update(
+                status=Hold.StatusChoices.EXPIRED
+            )
+            release_copies([book_id for _, book_id in batch], now)
+        expired += len(batch)
@@ -0,0 +1,21 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from borrowing.fines import accrue_fines
+
+
+class Command(BaseCommand):
+    help = "Accrue the overdue fines of unreturned borrowings, run it nightly."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--until",
+            type=datetime.date.fromisoformat,
+            default=None,
+            help="Accrue up to this day, YYYY-MM-DD, instead of today.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        created, accrued = accrue_fines(options["until"])
+        self.stdout.write(f"New fines: {created}, accrued: {accrued}")
@@ -0,0 +1,36 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from borrowing.reminders import OverdueRunConflict, enqueue_overdue_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Enqueue reminders of the overdue borrowings for the notification "
+        "worker, run it daily. An interrupted run is resumed."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--date",
+            type=datetime.date.fromisoformat,
+            default=None,
+            help="Remind of the borrowings overdue on this day, YYYY-MM-DD.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.OVERDUE_NOTIFICATION_CHUNK_SIZE,
+            help="Number of borrowings read and committed at a time.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        try:
+            enqueued = enqueue_overdue_notifications(
+                options["date"], options["chunk_size"]
+            )
+        except OverdueRunConflict as error:
+            raise CommandError(str(error))
+        self.stdout.write(f"Enqueued reminders: {enqueued}")
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from borrowing.holds import expire_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire the ready holds that were not picked up in time and give "
+        "their copies to the next holds, run it every few minutes."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.HOLD_EXPIRY_BATCH_SIZE,
+            help="Number of holds expired per transaction.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        expired = expire_holds(batch_size=options["batch_size"])
+        self.stdout.write(f"Expired holds: {expired}")
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from borrowing.availability import find_availability_drift, rebuild_book_availability
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the copies on loan and on hold and the next due dates of "
+        "the books from the borrowings and the holds."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report the drifted books, fail if there are any.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["check"]:
+            drift = find_availability_drift()
+            for book in drift:
+                self.stdout.write(
+                    f"{book['pk']} {book['title']}: "
+                    f"on loan {book['copies_on_loan']}"
+                    f" -> {book['actual_copies_on_loan']}, "
+                    f"next due {book['next_due_date']}"
+                    f" -> {book['actual_next_due_date']}, "
+                    f"on hold {book['copies_on_hold']}"
+                    f" -> {book['actual_copies_on_hold']}"
+                )
+            if drift:
+                raise CommandError(f"Books with drifted availability: {len(drift)}")
+            self.stdout.write("Availability of all books is consistent.")
+            return
+
+        rebuilt = rebuild_book_availability()
+        self.stdout.write(f"Rebuilt availability of books: {rebuilt}")
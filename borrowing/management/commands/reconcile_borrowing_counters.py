@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from borrowing.counters import reconcile_borrowing_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the borrowing counters of the users and report drift."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the drifted counters without fixing them.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        drift = reconcile_borrowing_counters(fix=not options["dry_run"])
+        for user in drift:
+            self.stdout.write(
+                f"{user['email']}: "
+                f"active {user['active_borrowings_count']}"
+                f" -> {user['actual_active_borrowings_count']}, "
+                f"total {user['total_borrowings_count']}"
+                f" -> {user['actual_total_borrowings_count']}"
+            )
+        action = "found" if options["dry_run"] else "fixed"
+        self.stdout.write(f"Users with drifted counters {action}: {len(drift)}")
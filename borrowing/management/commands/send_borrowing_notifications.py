@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from borrowing.outbox import process_notification_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued borrowing notifications to Telegram."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTIFICATION_BATCH_SIZE,
+            help="Number of notifications claimed per batch.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.NOTIFICATION_POLL_INTERVAL,
+            help="Seconds to sleep when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the due notifications and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        while True:
+            sent, failed = process_notification_batch(options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"Sent: {sent}, failed: {failed}")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["poll_interval"])
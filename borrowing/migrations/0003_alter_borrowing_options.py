@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:16
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowing", "0002_borrowingnotification"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="borrowing",
+            options={"ordering": ["-borrow_date", "-id"]},
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowing", "0004_alter_borrowing_user_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Fine",
+            fields=[
+                (
+                    "borrowing",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="fine",
+                        serialize=False,
+                        to="borrowing.borrowing",
+                    ),
+                ),
+                ("daily_fee", models.DecimalField(decimal_places=2, max_digits=8)),
+                ("days", models.PositiveIntegerField(default=0)),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+                ("accrued_until", models.DateField()),
+                ("is_settled", models.BooleanField(default=False)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fines",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["borrowing_id"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "is_settled"], name="fine_user_settled_idx"
+                    ),
+                    models.Index(
+                        condition=models.Q(("is_settled", False)),
+                        fields=["accrued_until"],
+                        name="fine_unsettled_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowing", "0005_fine"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OverdueNotificationRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True)),
+                ("last_borrowing_id", models.BigIntegerField(default=0)),
+                ("enqueued", models.PositiveIntegerField(default=0)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "ordering": ["-date"],
+            },
+        ),
+    ]
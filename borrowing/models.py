@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.db.models import CheckConstraint, Q, F
+from django.utils import timezone
 
 from book.models import Book
 
@@ -11,11 +12,35 @@ class Borrowing(models.Model):
     actual_return_date = models.DateField(blank=True, null=True)
     book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="borrowings")
     user = models.ForeignKey(
-        get_user_model(), on_delete=models.CASCADE, related_name="borrowings"
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="borrowings",
+        db_index=False,
     )
 
     class Meta:
-        ordering = ["-borrow_date"]
+        ordering = ["-borrow_date", "-id"]
+
+        indexes = [
+            models.Index(
+                fields=["user", "-borrow_date", "-id"],
+                name="borrowing_user_date_idx",
+            ),
+            models.Index(
+                fields=["user", "-borrow_date", "-id"],
+                condition=Q(actual_return_date__isnull=True),
+                name="borrowing_active_user_idx",
+            ),
+            models.Index(
+                fields=["-borrow_date", "-id"],
+                name="borrowing_date_idx",
+            ),
+            models.Index(
+                fields=["-borrow_date", "-id"],
+                condition=Q(actual_return_date__isnull=True),
+                name="borrowing_active_date_idx",
+            ),
+        ]
 
         constraints = [
             CheckConstraint(
@@ -34,3 +59,155 @@ class Borrowing(models.Model):
     @property
     def is_returned(self) -> bool:
         return bool(self.actual_return_date)
+
+
+class Fine(models.Model):
+    """Overdue fee of a borrowing, see borrowing/fines.py. The daily fee is
+    the fee of the book times BORROWING_FINE_MULTIPLIER when the borrowing
+    became overdue."""
+
+    borrowing = models.OneToOneField(
+        Borrowing, on_delete=models.CASCADE, primary_key=True, related_name="fine"
+    )
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="fines",
+        db_index=False,
+    )
+    daily_fee = models.DecimalField(max_digits=8, decimal_places=2)
+    days = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    accrued_until = models.DateField()
+    is_settled = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["borrowing_id"]
+        indexes = [
+            models.Index(fields=["user", "is_settled"], name="fine_user_settled_idx"),
+            models.Index(
+                fields=["accrued_until"],
+                condition=Q(is_settled=False),
+                name="fine_unsettled_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"ID {self.pk} {self.amount}$"
+
+
+class BorrowingNotification(models.Model):
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    message = models.TextField()
+    status = models.CharField(
+        max_length=7,
+        choices=StatusChoices,
+        default=StatusChoices.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="notification_status_next_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"ID {self.pk} {self.status}"
+
+
+class OverdueNotificationRun(models.Model):
+    """Progress of the overdue reminders of a day, see borrowing/reminders.py.
+    Reminders are enqueued in order of borrowing id, up to last_borrowing_id
+    so far."""
+
+    date = models.DateField(unique=True)
+    last_borrowing_id = models.BigIntegerField(default=0)
+    enqueued = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-date"]
+
+    def __str__(self) -> str:
+        return f"{self.date} {self.enqueued}"
+
+
+class HoldQueue(models.Model):
+    """First come, first served queue of the holds of a book, see
+    borrowing/holds.py. Waiting holds have tickets from head up to tail,
+    the next ticket to give, with gaps left by cancelled holds."""
+
+    book = models.OneToOneField(
+        Book, on_delete=models.CASCADE, primary_key=True, related_name="hold_queue"
+    )
+    head = models.PositiveBigIntegerField(default=0)
+    tail = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.book_id} {self.tail - self.head}"
+
+
+class Hold(models.Model):
+    class StatusChoices(models.TextChoices):
+        WAITING = "waiting", "Waiting"
+        READY = "ready", "Ready"
+        FULFILLED = "fulfilled", "Fulfilled"
+        EXPIRED = "expired", "Expired"
+        CANCELLED = "cancelled", "Cancelled"
+
+    ACTIVE_STATUSES = [StatusChoices.WAITING, StatusChoices.READY]
+
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="holds")
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="holds",
+        db_index=False,
+    )
+    ticket = models.PositiveBigIntegerField()
+    status = models.CharField(
+        max_length=9,
+        choices=StatusChoices,
+        default=StatusChoices.WAITING,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    ready_at = models.DateTimeField(blank=True, null=True)
+    expires_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["user", "-id"], name="hold_user_idx"),
+            models.Index(
+                fields=["book", "ticket"],
+                condition=Q(status="waiting"),
+                name="hold_waiting_ticket_idx",
+            ),
+            models.Index(
+                fields=["expires_at"],
+                condition=Q(status="ready"),
+                name="hold_ready_expiry_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["book", "user"],
+                condition=Q(status__in=["waiting", "ready"]),
+                name="hold_active_book_user_unique",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"ID {self.pk} {self.status}"
@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from borrowing.models import BorrowingNotification
+from borrowing.telegram import TelegramNotificationError, get_telegram_client
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: base, 2 * base, 4 * base ... capped at the maximum."""
+    delay = settings.NOTIFICATION_RETRY_BASE_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.NOTIFICATION_RETRY_MAX_DELAY))
+
+
+def claim_pending_notifications(batch_size: int) -> list[BorrowingNotification]:
+    """Lock a batch of due notifications and lease them to the current worker,
+    so that concurrently running workers do not send the same message twice."""
+    now = timezone.now()
+    with transaction.atomic():
+        notifications = list(
+            BorrowingNotification.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=BorrowingNotification.StatusChoices.PENDING,
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        BorrowingNotification.objects.filter(
+            pk__in=[notification.pk for notification in notifications]
+        ).update(
+            next_attempt_at=now + timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS)
+        )
+    return notifications
+
+
+def mark_sent(notifications: list[BorrowingNotification]) -> None:
+    now = timezone.now()
+    for notification in notifications:
+        notification.attempts += 1
+        notification.status = BorrowingNotification.StatusChoices.SENT
+        notification.sent_at = now
+        notification.last_error = ""
+
+
+def mark_failed(
+    notifications: list[BorrowingNotification], error: TelegramNotificationError
+) -> None:
+    """Schedule the next attempt with backoff, but not before the retry_after
+    seconds Telegram asked for."""
+    now = timezone.now()
+    for notification in notifications:
+        notification.attempts += 1
+        notification.last_error = str(error)
+        if notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+            notification.status = BorrowingNotification.StatusChoices.FAILED
+        else:
+            delay = get_retry_delay(notification.attempts)
+            if error.retry_after is not None:
+                delay = max(delay, timedelta(seconds=error.retry_after))
+            notification.next_attempt_at = now + delay
+
+
+def deliver_notifications(
+    notifications: list[BorrowingNotification],
+) -> tuple[int, int]:
+    """Send notifications coalesced into as few Telegram messages as possible,
+    up to NOTIFICATION_SEND_CONCURRENCY messages at once.
+    Returns the number of sent and failed notifications."""
+    client = get_telegram_client()
+    chunks = []
+    position = 0
+    for chunk in client.coalesce(
+        notification.message for notification in notifications
+    ):
+        chunks.append((chunk, notifications[position : position + len(chunk)]))
+        position += len(chunk)
+
+    def send(chunk: list[str]) -> Optional[TelegramNotificationError]:
+        try:
+            client.send_chunk(chunk)
+        except TelegramNotificationError as error:
+            return error
+        return None
+
+    with ThreadPoolExecutor(
+        max_workers=settings.NOTIFICATION_SEND_CONCURRENCY,
+        thread_name_prefix="notification-sender",
+    ) as executor:
+        errors = list(executor.map(send, [chunk for chunk, _ in chunks]))
+
+    sent = failed = 0
+    for (chunk, chunk_notifications), error in zip(chunks, errors):
+        if error is None:
+            mark_sent(chunk_notifications)
+            sent += len(chunk)
+        else:
+            mark_failed(chunk_notifications, error)
+            failed += len(chunk)
+
+    BorrowingNotification.objects.bulk_update(
+        notifications,
+        ["attempts", "status", "next_attempt_at", "sent_at", "last_error"],
+    )
+    return sent, failed
+
+
+def process_notification_batch(batch_size: int) -> tuple[int, int]:
+    """Send one batch of due notifications.
+    Returns the number of sent and failed deliveries."""
+    return deliver_notifications(claim_pending_notifications(batch_size))
@@ -0,0 +1,86 @@
+"""Daily reminders of overdue borrowings, sent through the notification outbox.
+
+enqueue_overdue_notifications() streams the overdue borrowings in order of
+id with their book and user joined, and stores one outbox notification per
+borrowing, a chunk at a time. The notification worker coalesces them into
+as few Telegram messages as the length limit allows.
+
+Each chunk is committed together with the checkpoint of the day's run, so
+a crashed run is resumed after the last committed borrowing instead of
+enqueueing the reminders again, and a finished run is not repeated.
+"""
+
+import datetime
+from itertools import islice
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from borrowing.models import Borrowing, BorrowingNotification, OverdueNotificationRun
+
+
+class OverdueRunConflict(Exception):
+    """Another process moved the checkpoint of the same run."""
+
+
+def get_overdue_notification_message(borrowing: Borrowing, today: datetime.date) -> str:
+    return (
+        "Overdue borrowing:\n"
+        f"id: {borrowing.id}\n"
+        f"expected_return_date: {borrowing.expected_return_date}\n"
+        f"days_overdue: {(today - borrowing.expected_return_date).days}\n"
+        f"book: {borrowing.book.title}\n"
+        f"user: {borrowing.user.email}\n"
+    )
+
+
+def enqueue_overdue_notifications(
+    today: Optional[datetime.date] = None, chunk_size: Optional[int] = None
+) -> int:
+    """Enqueue the reminders of the borrowings overdue on the given day,
+    today by default, that the day's run has not enqueued yet.
+    Returns the number of reminders enqueued."""
+    today = today or timezone.localdate()
+    chunk_size = chunk_size or settings.OVERDUE_NOTIFICATION_CHUNK_SIZE
+    run, _ = OverdueNotificationRun.objects.get_or_create(date=today)
+    if run.finished_at is not None:
+        return 0
+
+    borrowings = (
+        Borrowing.objects.filter(
+            actual_return_date__isnull=True,
+            expected_return_date__lt=today,
+            pk__gt=run.last_borrowing_id,
+        )
+        .select_related("book", "user")
+        .order_by("pk")
+        .iterator(chunk_size=chunk_size)
+    )
+    enqueued = 0
+    while chunk := list(islice(borrowings, chunk_size)):
+        with transaction.atomic():
+            BorrowingNotification.objects.bulk_create(
+                BorrowingNotification(
+                    message=get_overdue_notification_message(borrowing, today)
+                )
+                for borrowing in chunk
+            )
+            moved = OverdueNotificationRun.objects.filter(
+                pk=run.pk, last_borrowing_id=run.last_borrowing_id
+            ).update(
+                last_borrowing_id=chunk[-1].pk,
+                enqueued=run.enqueued + len(chunk),
+            )
+            if not moved:
+                raise OverdueRunConflict(
+                    f"The overdue reminders of {today} are enqueued by another run."
+                )
+        run.last_borrowing_id = chunk[-1].pk
+        run.enqueued += len(chunk)
+        enqueued += len(chunk)
+
+    run.finished_at = timezone.now()
+    run.save(update_fields=["finished_at"])
+    return enqueued
@@ -1,15 +1,48 @@
+from collections import Counter
 from datetime import datetime
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
 from rest_framework import serializers
 
 from book.models import Book
-from book.serializers import BookSerializer
-from borrowing.helpers import send_telegram_borrowing_notification
-from borrowing.models import Borrowing
+from book.serializers import BookSerializer, BookValuesSerializer
+from borrowing.fines import settle_fines
+from borrowing.helpers import (
+    enqueue_borrowing_notification,
+    enqueue_borrowings_notification,
+)
+from borrowing.holds import (
+    allocate_copies,
+    cancel_hold,
+    fulfill_hold,
+    get_ready_hold,
+    place_hold,
+)
+from borrowing.models import Borrowing, Hold
+from library_service.metrics import count_borrowing_operation
+from library_service.timing import TimedSerializerMixin, timer
 
 
-class BorrowingSerializer(serializers.ModelSerializer):
+def get_borrowing_limit_message() -> str:
+    return (
+        f"You cannot have more than {settings.BORROWING_MAX_ACTIVE_PER_USER} "
+        "active borrowings."
+    )
+
+
+def validate_expected_return_date(value: datetime.date) -> datetime.date:
+    if value <= datetime.today().date():
+        raise serializers.ValidationError(
+            "Expected return date must be greater than current date"
+        )
+    return value
+
+
+class BorrowingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.SlugRelatedField(slug_field="email", read_only=True)
     book = BookSerializer(read_only=True)
 
@@ -26,7 +59,74 @@ class BorrowingSerializer(serializers.ModelSerializer):
         ]
 
 
-class BorrowingCreateSerializer(serializers.ModelSerializer):
+class BorrowingValuesSerializer:
+    """Fast read-only equivalent of BorrowingSerializer for lists,
+    see BookValuesSerializer. The book and the user are joined
+    by ``values_list()`` itself."""
+
+    fields = [
+        "id",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+        "user__email",
+        *(f"book__{field}" for field in BookValuesSerializer.fields),
+    ]
+
+    @classmethod
+    def get_rows(cls, queryset: QuerySet) -> QuerySet:
+        return queryset.values_list(
+            *cls.fields, *queryset.query.annotations, named=True
+        )
+
+    @classmethod
+    @timer("serialize")
+    def serialize(cls, rows: list[tuple]) -> list[dict]:
+        cover_labels = BookValuesSerializer.cover_labels
+        return [
+            {
+                "id": borrowing_id,
+                "borrow_date": borrow_date.isoformat(),
+                "expected_return_date": expected_return_date.isoformat(),
+                "actual_return_date": (
+                    actual_return_date.isoformat() if actual_return_date else None
+                ),
+                "is_returned": bool(actual_return_date),
+                "user": email,
+                "book": {
+                    "id": book_id,
+                    "title": title,
+                    "author": author,
+                    "cover": cover_labels.get(cover, str(cover)),
+                    "inventory": inventory,
+                    "total_copies": inventory + copies_on_loan + copies_on_hold,
+                    "next_due_date": (
+                        next_due_date.isoformat() if next_due_date else None
+                    ),
+                    "daily_fee_display": f"{daily_fee}$",
+                },
+            }
+            for (
+                borrowing_id,
+                borrow_date,
+                expected_return_date,
+                actual_return_date,
+                email,
+                book_id,
+                title,
+                author,
+                cover,
+                inventory,
+                copies_on_loan,
+                copies_on_hold,
+                next_due_date,
+                daily_fee,
+                *_,
+            ) in rows
+        ]
+
+
+class BorrowingCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
     class Meta:
@@ -39,46 +139,287 @@ class BorrowingCreateSerializer(serializers.ModelSerializer):
         ]
 
     def validate_expected_return_date(self, value: datetime.date) -> datetime.date:
-        if value <= datetime.today().date():
-            raise serializers.ValidationError(
-                "Expected return date must be greater than current date"
-            )
-        return value
+        return validate_expected_return_date(value)
+
+    @staticmethod
+    def get_not_available_message(book: Book) -> str:
+        return f"{book.title.lower()} is not available for borrowing."
 
     def validate_book(self, value: Book) -> Book:
-        if value.inventory < 1:
+        if value.inventory < 1 and value.copies_on_hold < 1:
+            raise serializers.ValidationError(self.get_not_available_message(value))
+        return value
+
+    def validate(self, attrs: dict) -> dict:
+        """A copy on hold can only be borrowed by the user of the hold,
+        who is given it even if other copies are available."""
+        book = attrs["book"]
+        hold = None
+        if book.copies_on_hold:
+            hold = get_ready_hold(book, attrs["user"])
+        if book.inventory < 1 and hold is None:
             raise serializers.ValidationError(
-                f"{value.title.lower()} is not available for borrowing."
+                {"book": [self.get_not_available_message(book)]}
             )
-        return value
+        return {**attrs, "hold": hold}
 
     def create(self, validated_data: dict) -> Borrowing:
+        hold = validated_data.pop("hold", None)
+        book = validated_data["book"]
         with transaction.atomic():
+            if not get_user_model().objects.add_borrowings(validated_data["user"].pk):
+                raise serializers.ValidationError(get_borrowing_limit_message())
+            if hold is not None and not fulfill_hold(hold):
+                hold = None
+            if not Book.objects.decrease_inventory(
+                book.id,
+                validated_data["expected_return_date"],
+                from_hold=hold is not None,
+            ):
+                raise serializers.ValidationError(
+                    {"book": [self.get_not_available_message(book)]}
+                )
             borrowing = super().create(validated_data)
-            book = borrowing.book
-            book.inventory -= 1
-            book.save()
 
-            send_telegram_borrowing_notification(borrowing)
+            enqueue_borrowing_notification(borrowing)
+            count_borrowing_operation("borrow")
 
         return borrowing
 
 
 class BorrowingReturnSerializer(serializers.Serializer):
+    already_returned_message = (
+        "Borrowing was already returned. Cannot return borrowing twice"
+    )
 
     def validate(self, validated_data: dict) -> dict:
 
         if self.instance.actual_return_date is not None:
+            raise serializers.ValidationError(self.already_returned_message)
+        return validated_data
+
+    def update(self, instance, validated_data) -> Borrowing:
+        actual_return_date = timezone.localdate()
+        with transaction.atomic():
+            returned = Borrowing.objects.filter(
+                pk=instance.pk, actual_return_date__isnull=True
+            ).update(actual_return_date=actual_return_date)
+            if not returned:
+                raise serializers.ValidationError(self.already_returned_message)
+            Book.objects.increase_inventory(
+                instance.book_id,
+                instance.expected_return_date,
+                on_hold=bool(allocate_copies({instance.book_id: 1})),
+            )
+            get_user_model().objects.remove_active_borrowings({instance.user_id: 1})
+            settle_fines([instance], actual_return_date)
+            count_borrowing_operation("return")
+
+        instance.actual_return_date = actual_return_date
+        return instance
+
+
+class BorrowingBulkCreateSerializer(serializers.ListSerializer):
+
+    def to_internal_value(self, data: list) -> list[dict]:
+        """Validate all items against one query for the requested books.
+        Errors are reported per item, like the errors of the items themselves."""
+        attrs = super().to_internal_value(data)
+        books = Book.objects.in_bulk({item["book"] for item in attrs})
+        requested = Counter(item["book"] for item in attrs)
+
+        errors = []
+        for item in attrs:
+            book = books.get(item["book"])
+            if book is None:
+                errors.append(
+                    {"book": [f'Invalid pk "{item["book"]}" - object does not exist.']}
+                )
+            elif book.inventory < requested[book.id]:
+                errors.append(
+                    {
+                        "book": [
+                            BorrowingCreateSerializer.get_not_available_message(book)
+                        ]
+                    }
+                )
+            else:
+                errors.append({})
+                item["book"] = book
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data: list[dict]) -> list[Borrowing]:
+        user = self.context["request"].user
+        amounts = Counter(item["book"].id for item in validated_data)
+        due_dates = {}
+        for item in validated_data:
+            book_id = item["book"].id
+            due_dates[book_id] = min(
+                item["expected_return_date"],
+                due_dates.get(book_id, item["expected_return_date"]),
+            )
+        with transaction.atomic():
+            if not get_user_model().objects.add_borrowings(
+                user.pk, len(validated_data)
+            ):
+                raise serializers.ValidationError(get_borrowing_limit_message())
+            if not Book.objects.decrease_inventory_bulk(amounts, due_dates):
+                raise serializers.ValidationError(
+                    "Some of the books are no longer available for borrowing."
+                )
+            borrowings = Borrowing.objects.bulk_create(
+                [Borrowing(user=user, **item) for item in validated_data]
+            )
+            # The books were read before the UPDATE, the response shows them after.
+            books = Book.objects.in_bulk(amounts)
+            for borrowing in borrowings:
+                borrowing.book = books[borrowing.book_id]
+
+            enqueue_borrowings_notification(borrowings)
+            count_borrowing_operation("borrow", len(borrowings))
+
+        return borrowings
+
+
+class BorrowingBulkItemSerializer(serializers.Serializer):
+    book = serializers.IntegerField(min_value=1)
+    expected_return_date = serializers.DateField()
+
+    class Meta:
+        list_serializer_class = BorrowingBulkCreateSerializer
+
+    def validate_expected_return_date(self, value: datetime.date) -> datetime.date:
+        return validate_expected_return_date(value)
+
+
+class BorrowingBulkReturnSerializer(serializers.Serializer):
+    borrowings = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BORROWING_BULK_MAX_ITEMS,
+    )
+
+    def validate_borrowings(self, value: list[int]) -> list[Borrowing]:
+        """Only borrowings visible to the current user can be returned."""
+        requested_ids = set(value)
+        borrowings = self.context["queryset"].filter(pk__in=requested_ids)
+        found = {borrowing.pk: borrowing for borrowing in borrowings}
+
+        missing_ids = sorted(requested_ids - found.keys())
+        if missing_ids:
+            raise serializers.ValidationError(
+                f"Borrowings with ids {missing_ids} do not exist."
+            )
+
+        returned_ids = sorted(
+            pk for pk, borrowing in found.items() if borrowing.is_returned
+        )
+        if returned_ids:
             raise serializers.ValidationError(
-                "Borrowing was already returned. Cannot return borrowing twice"
+                f"Borrowings with ids {returned_ids} were already returned."
+            )
+        return list(found.values())
+
+    def create(self, validated_data: dict) -> list[Borrowing]:
+        borrowings = validated_data["borrowings"]
+        actual_return_date = timezone.localdate()
+        with transaction.atomic():
+            returned = Borrowing.objects.filter(
+                pk__in=[borrowing.pk for borrowing in borrowings],
+                actual_return_date__isnull=True,
+            ).update(actual_return_date=actual_return_date)
+            if returned != len(borrowings):
+                raise serializers.ValidationError(
+                    BorrowingReturnSerializer.already_returned_message
+                )
+            amounts = Counter(borrowing.book_id for borrowing in borrowings)
+            Book.objects.increase_inventory_bulk(
+                amounts,
+                min(borrowing.expected_return_date for borrowing in borrowings),
+                on_hold=allocate_copies(amounts),
             )
+            get_user_model().objects.remove_active_borrowings(
+                Counter(borrowing.user_id for borrowing in borrowings)
+            )
+            settle_fines(borrowings, actual_return_date)
+            count_borrowing_operation("return", len(borrowings))
+
+        for borrowing in borrowings:
+            borrowing.actual_return_date = actual_return_date
+        return borrowings
+
+
+class HoldSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    user = serializers.SlugRelatedField(slug_field="email", read_only=True)
+    position = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Hold
+        fields = [
+            "id",
+            "book",
+            "user",
+            "status",
+            "position",
+            "created_at",
+            "ready_at",
+            "expires_at",
+        ]
+
+
+class HoldCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
+    class Meta:
+        model = Hold
+        fields = ["id", "book", "user"]
+        # Replaced by validate(), with a message for the user.
+        validators = []
+
+    @staticmethod
+    def get_available_message(book: Book) -> str:
+        return f"{book.title.lower()} is available for borrowing."
+
+    def validate_book(self, value: Book) -> Book:
+        if value.inventory > 0:
+            raise serializers.ValidationError(self.get_available_message(value))
+        return value
+
+    def validate(self, attrs: dict) -> dict:
+        if Hold.objects.filter(
+            book=attrs["book"], user=attrs["user"], status__in=Hold.ACTIVE_STATUSES
+        ).exists():
+            raise serializers.ValidationError("You already have a hold on this book.")
+        return attrs
+
+    def create(self, validated_data: dict) -> Hold:
+        book = validated_data["book"]
+        with transaction.atomic():
+            hold = place_hold(book, validated_data["user"])
+            if hold is None:
+                raise serializers.ValidationError(
+                    {"book": [self.get_available_message(book)]}
+                )
+        return hold
+
+    def to_representation(self, instance: Hold) -> dict:
+        return HoldSerializer(instance, context=self.context).data
+
+
+class HoldCancelSerializer(serializers.Serializer):
+    not_active_message = "Only waiting and ready holds can be cancelled."
+
+    def validate(self, validated_data: dict) -> dict:
+        if self.instance.status not in Hold.ACTIVE_STATUSES:
+            raise serializers.ValidationError(self.not_active_message)
         return validated_data
 
-    def update(self, instance, validated_data) -> Borrowing:
+    def update(self, instance: Hold, validated_data: dict) -> Hold:
         with transaction.atomic():
-            instance.actual_return_date = datetime.now().date()
-            instance.save()
-            book = instance.book
-            book.inventory += 1
-            book.save()
+            if not cancel_hold(instance):
+                raise serializers.ValidationError(self.not_active_message)
+        instance.status = Hold.StatusChoices.CANCELLED
         return instance
@@ -0,0 +1,154 @@
+import threading
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from requests.adapters import HTTPAdapter
+
+from library_service.metrics import NOTIFICATIONS
+
+TELEGRAM_SETTINGS = {
+    "TELEGRAM_API_URL",
+    "TELEGRAM_BOT_API_KEY",
+    "TELEGRAM_CHAT_ID",
+    "TELEGRAM_CONNECT_TIMEOUT",
+    "TELEGRAM_READ_TIMEOUT",
+    "TELEGRAM_POOL_SIZE",
+    "TELEGRAM_MESSAGE_MAX_LENGTH",
+}
+TRUNCATION_MARK = "…"
+
+
+class TelegramNotificationError(Exception):
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class NotificationStats:
+    sent: int = 0
+    failed: int = 0
+
+
+class TelegramClient:
+    """Keeps a pooled keep-alive session to the Telegram Bot API,
+    so consecutive messages reuse the same TLS connection.
+
+    A failed message is not retried here. The outbox retries it later, after
+    the retry_after seconds Telegram asked for if it rate limited the bot."""
+
+    def __init__(
+        self,
+        *,
+        api_url: str,
+        bot_api_key: str,
+        chat_id: str,
+        connect_timeout: float,
+        read_timeout: float,
+        pool_size: int,
+        message_max_length: int,
+    ) -> None:
+        self.url = f"{api_url}/bot{bot_api_key}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = (connect_timeout, read_timeout)
+        self.message_max_length = message_max_length
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._stats = NotificationStats()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return asdict(self._stats)
+
+    def _increment(self, counter: str, value: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self._stats, counter, getattr(self._stats, counter) + value)
+
+    def _post(self, text: str) -> None:
+        payload = {"chat_id": self.chat_id, "text": text}
+        try:
+            response = self.session.post(self.url, data=payload, timeout=self.timeout)
+        except requests.RequestException as error:
+            raise TelegramNotificationError(str(error)) from error
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.status_code == 200 and body.get("ok") is True:
+            return
+        raise TelegramNotificationError(
+            f"Telegram responded with {response.status_code}: {response.text}",
+            retry_after=body.get("parameters", {}).get("retry_after"),
+        )
+
+    def truncate(self, message: str) -> str:
+        """Cut a message which doesn't fit into one Telegram message,
+        which would otherwise be rejected on every attempt."""
+        if len(message) <= self.message_max_length:
+            return message
+        cut = self.message_max_length - len(TRUNCATION_MARK)
+        return message[:cut] + TRUNCATION_MARK
+
+    def coalesce(self, messages: Iterable[str]) -> list[list[str]]:
+        """Group messages into chunks which fit into one Telegram message,
+        one per message. Messages too long on their own are truncated."""
+        chunks = []
+        chunk = []
+        length = 0
+        for message in map(self.truncate, messages):
+            extra = len(message) + (1 if chunk else 0)
+            if chunk and length + extra > self.message_max_length:
+                chunks.append(chunk)
+                chunk = []
+                extra = len(message)
+                length = 0
+            chunk.append(message)
+            length += extra
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def send_chunk(self, messages: list[str]) -> None:
+        """Send several messages joined into a single sendMessage call."""
+        try:
+            self._post("\n".join(messages))
+        except TelegramNotificationError:
+            self._increment("failed", len(messages))
+            NOTIFICATIONS.labels("failed").inc(len(messages))
+            raise
+        self._increment("sent", len(messages))
+        NOTIFICATIONS.labels("sent").inc(len(messages))
+
+    def send_message(self, text: str) -> None:
+        self.send_chunk([self.truncate(text)])
+
+
+@lru_cache(maxsize=None)
+def get_telegram_client() -> TelegramClient:
+    return TelegramClient(
+        api_url=settings.TELEGRAM_API_URL,
+        bot_api_key=settings.TELEGRAM_BOT_API_KEY,
+        chat_id=settings.TELEGRAM_CHAT_ID,
+        connect_timeout=settings.TELEGRAM_CONNECT_TIMEOUT,
+        read_timeout=settings.TELEGRAM_READ_TIMEOUT,
+        pool_size=settings.TELEGRAM_POOL_SIZE,
+        message_max_length=settings.TELEGRAM_MESSAGE_MAX_LENGTH,
+    )
+
+
+@receiver(setting_changed)
+def reset_telegram_client(*, setting: str, **kwargs) -> None:
+    if setting in TELEGRAM_SETTINGS:
+        get_telegram_client.cache_clear()
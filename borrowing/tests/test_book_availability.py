@@ -0,0 +1,194 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.cache import BOOK_VERSION_KEY
+from book.models import Book
+from book.tests.test_book_api import BOOK_DETAIL_VIEW_NAME, sample_book
+from borrowing.availability import find_availability_drift, rebuild_book_availability
+from borrowing.models import Borrowing
+from borrowing.tests.test_borrowing_api import (
+    BORROWING_LIST_URL,
+    BORROWING_RETURN_VIEW_NAME,
+    sample_borrowing,
+)
+from borrowing.tests.test_borrowing_query_budgets import (
+    BORROWING_BULK_CREATE_URL,
+    BORROWING_BULK_RETURN_URL,
+)
+
+
+def days_from_today(days: int) -> datetime.date:
+    return datetime.date.today() + datetime.timedelta(days=days)
+
+
+class BookAvailabilityTest(TestCase):
+    def setUp(self):
+        # Leave no borrow throttle history behind for the other tests.
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+        self.client.force_authenticate(self.user)
+        self.book = sample_book(inventory=5)
+
+    def borrow(self, days: int) -> int:
+        response = self.client.post(
+            BORROWING_LIST_URL,
+            {"book": self.book.id, "expected_return_date": days_from_today(days)},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def return_borrowing(self, borrowing_id: int) -> None:
+        response = self.client.post(
+            reverse(BORROWING_RETURN_VIEW_NAME, args=[borrowing_id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def assertAvailability(
+        self, inventory: int, on_loan: int, next_due: datetime.date | None
+    ) -> None:
+        self.book.refresh_from_db()
+        self.assertEqual(
+            (self.book.inventory, self.book.copies_on_loan, self.book.next_due_date),
+            (inventory, on_loan, next_due),
+        )
+        self.assertEqual(self.book.total_copies, 5)
+
+    def test_borrow_keeps_the_earliest_due_date(self) -> None:
+        self.borrow(days=7)
+        self.assertAvailability(4, 1, days_from_today(7))
+
+        self.borrow(days=3)
+        self.borrow(days=10)
+        self.assertAvailability(2, 3, days_from_today(3))
+
+    def test_return_moves_the_next_due_date(self) -> None:
+        earliest = self.borrow(days=3)
+        latest = self.borrow(days=7)
+
+        self.return_borrowing(latest)
+        self.assertAvailability(4, 1, days_from_today(3))
+
+        self.return_borrowing(earliest)
+        self.assertAvailability(5, 0, None)
+
+    def test_return_of_the_earliest_loan_looks_up_the_next_one(self) -> None:
+        earliest = self.borrow(days=3)
+        self.borrow(days=7)
+
+        self.return_borrowing(earliest)
+
+        self.assertAvailability(4, 1, days_from_today(7))
+
+    def test_bulk_borrow_and_return(self) -> None:
+        response = self.client.post(
+            BORROWING_BULK_CREATE_URL,
+            [
+                {"book": self.book.id, "expected_return_date": days_from_today(days)}
+                for days in [7, 3, 10]
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertAvailability(2, 3, days_from_today(3))
+
+        self.client.post(
+            BORROWING_BULK_RETURN_URL,
+            {"borrowings": [borrowing["id"] for borrowing in response.data[:2]]},
+            format="json",
+        )
+        self.assertAvailability(4, 1, days_from_today(10))
+
+    def test_book_detail_shows_availability(self) -> None:
+        self.borrow(days=3)
+
+        response = self.client.get(reverse(BOOK_DETAIL_VIEW_NAME, args=[self.book.id]))
+
+        self.assertEqual(response.data["inventory"], 4)
+        self.assertEqual(response.data["total_copies"], 5)
+        self.assertEqual(response.data["next_due_date"], str(days_from_today(3)))
+
+
+class RebuildBookAvailabilityTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="user@test.com")
+        self.book = sample_book(title="Drifted", inventory=2)
+        self.consistent = sample_book(inventory=1)
+        sample_borrowing(
+            user=user, book=self.book, expected_return_date=days_from_today(5)
+        )
+        sample_borrowing(
+            user=user, book=self.book, expected_return_date=days_from_today(2)
+        )
+        returned = sample_borrowing(user=user, book=self.book)
+        Borrowing.objects.filter(pk=returned.pk).update(
+            actual_return_date=datetime.date.today()
+        )
+
+    def test_check_reports_drift_and_fails(self) -> None:
+        stdout = StringIO()
+
+        with self.assertRaisesMessage(
+            CommandError, "Books with drifted availability: 1"
+        ):
+            call_command("rebuild_book_availability", "--check", stdout=stdout)
+
+        self.assertEqual(
+            stdout.getvalue().splitlines(),
+            [
+                f"{self.book.id} Drifted: on loan 0 -> 2, next due None -> "
+                f"{days_from_today(2)}, on hold 0 -> 0"
+            ],
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.copies_on_loan, 0)
+
+    def test_drift_of_the_due_date_alone_is_found(self) -> None:
+        Book.objects.filter(pk=self.book.pk).update(copies_on_loan=2)
+        Book.objects.filter(pk=self.consistent.pk).update(
+            next_due_date=days_from_today(1)
+        )
+
+        self.assertEqual(
+            [book["pk"] for book in find_availability_drift()],
+            [self.book.pk, self.consistent.pk],
+        )
+
+    def test_rebuild_fixes_drift(self) -> None:
+        stdout = StringIO()
+
+        call_command("rebuild_book_availability", stdout=stdout)
+
+        self.assertEqual(stdout.getvalue(), "Rebuilt availability of books: 1\n")
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.copies_on_loan, 2)
+        self.assertEqual(self.book.next_due_date, days_from_today(2))
+        self.assertEqual(self.book.total_copies, 4)
+        stdout = StringIO()
+        call_command("rebuild_book_availability", "--check", stdout=stdout)
+        self.assertEqual(
+            stdout.getvalue(), "Availability of all books is consistent.\n"
+        )
+
+    def test_rebuild_invalidates_drifted_books_only(self) -> None:
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.assertEqual(rebuild_book_availability(), 1)
+
+        self.assertIsNotNone(cache.get(BOOK_VERSION_KEY.format(book_id=self.book.id)))
+        self.assertIsNone(
+            cache.get(BOOK_VERSION_KEY.format(book_id=self.consistent.id))
+        )
+        cache.clear()
+        self.assertEqual(rebuild_book_availability(), 0)
+        self.assertIsNone(cache.get(BOOK_VERSION_KEY.format(book_id=self.book.id)))
@@ -1,20 +1,22 @@
+import base64
 import datetime
+import json
 from typing import Any
 from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import F, Q
 from django.urls import reverse
 from django.utils.http import urlencode
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
 from rest_framework.test import APITestCase, APIClient
 
-import borrowing
 from book.models import Book
 from book.tests.test_book_api import sample_book
-from borrowing.models import Borrowing
-from borrowing.serializers import BorrowingSerializer, BorrowingCreateSerializer
+from borrowing.helpers import get_borrowings_notification_message
+from borrowing.models import Borrowing, BorrowingNotification, Hold, HoldQueue
+from borrowing.serializers import BorrowingSerializer
 from user.models import User
 
 BORROWING_LIST_URL = reverse("borrowing:borrowing-list")
@@ -32,6 +34,25 @@ def sample_borrowing(*, user: User, **params: Any) -> Borrowing:
     return Borrowing.objects.create(**data)
 
 
+def make_overdue(borrowing: Borrowing, days: int) -> Borrowing:
+    """Move the dates of the borrowing so that it is overdue by the given
+    number of days today."""
+    today = datetime.date.today()
+    Borrowing.objects.filter(pk=borrowing.pk).update(
+        borrow_date=today - datetime.timedelta(days=days + 7),
+        expected_return_date=today - datetime.timedelta(days=days),
+    )
+    borrowing.refresh_from_db()
+    return borrowing
+
+
+def sample_hold(*, user: User, book: Book) -> Hold:
+    """Queue a waiting hold of the user at the tail of the queue of the book."""
+    queue, _ = HoldQueue.objects.get_or_create(book=book)
+    HoldQueue.objects.filter(pk=book.pk).update(tail=F("tail") + 1)
+    return Hold.objects.create(book=book, user=user, ticket=queue.tail)
+
+
 class UnAuthenticatedBorrowingAPITest(APITestCase):
 
     def setUp(self):
@@ -98,7 +119,18 @@ class AuthenticatedBorrowingAPITest(APITestCase):
         qs = Borrowing.objects.filter(user=self.user)
         serializer = BorrowingSerializer(qs, many=True)
 
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
+
+    def test_borrowing_list_with_malformed_cursor(self) -> None:
+        cursor = base64.urlsafe_b64encode(
+            json.dumps({"p": ["not-a-date", 1], "r": 0}).encode()
+        ).decode()
+
+        response = self.client.get(
+            BORROWING_LIST_URL + "?" + urlencode({"cursor": cursor})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_borrowing_list_filtering_by_is_active_parameter(self) -> None:
         sample_borrowing(user=self.user)
@@ -130,7 +162,7 @@ class AuthenticatedBorrowingAPITest(APITestCase):
                 self.assertEqual(response.status_code, status.HTTP_200_OK)
 
                 serializer = BorrowingSerializer(queryset, many=True)
-                self.assertEqual(response.data, serializer.data)
+                self.assertEqual(response.data["results"], serializer.data)
 
     def test_borrowing_list_can_see_only_own_borrowings(self) -> None:
         another_user = get_user_model().objects.create_user(
@@ -148,7 +180,7 @@ class AuthenticatedBorrowingAPITest(APITestCase):
         qs = Borrowing.objects.filter(user=self.user)
         serializer = BorrowingSerializer(qs, many=True)
 
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_borrowing_detail(self) -> None:
 
@@ -173,13 +205,7 @@ class AuthenticatedBorrowingAPITest(APITestCase):
         response = self.client.get(another_user_borrowing_url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
-    @mock.patch(
-        f"{BorrowingCreateSerializer.__module__}.send_telegram_borrowing_notification"
-    )
-    def test_borrowing_create_with_authenticated_user(
-        self,
-        mock_send_telegram_borrowing_notification,
-    ) -> None:
+    def test_borrowing_create_with_authenticated_user(self) -> None:
         payload = {
             "book": sample_book().id,
             "expected_return_date": datetime.date.today() + datetime.timedelta(days=1),
@@ -195,12 +221,8 @@ class AuthenticatedBorrowingAPITest(APITestCase):
             created_borrowing.expected_return_date, payload["expected_return_date"]
         )
 
-    @mock.patch(
-        f"{BorrowingCreateSerializer.__module__}.send_telegram_borrowing_notification"
-    )
     def test_can_not_create_with_expected_return_date_in_the_past_or_today(
         self,
-        mock_send_telegram_borrowing_notification,
     ) -> None:
         incorrect_payload = {
             "book": sample_book().id,
@@ -216,13 +238,7 @@ class AuthenticatedBorrowingAPITest(APITestCase):
             ).detail,
         )
 
-    @mock.patch(
-        f"{BorrowingCreateSerializer.__module__}.send_telegram_borrowing_notification"
-    )
-    def test_can_not_create_if_book_inventory_equal_0(
-        self,
-        mock_send_telegram_borrowing_notification,
-    ) -> None:
+    def test_can_not_create_if_book_inventory_equal_0(self) -> None:
         book = sample_book(inventory=0)
         incorrect_payload = {
             "book": book.id,
@@ -238,13 +254,7 @@ class AuthenticatedBorrowingAPITest(APITestCase):
             ).detail,
         )
 
-    @mock.patch(
-        f"{BorrowingCreateSerializer.__module__}.send_telegram_borrowing_notification"
-    )
-    def test_create_decrease_book_inventory_by_1(
-        self,
-        mock_send_telegram_borrowing_notification,
-    ) -> None:
+    def test_create_decrease_book_inventory_by_1(self) -> None:
         book_inventory = 2
         payload = {
             "book": sample_book(inventory=book_inventory).id,
@@ -256,13 +266,7 @@ class AuthenticatedBorrowingAPITest(APITestCase):
         book = Book.objects.get(id=payload["book"])
         self.assertEqual(book.inventory, book_inventory - 1)
 
-    @mock.patch(
-        f"{BorrowingCreateSerializer.__module__}.send_telegram_borrowing_notification"
-    )
-    def test_create_sent_notification(
-        self,
-        mock_send_telegram_borrowing_notification,
-    ) -> None:
+    def test_create_enqueue_notification(self) -> None:
 
         payload = {
             "book": sample_book().id,
@@ -272,10 +276,26 @@ class AuthenticatedBorrowingAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         created_borrowing = Borrowing.objects.get(id=response.data["id"])
-        mock_send_telegram_borrowing_notification.assert_called_once_with(
-            created_borrowing
+        notification = BorrowingNotification.objects.get()
+        self.assertEqual(
+            notification.message,
+            get_borrowings_notification_message(created_borrowing),
+        )
+        self.assertEqual(
+            notification.status, BorrowingNotification.StatusChoices.PENDING
         )
 
+    @mock.patch("borrowing.telegram.requests.Session.post")
+    def test_create_does_not_call_telegram(self, mock_post) -> None:
+        payload = {
+            "book": sample_book().id,
+            "expected_return_date": datetime.date.today() + datetime.timedelta(days=1),
+        }
+        response = self.client.post(BORROWING_LIST_URL, data=payload)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        mock_post.assert_not_called()
+
     def test_return_borrowing(self) -> None:
         borrowing = self.borrowing
         self.assertFalse(borrowing.is_returned)
@@ -358,7 +378,7 @@ class AdminBorrowingAPITest(APITestCase):
         qs = Borrowing.objects.all()
         serializer = BorrowingSerializer(qs, many=True)
 
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_borrowing_list_can_view_borrowing_another_user(self) -> None:
         sample_borrowing(user=self.superuser)
@@ -376,7 +396,7 @@ class AdminBorrowingAPITest(APITestCase):
         qs = Borrowing.objects.all()
         serializer = BorrowingSerializer(qs, many=True)
 
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_borrowing_list_filtering_by_is_active_parameter(self) -> None:
         sample_borrowing(user=self.superuser)
@@ -408,7 +428,7 @@ class AdminBorrowingAPITest(APITestCase):
                 self.assertEqual(response.status_code, status.HTTP_200_OK)
 
                 serializer = BorrowingSerializer(queryset, many=True)
-                self.assertEqual(response.data, serializer.data)
+                self.assertEqual(response.data["results"], serializer.data)
 
     def test_borrowing_list_filtering_by_user_id_parameter(self) -> None:
         sample_borrowing(user=self.superuser)
@@ -428,7 +448,7 @@ class AdminBorrowingAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         serializer = BorrowingSerializer(queryset, many=True)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["results"], serializer.data)
 
     def test_borrowing_detail(self) -> None:
 
@@ -456,13 +476,7 @@ class AdminBorrowingAPITest(APITestCase):
         serializer = BorrowingSerializer(another_user_borrowing)
         self.assertEqual(response.data, serializer.data)
 
-    @mock.patch(
-        f"{BorrowingCreateSerializer.__module__}.send_telegram_borrowing_notification"
-    )
-    def test_borrowing_create_with_authenticated_user(
-        self,
-        mock_send_telegram_borrowing_notification,
-    ) -> None:
+    def test_borrowing_create_with_authenticated_user(self) -> None:
         payload = {
             "book": sample_book().id,
             "expected_return_date": datetime.date.today() + datetime.timedelta(days=1),
@@ -478,12 +492,8 @@ class AdminBorrowingAPITest(APITestCase):
             created_borrowing.expected_return_date, payload["expected_return_date"]
         )
 
-    @mock.patch(
-        f"{BorrowingCreateSerializer.__module__}.send_telegram_borrowing_notification"
-    )
     def test_can_not_create_with_expected_return_date_in_the_past_or_today(
         self,
-        mock_send_telegram_borrowing_notification,
     ) -> None:
         incorrect_payload = {
             "book": sample_book().id,
@@ -499,13 +509,7 @@ class AdminBorrowingAPITest(APITestCase):
             ).detail,
         )
 
-    @mock.patch(
-        f"{BorrowingCreateSerializer.__module__}.send_telegram_borrowing_notification"
-    )
-    def test_can_not_create_if_book_inventory_equal_0(
-        self,
-        mock_send_telegram_borrowing_notification,
-    ) -> None:
+    def test_can_not_create_if_book_inventory_equal_0(self) -> None:
         book = sample_book(inventory=0)
         incorrect_payload = {
             "book": book.id,
@@ -521,13 +525,7 @@ class AdminBorrowingAPITest(APITestCase):
             ).detail,
         )
 
-    @mock.patch(
-        f"{BorrowingCreateSerializer.__module__}.send_telegram_borrowing_notification"
-    )
-    def test_create_decrease_book_inventory_by_1(
-        self,
-        mock_send_telegram_borrowing_notification,
-    ) -> None:
+    def test_create_decrease_book_inventory_by_1(self) -> None:
         book_inventory = 2
         payload = {
             "book": sample_book(inventory=book_inventory).id,
@@ -539,13 +537,7 @@ class AdminBorrowingAPITest(APITestCase):
         book = Book.objects.get(id=payload["book"])
         self.assertEqual(book.inventory, book_inventory - 1)
 
-    @mock.patch(
-        f"{BorrowingCreateSerializer.__module__}.send_telegram_borrowing_notification"
-    )
-    def test_create_sent_notification(
-        self,
-        mock_send_telegram_borrowing_notification,
-    ) -> None:
+    def test_create_enqueue_notification(self) -> None:
 
         payload = {
             "book": sample_book().id,
@@ -555,10 +547,26 @@ class AdminBorrowingAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         created_borrowing = Borrowing.objects.get(id=response.data["id"])
-        mock_send_telegram_borrowing_notification.assert_called_once_with(
-            created_borrowing
+        notification = BorrowingNotification.objects.get()
+        self.assertEqual(
+            notification.message,
+            get_borrowings_notification_message(created_borrowing),
+        )
+        self.assertEqual(
+            notification.status, BorrowingNotification.StatusChoices.PENDING
         )
 
+    @mock.patch("borrowing.telegram.requests.Session.post")
+    def test_create_does_not_call_telegram(self, mock_post) -> None:
+        payload = {
+            "book": sample_book().id,
+            "expected_return_date": datetime.date.today() + datetime.timedelta(days=1),
+        }
+        response = self.client.post(BORROWING_LIST_URL, data=payload)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        mock_post.assert_not_called()
+
     def test_return_borrowing(self) -> None:
         borrowing = self.borrowing
         self.assertFalse(borrowing.is_returned)
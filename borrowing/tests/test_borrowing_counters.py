@@ -0,0 +1,202 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.models import Book
+from book.tests.test_book_api import sample_book
+from borrowing.models import Borrowing
+from borrowing.tests.test_borrowing_api import (
+    BORROWING_LIST_URL,
+    BORROWING_RETURN_VIEW_NAME,
+    sample_borrowing,
+)
+from borrowing.tests.test_borrowing_query_budgets import (
+    BORROWING_BULK_CREATE_URL,
+    BORROWING_BULK_RETURN_URL,
+)
+from user.tests.test_user_api import USER_MANAGE_ENDPOINT
+
+
+class BorrowingCountersTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+        self.client.force_authenticate(self.user)
+        self.books = [sample_book(inventory=5) for _ in range(3)]
+        self.expected_return_date = datetime.date.today() + datetime.timedelta(days=7)
+
+    def borrow(self, book: Book) -> int:
+        response = self.client.post(
+            BORROWING_LIST_URL,
+            {"book": book.id, "expected_return_date": self.expected_return_date},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def bulk_borrow(self, books: list[Book]) -> list[int]:
+        response = self.client.post(
+            BORROWING_BULK_CREATE_URL,
+            [
+                {"book": book.id, "expected_return_date": self.expected_return_date}
+                for book in books
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return [borrowing["id"] for borrowing in response.data]
+
+    def assertCounters(self, active: int, total: int) -> None:
+        self.user.refresh_from_db()
+        self.assertEqual(
+            (self.user.active_borrowings_count, self.user.total_borrowings_count),
+            (active, total),
+        )
+
+    def test_borrow_and_return_update_counters(self) -> None:
+        borrowing_id = self.borrow(self.books[0])
+        self.assertCounters(active=1, total=1)
+
+        self.client.post(reverse(BORROWING_RETURN_VIEW_NAME, args=[borrowing_id]))
+        self.assertCounters(active=0, total=1)
+
+    def test_bulk_borrow_and_return_update_counters(self) -> None:
+        borrowing_ids = self.bulk_borrow(self.books)
+        self.assertCounters(active=3, total=3)
+
+        self.client.post(
+            BORROWING_BULK_RETURN_URL,
+            {"borrowings": borrowing_ids[:2]},
+            format="json",
+        )
+        self.assertCounters(active=1, total=3)
+
+    def test_bulk_return_updates_counters_of_every_user(self) -> None:
+        other = get_user_model().objects.create_user(email="other@test.com")
+        get_user_model().objects.filter(pk__in=[self.user.pk, other.pk]).update(
+            active_borrowings_count=2
+        )
+        borrowings = [sample_borrowing(user=user) for user in [self.user, other, other]]
+        admin = get_user_model().objects.create_superuser(email="admin@test.com")
+        self.client.force_authenticate(admin)
+
+        self.client.post(
+            BORROWING_BULK_RETURN_URL,
+            {"borrowings": [borrowing.id for borrowing in borrowings]},
+            format="json",
+        )
+
+        self.assertCounters(active=1, total=0)
+        other.refresh_from_db()
+        self.assertEqual(other.active_borrowings_count, 0)
+
+    def test_drifted_counter_does_not_go_below_zero(self) -> None:
+        borrowing = sample_borrowing(user=self.user)
+
+        response = self.client.post(
+            reverse(BORROWING_RETURN_VIEW_NAME, args=[borrowing.id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertCounters(active=0, total=0)
+
+    @override_settings(BORROWING_MAX_ACTIVE_PER_USER=2)
+    def test_borrowing_limit(self) -> None:
+        self.borrow(self.books[0])
+        self.borrow(self.books[1])
+
+        response = self.client.post(
+            BORROWING_LIST_URL,
+            {
+                "book": self.books[2].id,
+                "expected_return_date": self.expected_return_date,
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data, ["You cannot have more than 2 active borrowings."]
+        )
+        self.assertCounters(active=2, total=2)
+        self.books[2].refresh_from_db()
+        self.assertEqual(self.books[2].inventory, 5)
+        self.assertEqual(Borrowing.objects.count(), 2)
+
+    @override_settings(BORROWING_MAX_ACTIVE_PER_USER=2)
+    def test_borrowing_limit_counts_bulk_items(self) -> None:
+        self.borrow(self.books[0])
+
+        response = self.client.post(
+            BORROWING_BULK_CREATE_URL,
+            [
+                {"book": book.id, "expected_return_date": self.expected_return_date}
+                for book in self.books[1:]
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertCounters(active=1, total=1)
+
+    @override_settings(BORROWING_MAX_ACTIVE_PER_USER=1)
+    def test_returned_borrowings_free_the_limit(self) -> None:
+        borrowing_id = self.borrow(self.books[0])
+        self.client.post(reverse(BORROWING_RETURN_VIEW_NAME, args=[borrowing_id]))
+
+        self.borrow(self.books[1])
+
+        self.assertCounters(active=1, total=2)
+
+    def test_profile_shows_counters(self) -> None:
+        self.borrow(self.books[0])
+        self.user.refresh_from_db()
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(USER_MANAGE_ENDPOINT)
+
+        self.assertEqual(response.data["active_borrowings_count"], 1)
+        self.assertEqual(response.data["total_borrowings_count"], 1)
+
+
+class ReconcileBorrowingCountersTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+        self.other = get_user_model().objects.create_user(
+            email="other@test.com", active_borrowings_count=1, total_borrowings_count=1
+        )
+        sample_borrowing(user=self.user)
+        returned = sample_borrowing(user=self.user)
+        Borrowing.objects.filter(pk=returned.pk).update(
+            actual_return_date=datetime.date.today()
+        )
+        sample_borrowing(user=self.other)
+
+    def test_drift_is_reported_and_fixed(self) -> None:
+        stdout = StringIO()
+
+        call_command("reconcile_borrowing_counters", stdout=stdout)
+
+        self.assertEqual(
+            stdout.getvalue().splitlines(),
+            [
+                "user@test.com: active 0 -> 1, total 0 -> 2",
+                "Users with drifted counters fixed: 1",
+            ],
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.active_borrowings_count, 1)
+        self.assertEqual(self.user.total_borrowings_count, 2)
+
+    def test_dry_run_does_not_fix(self) -> None:
+        stdout = StringIO()
+
+        call_command("reconcile_borrowing_counters", "--dry-run", stdout=stdout)
+
+        self.assertIn("Users with drifted counters found: 1", stdout.getvalue())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_borrowings_count, 0)
@@ -0,0 +1,50 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from borrowing.models import Borrowing
+from borrowing.serializers import BorrowingSerializer
+from borrowing.tests.test_borrowing_api import sample_borrowing
+
+BORROWING_EXPORT_URL = reverse("borrowing:borrowing-export")
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class BorrowingExportApiTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+        another_user = get_user_model().objects.create_user(email="another@test.com")
+        for _ in range(3):
+            sample_borrowing(user=self.user)
+        sample_borrowing(user=another_user)
+
+    def export(self) -> list[dict]:
+        response = self.client.get(BORROWING_EXPORT_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_export_authenticated_required(self) -> None:
+        response = self.client.get(BORROWING_EXPORT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_streams_own_borrowings(self) -> None:
+        self.client.force_authenticate(user=self.user)
+
+        self.assertEqual(
+            self.export(),
+            BorrowingSerializer(
+                Borrowing.objects.filter(user=self.user), many=True
+            ).data,
+        )
+
+    def test_export_streams_all_borrowings_for_admin(self) -> None:
+        self.user.is_staff = True
+        self.client.force_authenticate(user=self.user)
+
+        self.assertEqual(len(self.export()), 4)
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.utils.http import urlencode
+from rest_framework.test import APITestCase, APIClient
+
+from book.tests.test_book_pagination import collect_pages
+from borrowing.models import Borrowing
+from borrowing.tests.test_borrowing_api import BORROWING_LIST_URL, sample_borrowing
+
+
+class BorrowingPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="password12345",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_pages_with_same_borrow_date_are_ordered_by_id(self) -> None:
+        for _ in range(7):
+            sample_borrowing(user=self.user)
+
+        pages = collect_pages(
+            self.client, BORROWING_LIST_URL + "?" + urlencode({"page_size": 3})
+        )
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(
+            [borrowing_id for page in pages for borrowing_id in page],
+            list(
+                Borrowing.objects.order_by("-borrow_date", "-id").values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+
+    def test_pagination_keeps_filters(self) -> None:
+        for _ in range(4):
+            sample_borrowing(user=self.user)
+        returned = sample_borrowing(user=self.user)
+        Borrowing.objects.filter(pk=returned.pk).update(
+            actual_return_date=returned.borrow_date
+        )
+
+        pages = collect_pages(
+            self.client,
+            BORROWING_LIST_URL + "?" + urlencode({"page_size": 2, "is_active": True}),
+        )
+
+        ids = [borrowing_id for page in pages for borrowing_id in page]
+        self.assertEqual(len(ids), 4)
+        self.assertNotIn(returned.id, ids)
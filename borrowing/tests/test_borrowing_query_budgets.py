@@ -0,0 +1,120 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from book.models import Book
+from book.tests.test_book_pagination import create_books
+from borrowing.tests.test_borrowing_api import (
+    BORROWING_DETAIL_VIEW_NAME,
+    BORROWING_LIST_URL,
+    BORROWING_RETURN_VIEW_NAME,
+    make_overdue,
+    sample_borrowing,
+    sample_hold,
+)
+from borrowing.models import Hold
+from borrowing.tests.test_borrowing_export import BORROWING_EXPORT_URL
+from borrowing.views import BorrowingViewSet
+from library_service.testing import QueryBudgetTestMixin
+
+BORROWING_BULK_CREATE_URL = reverse("borrowing:borrowing-bulk-create")
+BORROWING_BULK_RETURN_URL = reverse("borrowing:borrowing-bulk-return")
+
+
+class BorrowingQueryBudgetTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+        self.admin = get_user_model().objects.create_superuser(email="admin@test.com")
+        self.authenticate(self.user)
+        self.books = create_books(5)
+        self.borrowings = [
+            sample_borrowing(user=self.user, book=book) for book in self.books
+        ]
+        self.expected_return_date = datetime.date.today() + datetime.timedelta(days=7)
+
+    def test_budgets_are_declared_for_every_action(self) -> None:
+        self.assertQueryBudgetsDeclared(BorrowingViewSet)
+
+    def test_list(self) -> None:
+        for user in [self.user, self.admin]:
+            self.authenticate(user)
+            for query in ["", "?is_active=true", f"?user_id={self.user.id}"]:
+                with self.assertQueryBudget(BorrowingViewSet, "list"):
+                    response = self.client.get(BORROWING_LIST_URL + query)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve(self) -> None:
+        url = reverse(BORROWING_DETAIL_VIEW_NAME, args=[self.borrowings[0].id])
+
+        with self.assertQueryBudget(BorrowingViewSet, "retrieve"):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_export(self) -> None:
+        with self.assertQueryBudget(BorrowingViewSet, "export"):
+            response = self.client.get(BORROWING_EXPORT_URL)
+            b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_create(self) -> None:
+        with self.assertQueryBudget(BorrowingViewSet, "create"):
+            response = self.client.post(
+                BORROWING_LIST_URL,
+                {
+                    "book": self.books[0].id,
+                    "expected_return_date": self.expected_return_date,
+                },
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_create_from_hold(self) -> None:
+        sample_hold(user=self.user, book=self.books[0])
+        Hold.objects.update(status=Hold.StatusChoices.READY)
+        Book.objects.filter(pk=self.books[0].pk).update(copies_on_hold=1)
+
+        with self.assertQueryBudget(BorrowingViewSet, "create"):
+            response = self.client.post(
+                BORROWING_LIST_URL,
+                {
+                    "book": self.books[0].id,
+                    "expected_return_date": self.expected_return_date,
+                },
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_return_borrowing(self) -> None:
+        make_overdue(self.borrowings[0], days=2)
+        sample_hold(user=self.admin, book=self.books[0])
+        url = reverse(BORROWING_RETURN_VIEW_NAME, args=[self.borrowings[0].id])
+
+        with self.assertQueryBudget(BorrowingViewSet, "return_borrowing"):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_bulk_create(self) -> None:
+        payload = [
+            {"book": book.id, "expected_return_date": self.expected_return_date}
+            for book in self.books
+        ]
+
+        with self.assertQueryBudget(BorrowingViewSet, "bulk_create"):
+            response = self.client.post(
+                BORROWING_BULK_CREATE_URL, payload, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_bulk_return(self) -> None:
+        for days, borrowing in enumerate(self.borrowings):
+            make_overdue(borrowing, days)
+            sample_hold(user=self.admin, book=borrowing.book)
+        payload = {"borrowings": [borrowing.id for borrowing in self.borrowings]}
+
+        with self.assertQueryBudget(BorrowingViewSet, "bulk_return"):
+            response = self.client.post(
+                BORROWING_BULK_RETURN_URL, payload, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
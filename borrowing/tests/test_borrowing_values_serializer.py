@@ -0,0 +1,62 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIClient
+
+from book.tests.test_book_api import sample_book
+from borrowing.models import Borrowing
+from borrowing.serializers import BorrowingSerializer, BorrowingValuesSerializer
+from borrowing.tests.test_borrowing_api import BORROWING_LIST_URL, sample_borrowing
+
+
+def render(data) -> bytes:
+    return JSONRenderer().render(data)
+
+
+class BorrowingValuesSerializerParityTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.superuser = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="password12345"
+        )
+        self.client.force_authenticate(user=self.superuser)
+        user = get_user_model().objects.create_user(email="ÿser@test.com")
+        today = datetime.date.today()
+
+        sample_borrowing(user=user)
+        sample_borrowing(
+            user=self.superuser,
+            book=sample_book(title="Überbuch «déjà vu»", daily_fee=999.99),
+            expected_return_date=today + datetime.timedelta(days=30),
+        )
+        returned = sample_borrowing(user=user, book=sample_book(daily_fee=1))
+        Borrowing.objects.filter(pk=returned.pk).update(actual_return_date=today)
+
+    def test_output_is_identical_to_borrowing_serializer(self) -> None:
+        queryset = Borrowing.objects.all()
+
+        self.assertEqual(
+            render(
+                BorrowingValuesSerializer.serialize(
+                    BorrowingValuesSerializer.get_rows(queryset)
+                )
+            ),
+            render(BorrowingSerializer(queryset, many=True).data),
+        )
+
+    def test_list_response_is_identical_to_borrowing_serializer(self) -> None:
+        response = self.client.get(BORROWING_LIST_URL)
+
+        self.assertEqual(
+            response.content,
+            render(
+                {
+                    "next": None,
+                    "previous": None,
+                    "results": BorrowingSerializer(
+                        Borrowing.objects.all(), many=True
+                    ).data,
+                }
+            ),
+        )
@@ -0,0 +1,262 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from book.models import Book
+from book.tests.test_book_api import sample_book
+from borrowing.models import Borrowing, BorrowingNotification
+from borrowing.tests.test_borrowing_api import sample_borrowing
+
+BORROWING_BULK_CREATE_URL = reverse("borrowing:borrowing-bulk-create")
+BORROWING_BULK_RETURN_URL = reverse("borrowing:borrowing-bulk-return")
+
+
+def bulk_payload(*books: Book) -> list[dict]:
+    expected_return_date = datetime.date.today() + datetime.timedelta(days=7)
+    return [
+        {"book": book.id, "expected_return_date": expected_return_date}
+        for book in books
+    ]
+
+
+class UnAuthenticatedBulkBorrowingApiTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_bulk_create_authenticated_required(self) -> None:
+        response = self.client.post(BORROWING_BULK_CREATE_URL, data=[], format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_return_authenticated_required(self) -> None:
+        response = self.client.post(BORROWING_BULK_RETURN_URL, data={}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedBulkBorrowingApiTest(APITestCase):
+    def setUp(self):
+        # Start with a full borrow throttle bucket whatever ran before.
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="password12345",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create(self) -> None:
+        first_book = sample_book(inventory=3)
+        second_book = sample_book(inventory=1)
+        payload = bulk_payload(first_book, first_book, second_book)
+
+        response = self.client.post(
+            BORROWING_BULK_CREATE_URL, data=payload, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+
+        borrowings = Borrowing.objects.filter(user=self.user)
+        self.assertEqual(borrowings.count(), 3)
+        self.assertEqual(
+            sorted(borrowings.values_list("book_id", flat=True)),
+            sorted([first_book.id, first_book.id, second_book.id]),
+        )
+
+        first_book.refresh_from_db()
+        second_book.refresh_from_db()
+        self.assertEqual(first_book.inventory, 1)
+        self.assertEqual(second_book.inventory, 0)
+
+    def test_bulk_create_shows_books_after_borrowing(self) -> None:
+        book = sample_book(inventory=3)
+
+        response = self.client.post(
+            BORROWING_BULK_CREATE_URL, data=bulk_payload(book, book), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        for borrowing in response.data:
+            self.assertEqual(borrowing["book"]["inventory"], 1)
+            self.assertEqual(
+                borrowing["book"]["next_due_date"],
+                str(datetime.date.today() + datetime.timedelta(days=7)),
+            )
+
+    def test_bulk_create_enqueues_notification_per_borrowing(self) -> None:
+        books = [sample_book() for _ in range(3)]
+
+        response = self.client.post(
+            BORROWING_BULK_CREATE_URL, data=bulk_payload(*books), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        messages = BorrowingNotification.objects.order_by("id").values_list(
+            "message", flat=True
+        )
+        self.assertEqual(len(messages), 3)
+        for book, message in zip(books, messages):
+            self.assertIn(book.title, message)
+
+    def test_bulk_create_is_atomic_if_book_not_available(self) -> None:
+        available_book = sample_book(inventory=5)
+        last_copy_book = sample_book(inventory=1)
+        payload = bulk_payload(available_book, last_copy_book, last_copy_book)
+
+        response = self.client.post(
+            BORROWING_BULK_CREATE_URL, data=payload, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(
+            response.data[1]["book"],
+            [f"{last_copy_book.title.lower()} is not available for borrowing."],
+        )
+
+        self.assertFalse(Borrowing.objects.exists())
+        available_book.refresh_from_db()
+        self.assertEqual(available_book.inventory, 5)
+
+    def test_bulk_create_with_invalid_items(self) -> None:
+        book = sample_book()
+        payload = [
+            {"book": book.id + 1000, "expected_return_date": datetime.date.today()},
+            {
+                "book": book.id,
+                "expected_return_date": datetime.date.today()
+                + datetime.timedelta(days=1),
+            },
+        ]
+
+        response = self.client.post(
+            BORROWING_BULK_CREATE_URL, data=payload, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("expected_return_date", response.data[0])
+        self.assertFalse(Borrowing.objects.exists())
+
+    def test_bulk_create_with_unknown_book(self) -> None:
+        book = sample_book()
+        payload = bulk_payload(book)
+        payload[0]["book"] = book.id + 1000
+
+        response = self.client.post(
+            BORROWING_BULK_CREATE_URL, data=payload, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("book", response.data[0])
+
+    def test_bulk_create_empty_or_too_large_list(self) -> None:
+        book = sample_book(inventory=100)
+        for payload in ([], bulk_payload(*[book] * 51)):
+            with self.subTest(items=len(payload)):
+                response = self.client.post(
+                    BORROWING_BULK_CREATE_URL, data=payload, format="json"
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_query_count_does_not_depend_on_items(self) -> None:
+        query_counts = []
+        for items in (2, 20):
+            books = [sample_book() for _ in range(items)]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    BORROWING_BULK_CREATE_URL, data=bulk_payload(*books), format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_bulk_return(self) -> None:
+        book = sample_book(inventory=0)
+        borrowings = [sample_borrowing(user=self.user, book=book) for _ in range(3)]
+
+        response = self.client.post(
+            BORROWING_BULK_RETURN_URL,
+            data={"borrowings": [borrowing.id for borrowing in borrowings]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        for borrowing in borrowings:
+            borrowing.refresh_from_db()
+            self.assertTrue(borrowing.is_returned)
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, 3)
+
+    def test_bulk_return_can_return_only_own_borrowings(self) -> None:
+        another_user = get_user_model().objects.create_user(
+            email="another_test@test.com",
+            password="password12345",
+        )
+        own_borrowing = sample_borrowing(user=self.user)
+        another_borrowing = sample_borrowing(user=another_user)
+
+        response = self.client.post(
+            BORROWING_BULK_RETURN_URL,
+            data={"borrowings": [own_borrowing.id, another_borrowing.id]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        own_borrowing.refresh_from_db()
+        another_borrowing.refresh_from_db()
+        self.assertFalse(own_borrowing.is_returned)
+        self.assertFalse(another_borrowing.is_returned)
+
+    def test_bulk_return_can_not_return_twice(self) -> None:
+        borrowing = sample_borrowing(user=self.user)
+        returned_borrowing = sample_borrowing(
+            user=self.user, actual_return_date=datetime.date.today()
+        )
+        book = borrowing.book
+        current_inventory = book.inventory
+
+        response = self.client.post(
+            BORROWING_BULK_RETURN_URL,
+            data={"borrowings": [borrowing.id, returned_borrowing.id]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["borrowings"],
+            [
+                f"Borrowings with ids {[returned_borrowing.id]} "
+                "were already returned."
+            ],
+        )
+
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, current_inventory)
+
+
+class AdminBulkBorrowingApiTest(APITestCase):
+    def setUp(self):
+        self.superuser = get_user_model().objects.create_superuser(
+            email="superuser_test@test.com",
+            password="password12345",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.superuser)
+
+    def test_bulk_return_another_user_borrowings(self) -> None:
+        another_user = get_user_model().objects.create_user(
+            email="another_test@test.com",
+            password="password12345",
+        )
+        borrowing = sample_borrowing(user=another_user)
+
+        response = self.client.post(
+            BORROWING_BULK_RETURN_URL,
+            data={"borrowings": [borrowing.id]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        borrowing.refresh_from_db()
+        self.assertTrue(borrowing.is_returned)
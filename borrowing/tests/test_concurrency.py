@@ -0,0 +1,144 @@
+import datetime
+import threading
+import time
+from typing import Any, Callable
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from book.models import Book
+from book.tests.test_book_api import sample_book
+from borrowing.models import Borrowing
+from borrowing.tests.test_borrowing_api import BORROWING_LIST_URL, sample_borrowing
+from borrowing.views import BorrowingViewSet
+from user.models import User
+
+THREADS = 16
+LOCK_RETRIES = 200
+
+borrowing_create_view = BorrowingViewSet.as_view({"post": "create"})
+borrowing_return_view = BorrowingViewSet.as_view({"post": "return_borrowing"})
+
+
+def retry_on_lock(function: Callable[[], Any]) -> Any:
+    """The in-memory test database uses table locks without a busy timeout,
+    so concurrent writers fail fast instead of waiting. Retry them the way
+    a client retries a failed request."""
+    for _ in range(LOCK_RETRIES):
+        try:
+            return function()
+        except OperationalError:
+            time.sleep(0.001)
+    raise AssertionError("Database stayed locked")
+
+
+def run_concurrently(target: Callable[[int], None], threads: int = THREADS) -> None:
+    barrier = threading.Barrier(threads)
+
+    def worker(number: int) -> None:
+        try:
+            barrier.wait()
+            target(number)
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+
+def post_borrowing(user: User, book: Book) -> int:
+    request = APIRequestFactory().post(
+        BORROWING_LIST_URL,
+        data={
+            "book": book.id,
+            "expected_return_date": datetime.date.today() + datetime.timedelta(days=1),
+        },
+    )
+    force_authenticate(request, user=user)
+    return borrowing_create_view(request).status_code
+
+
+def post_return(user: User, borrowing: Borrowing) -> int:
+    request = APIRequestFactory().post(f"{BORROWING_LIST_URL}{borrowing.pk}/return/")
+    force_authenticate(request, user=user)
+    return borrowing_return_view(request, pk=borrowing.pk).status_code
+
+
+class InventoryConcurrencyTest(TransactionTestCase):
+    """Many threads compete for the last copies of one book. The stock must
+    never be oversold and no increment or decrement may be lost."""
+
+    def setUp(self) -> None:
+        self.users = [
+            get_user_model().objects.create_user(email=f"user{number}@test.com")
+            for number in range(THREADS)
+        ]
+
+    def test_decrease_inventory_never_oversells(self) -> None:
+        book = sample_book(inventory=5)
+        results = []
+
+        run_concurrently(
+            lambda number: results.append(
+                retry_on_lock(lambda: Book.objects.decrease_inventory(book.id))
+            )
+        )
+
+        book.refresh_from_db()
+        self.assertEqual(results.count(True), 5)
+        self.assertEqual(results.count(False), THREADS - 5)
+        self.assertEqual(book.inventory, 0)
+
+    def test_concurrent_borrowings_of_last_copies(self) -> None:
+        copies = 3
+        book = sample_book(inventory=copies)
+        status_codes = []
+
+        run_concurrently(
+            lambda number: status_codes.append(
+                retry_on_lock(lambda: post_borrowing(self.users[number], book))
+            )
+        )
+
+        book.refresh_from_db()
+        self.assertEqual(status_codes.count(status.HTTP_201_CREATED), copies)
+        self.assertEqual(
+            status_codes.count(status.HTTP_400_BAD_REQUEST), THREADS - copies
+        )
+        self.assertEqual(Borrowing.objects.filter(book=book).count(), copies)
+        self.assertEqual(book.inventory, 0)
+
+    def test_concurrent_returns_do_not_lose_updates(self) -> None:
+        book = sample_book(inventory=0)
+        borrowings = [sample_borrowing(user=user, book=book) for user in self.users]
+
+        run_concurrently(
+            lambda number: retry_on_lock(
+                lambda: post_return(self.users[number], borrowings[number])
+            )
+        )
+
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, THREADS)
+
+    def test_same_borrowing_is_returned_once(self) -> None:
+        book = sample_book(inventory=0)
+        borrowing = sample_borrowing(user=self.users[0], book=book)
+        status_codes = []
+
+        run_concurrently(
+            lambda number: status_codes.append(
+                retry_on_lock(lambda: post_return(self.users[0], borrowing))
+            )
+        )
+
+        book.refresh_from_db()
+        self.assertEqual(status_codes.count(status.HTTP_204_NO_CONTENT), 1)
+        self.assertEqual(status_codes.count(status.HTTP_400_BAD_REQUEST), THREADS - 1)
+        self.assertEqual(book.inventory, 1)
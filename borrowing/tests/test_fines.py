@@ -0,0 +1,199 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.tests.test_book_api import sample_book
+from borrowing.fines import accrue_fines
+from borrowing.models import Borrowing, Fine
+from borrowing.tests.test_borrowing_api import (
+    BORROWING_RETURN_VIEW_NAME,
+    make_overdue,
+    sample_borrowing,
+)
+from borrowing.tests.test_borrowing_query_budgets import BORROWING_BULK_RETURN_URL
+
+
+class AccrueFinesTest(TestCase):
+    def setUp(self):
+        self.today = datetime.date.today()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+        self.book = sample_book(daily_fee=Decimal("0.50"))
+
+    def test_overdue_borrowings_are_fined(self) -> None:
+        overdue = make_overdue(sample_borrowing(user=self.user, book=self.book), 3)
+        sample_borrowing(user=self.user, book=self.book)
+        make_overdue(sample_borrowing(user=self.user, book=self.book), 0)
+
+        self.assertEqual(accrue_fines(), (1, 1))
+
+        fine = Fine.objects.get()
+        self.assertEqual(fine.borrowing, overdue)
+        self.assertEqual(fine.user, self.user)
+        self.assertEqual(fine.days, 3)
+        self.assertEqual(fine.amount, Decimal("1.50"))
+        self.assertEqual(fine.accrued_until, self.today)
+        self.assertFalse(fine.is_settled)
+
+    @override_settings(BORROWING_FINE_MULTIPLIER=Decimal("2"))
+    def test_daily_fee_is_multiplied(self) -> None:
+        make_overdue(sample_borrowing(user=self.user, book=self.book), 2)
+
+        accrue_fines()
+
+        fine = Fine.objects.get()
+        self.assertEqual(fine.daily_fee, Decimal("1.00"))
+        self.assertEqual(fine.amount, Decimal("2.00"))
+
+    def test_returned_borrowings_are_not_fined(self) -> None:
+        borrowing = make_overdue(sample_borrowing(user=self.user, book=self.book), 3)
+        Borrowing.objects.filter(pk=borrowing.pk).update(actual_return_date=self.today)
+
+        self.assertEqual(accrue_fines(), (0, 0))
+        self.assertFalse(Fine.objects.exists())
+
+    def test_fines_are_accrued_incrementally(self) -> None:
+        make_overdue(sample_borrowing(user=self.user, book=self.book), 3)
+        make_overdue(sample_borrowing(user=self.user, book=self.book), 5)
+        accrue_fines()
+        make_overdue(sample_borrowing(user=self.user, book=self.book), 0)
+        tomorrow = self.today + datetime.timedelta(days=1)
+
+        with self.assertNumQueries(4):
+            self.assertEqual(accrue_fines(tomorrow), (1, 3))
+
+        self.assertEqual(
+            list(Fine.objects.order_by("days").values_list("days", "amount")),
+            [(1, Decimal("0.50")), (4, Decimal("2.00")), (6, Decimal("3.00"))],
+        )
+        self.assertEqual(accrue_fines(tomorrow), (0, 0))
+
+    def test_accrual_skips_settled_fines(self) -> None:
+        make_overdue(sample_borrowing(user=self.user, book=self.book), 3)
+        accrue_fines()
+        Fine.objects.update(is_settled=True)
+
+        accrue_fines(self.today + datetime.timedelta(days=2))
+
+        self.assertEqual(Fine.objects.get().days, 3)
+
+    def test_fines_of_borrowings_returned_outside_of_api_are_settled(self) -> None:
+        borrowing = make_overdue(sample_borrowing(user=self.user, book=self.book), 3)
+        accrue_fines(self.today - datetime.timedelta(days=2))
+        Borrowing.objects.filter(pk=borrowing.pk).update(actual_return_date=self.today)
+
+        self.assertEqual(accrue_fines(self.today + datetime.timedelta(days=5)), (0, 0))
+
+        fine = Fine.objects.get()
+        self.assertEqual(fine.days, 3)
+        self.assertEqual(fine.amount, Decimal("1.50"))
+        self.assertEqual(fine.accrued_until, self.today)
+        self.assertTrue(fine.is_settled)
+
+    def test_command(self) -> None:
+        make_overdue(sample_borrowing(user=self.user, book=self.book), 3)
+        stdout = StringIO()
+
+        call_command("accrue_fines", "--until", str(self.today), stdout=stdout)
+
+        self.assertEqual(stdout.getvalue().strip(), "New fines: 1, accrued: 1")
+
+
+class SettleFinesTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+        self.client.force_authenticate(self.user)
+        self.book = sample_book(daily_fee=Decimal("0.50"))
+
+    def return_borrowing(self, borrowing: Borrowing) -> None:
+        response = self.client.post(
+            reverse(BORROWING_RETURN_VIEW_NAME, args=[borrowing.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_return_settles_exact_fine(self) -> None:
+        borrowing = make_overdue(sample_borrowing(user=self.user, book=self.book), 4)
+
+        self.return_borrowing(borrowing)
+
+        fine = Fine.objects.get()
+        self.assertEqual(fine.borrowing, borrowing)
+        self.assertEqual(fine.days, 4)
+        self.assertEqual(fine.amount, Decimal("2.00"))
+        self.assertTrue(fine.is_settled)
+
+    def test_return_settles_accrued_fine(self) -> None:
+        borrowing = make_overdue(sample_borrowing(user=self.user, book=self.book), 4)
+        accrue_fines(datetime.date.today() - datetime.timedelta(days=2))
+
+        self.return_borrowing(borrowing)
+
+        fine = Fine.objects.get()
+        self.assertEqual(fine.days, 4)
+        self.assertEqual(fine.amount, Decimal("2.00"))
+        self.assertEqual(fine.accrued_until, datetime.date.today())
+        self.assertTrue(fine.is_settled)
+
+    def test_return_in_time_is_not_fined(self) -> None:
+        self.return_borrowing(sample_borrowing(user=self.user, book=self.book))
+
+        self.assertFalse(Fine.objects.exists())
+
+    def test_returns_are_dated_in_the_current_time_zone(self) -> None:
+        borrowings = [
+            make_overdue(sample_borrowing(user=self.user, book=self.book), 1)
+            for _ in range(2)
+        ]
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+
+        with mock.patch("django.utils.timezone.localdate", return_value=tomorrow):
+            self.return_borrowing(borrowings[0])
+            response = self.client.post(
+                BORROWING_BULK_RETURN_URL,
+                {"borrowings": [borrowings[1].id]},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            list(Fine.objects.values_list("days", "accrued_until")),
+            [(2, tomorrow), (2, tomorrow)],
+        )
+        self.assertEqual(
+            list(Borrowing.objects.values_list("actual_return_date", flat=True)),
+            [tomorrow, tomorrow],
+        )
+
+    def test_bulk_return_settles_fines(self) -> None:
+        borrowings = [
+            make_overdue(sample_borrowing(user=self.user, book=self.book), days)
+            for days in [0, 1, 3, 3]
+        ]
+
+        response = self.client.post(
+            BORROWING_BULK_RETURN_URL,
+            {"borrowings": [borrowing.id for borrowing in borrowings]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            list(
+                Fine.objects.order_by("borrowing_id").values_list(
+                    "borrowing", "days", "amount", "is_settled"
+                )
+            ),
+            [
+                (borrowings[1].id, 1, Decimal("0.50"), True),
+                (borrowings[2].id, 3, Decimal("1.50"), True),
+                (borrowings[3].id, 3, Decimal("1.50"), True),
+            ],
+        )
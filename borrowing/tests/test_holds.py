@@ -0,0 +1,366 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.models import Book
+from book.tests.test_book_api import sample_book
+from borrowing.availability import find_availability_drift
+from borrowing.holds import expire_holds
+from borrowing.models import Borrowing, BorrowingNotification, Hold, HoldQueue
+from borrowing.tests.test_borrowing_api import (
+    BORROWING_LIST_URL,
+    BORROWING_RETURN_VIEW_NAME,
+    sample_borrowing,
+    sample_hold,
+)
+from borrowing.tests.test_borrowing_query_budgets import BORROWING_BULK_RETURN_URL
+from borrowing.views import HoldViewSet
+from library_service.testing import QueryBudgetTestMixin
+
+HOLD_LIST_URL = reverse("borrowing:hold-list")
+HOLD_DETAIL_VIEW_NAME = "borrowing:hold-detail"
+HOLD_CANCEL_VIEW_NAME = "borrowing:hold-cancel"
+
+
+class HoldTestCase(TestCase):
+    def setUp(self):
+        # Leave no borrow throttle history behind for the other tests.
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(email=f"user{number}@test.com")
+            for number in range(3)
+        ]
+        self.admin = get_user_model().objects.create_superuser(email="admin@test.com")
+        self.book = sample_book(title="Held", inventory=0)
+        self.borrowings = [
+            sample_borrowing(user=self.admin, book=self.book) for _ in range(2)
+        ]
+        Book.objects.filter(pk=self.book.pk).update(copies_on_loan=2)
+
+    def place_hold(self, user) -> dict:
+        self.client.force_authenticate(user)
+        response = self.client.post(HOLD_LIST_URL, {"book": self.book.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def get_hold(self, hold_id: int, user=None) -> dict:
+        self.client.force_authenticate(user or self.admin)
+        return self.client.get(reverse(HOLD_DETAIL_VIEW_NAME, args=[hold_id])).data
+
+    def return_borrowing(self, borrowing: Borrowing) -> None:
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(
+            reverse(BORROWING_RETURN_VIEW_NAME, args=[borrowing.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def assertBookCopies(self, inventory: int, on_loan: int, on_hold: int) -> None:
+        self.book.refresh_from_db()
+        self.assertEqual(
+            (self.book.inventory, self.book.copies_on_loan, self.book.copies_on_hold),
+            (inventory, on_loan, on_hold),
+        )
+
+
+class PlaceHoldTest(HoldTestCase):
+    def test_holds_are_queued_in_order(self) -> None:
+        holds = [self.place_hold(user) for user in self.users]
+
+        self.assertEqual([hold["position"] for hold in holds], [1, 2, 3])
+        self.assertEqual(
+            [self.get_hold(hold["id"])["position"] for hold in holds], [1, 2, 3]
+        )
+        self.assertEqual(holds[0]["status"], Hold.StatusChoices.WAITING)
+        self.assertEqual(holds[0]["user"], "user0@test.com")
+
+    def test_available_book_cannot_be_held(self) -> None:
+        Book.objects.filter(pk=self.book.pk).update(inventory=1)
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.post(HOLD_LIST_URL, {"book": self.book.id})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"book": ["held is available for borrowing."]})
+
+    def test_book_cannot_be_held_twice(self) -> None:
+        self.place_hold(self.users[0])
+
+        response = self.client.post(HOLD_LIST_URL, {"book": self.book.id})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Hold.objects.count(), 1)
+
+    def test_users_see_own_holds_and_admin_all(self) -> None:
+        for user in self.users:
+            self.place_hold(user)
+
+        self.client.force_authenticate(self.users[1])
+        response = self.client.get(HOLD_LIST_URL)
+        self.assertEqual(
+            [(hold["user"], hold["position"]) for hold in response.data["results"]],
+            [("user1@test.com", 2)],
+        )
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(HOLD_LIST_URL)
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_other_users_hold_is_not_found(self) -> None:
+        hold = self.place_hold(self.users[0])
+
+        self.client.force_authenticate(self.users[1])
+        response = self.client.get(reverse(HOLD_DETAIL_VIEW_NAME, args=[hold["id"]]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AllocateHoldTest(HoldTestCase):
+    def test_return_gives_the_copy_to_the_first_hold(self) -> None:
+        first, second = [self.place_hold(user) for user in self.users[:2]]
+
+        self.return_borrowing(self.borrowings[0])
+
+        ready = self.get_hold(first["id"])
+        self.assertEqual(ready["status"], Hold.StatusChoices.READY)
+        self.assertIsNone(ready["position"])
+        self.assertIsNotNone(ready["expires_at"])
+        self.assertEqual(self.get_hold(second["id"])["position"], 1)
+        self.assertBookCopies(inventory=0, on_loan=1, on_hold=1)
+        self.assertTrue(
+            BorrowingNotification.objects.last().message.startswith(
+                f"Hold ready:\nid: {first['id']}\n"
+            )
+        )
+        self.assertEqual(find_availability_drift(), [])
+
+    def test_return_without_holds_restocks_the_book(self) -> None:
+        self.return_borrowing(self.borrowings[0])
+
+        self.assertBookCopies(inventory=1, on_loan=1, on_hold=0)
+
+    def test_bulk_return_gives_copies_to_the_first_holds(self) -> None:
+        holds = [self.place_hold(user) for user in self.users]
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.post(
+            BORROWING_BULK_RETURN_URL,
+            {"borrowings": [borrowing.id for borrowing in self.borrowings]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            [self.get_hold(hold["id"])["status"] for hold in holds],
+            ["ready", "ready", "waiting"],
+        )
+        self.assertEqual(self.get_hold(holds[2]["id"])["position"], 1)
+        self.assertBookCopies(inventory=0, on_loan=0, on_hold=2)
+        self.assertEqual(
+            [
+                message.split("\n")[1]
+                for message in BorrowingNotification.objects.filter(
+                    message__startswith="Hold ready:"
+                )
+                .order_by("id")
+                .values_list("message", flat=True)
+            ],
+            [f"id: {hold['id']}" for hold in holds[:2]],
+        )
+
+    def test_only_the_holder_can_borrow_the_held_copy(self) -> None:
+        hold = self.place_hold(self.users[0])
+        self.return_borrowing(self.borrowings[0])
+        payload = {
+            "book": self.book.id,
+            "expected_return_date": datetime.date.today() + datetime.timedelta(days=7),
+        }
+
+        self.client.force_authenticate(self.users[1])
+        response = self.client.post(BORROWING_LIST_URL, payload)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.users[0])
+        response = self.client.post(BORROWING_LIST_URL, payload)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.get_hold(hold["id"])["status"], Hold.StatusChoices.FULFILLED
+        )
+        self.assertBookCopies(inventory=0, on_loan=2, on_hold=0)
+
+    def test_holder_takes_the_held_copy_when_others_are_available(self) -> None:
+        self.place_hold(self.users[0])
+        self.return_borrowing(self.borrowings[0])
+        self.return_borrowing(self.borrowings[1])
+        self.assertBookCopies(inventory=1, on_loan=0, on_hold=1)
+
+        self.client.force_authenticate(self.users[0])
+        self.client.post(
+            BORROWING_LIST_URL,
+            {
+                "book": self.book.id,
+                "expected_return_date": datetime.date.today()
+                + datetime.timedelta(days=7),
+            },
+        )
+
+        self.assertBookCopies(inventory=1, on_loan=1, on_hold=0)
+
+
+class CancelHoldTest(HoldTestCase):
+    def cancel(self, hold: dict, user=None):
+        self.client.force_authenticate(user or self.admin)
+        return self.client.post(reverse(HOLD_CANCEL_VIEW_NAME, args=[hold["id"]]))
+
+    def test_cancel_moves_the_holds_behind_forward(self) -> None:
+        holds = [self.place_hold(user) for user in self.users]
+
+        response = self.cancel(holds[1], self.users[1])
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            self.get_hold(holds[1]["id"])["status"], Hold.StatusChoices.CANCELLED
+        )
+        self.assertEqual(
+            [self.get_hold(holds[number]["id"])["position"] for number in [0, 2]],
+            [1, 2],
+        )
+        self.assertEqual(self.place_hold(self.users[1])["position"], 3)
+
+    def test_cancelled_ready_hold_passes_the_copy_on(self) -> None:
+        first, second = [self.place_hold(user) for user in self.users[:2]]
+        self.return_borrowing(self.borrowings[0])
+
+        self.cancel(first)
+
+        self.assertEqual(
+            self.get_hold(second["id"])["status"], Hold.StatusChoices.READY
+        )
+        self.assertBookCopies(inventory=0, on_loan=1, on_hold=1)
+
+    def test_cancelled_ready_hold_restocks_the_book_if_nobody_waits(self) -> None:
+        hold = self.place_hold(self.users[0])
+        self.return_borrowing(self.borrowings[0])
+
+        self.cancel(hold)
+
+        self.assertBookCopies(inventory=1, on_loan=1, on_hold=0)
+
+    def test_hold_cannot_be_cancelled_twice(self) -> None:
+        hold = self.place_hold(self.users[0])
+        self.cancel(hold)
+
+        response = self.cancel(hold)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Hold.objects.get().status, Hold.StatusChoices.CANCELLED)
+
+    def test_cancel_leaves_the_tickets_behind_as_they_are(self) -> None:
+        holds = [self.place_hold(user) for user in self.users]
+
+        self.cancel(holds[0], self.users[0])
+
+        self.assertEqual(
+            list(Hold.objects.order_by("id").values_list("ticket", flat=True)),
+            [0, 1, 2],
+        )
+        self.assertEqual(HoldQueue.objects.get().tail, 3)
+
+    def test_copies_skip_cancelled_holds(self) -> None:
+        holds = [self.place_hold(user) for user in self.users]
+        self.cancel(holds[0], self.users[0])
+        self.cancel(holds[1], self.users[1])
+
+        self.return_borrowing(self.borrowings[0])
+
+        self.assertEqual(
+            self.get_hold(holds[2]["id"])["status"], Hold.StatusChoices.READY
+        )
+        self.assertEqual(HoldQueue.objects.get().head, 3)
+        self.assertBookCopies(inventory=0, on_loan=1, on_hold=1)
+
+        self.return_borrowing(self.borrowings[1])
+
+        self.assertBookCopies(inventory=1, on_loan=0, on_hold=1)
+        self.assertEqual(find_availability_drift(), [])
+
+
+class ExpireHoldsTest(HoldTestCase):
+    def test_expired_copies_go_to_the_next_holds_or_the_inventory(self) -> None:
+        first, second = [self.place_hold(user) for user in self.users[:2]]
+        self.return_borrowing(self.borrowings[0])
+        self.return_borrowing(self.borrowings[1])
+        later = timezone.now() + datetime.timedelta(days=10)
+
+        self.assertEqual(expire_holds(now=later, batch_size=1), 2)
+
+        self.assertEqual(
+            [self.get_hold(hold["id"])["status"] for hold in [first, second]],
+            ["expired", "expired"],
+        )
+        self.assertBookCopies(inventory=2, on_loan=0, on_hold=0)
+
+    def test_expired_copy_goes_to_the_next_hold(self) -> None:
+        first, second = [self.place_hold(user) for user in self.users[:2]]
+        self.return_borrowing(self.borrowings[0])
+        Hold.objects.filter(pk=first["id"]).update(
+            expires_at=timezone.now() - datetime.timedelta(minutes=1)
+        )
+        stdout = StringIO()
+
+        call_command("expire_holds", stdout=stdout)
+
+        self.assertEqual(stdout.getvalue(), "Expired holds: 1\n")
+        self.assertEqual(
+            self.get_hold(second["id"])["status"], Hold.StatusChoices.READY
+        )
+        self.assertBookCopies(inventory=0, on_loan=1, on_hold=1)
+
+    def test_holds_not_due_are_kept(self) -> None:
+        hold = self.place_hold(self.users[0])
+        self.return_borrowing(self.borrowings[0])
+
+        self.assertEqual(expire_holds(), 0)
+
+        self.assertEqual(self.get_hold(hold["id"])["status"], Hold.StatusChoices.READY)
+
+
+class HoldQueryBudgetTest(QueryBudgetTestMixin, HoldTestCase):
+    def test_budgets_are_declared_for_every_action(self) -> None:
+        self.assertQueryBudgetsDeclared(HoldViewSet)
+
+    def test_list_and_retrieve(self) -> None:
+        holds = [sample_hold(user=user, book=self.book) for user in self.users]
+        self.authenticate(self.admin)
+
+        with self.assertQueryBudget(HoldViewSet, "list"):
+            self.client.get(HOLD_LIST_URL)
+        with self.assertQueryBudget(HoldViewSet, "retrieve"):
+            self.client.get(reverse(HOLD_DETAIL_VIEW_NAME, args=[holds[0].id]))
+
+    def test_create(self) -> None:
+        self.authenticate(self.users[0])
+
+        with self.assertQueryBudget(HoldViewSet, "create"):
+            response = self.client.post(HOLD_LIST_URL, {"book": self.book.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_cancel(self) -> None:
+        holds = [sample_hold(user=user, book=self.book) for user in self.users[:2]]
+        self.return_borrowing(self.borrowings[0])
+        self.authenticate(self.users[0])
+
+        with self.assertQueryBudget(HoldViewSet, "cancel"):
+            response = self.client.post(
+                reverse(HOLD_CANCEL_VIEW_NAME, args=[holds[0].id])
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,250 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from book.tests.test_book_api import sample_book
+from borrowing.helpers import enqueue_borrowings_notification
+from borrowing.models import BorrowingNotification
+from borrowing.outbox import get_retry_delay, process_notification_batch
+from borrowing.tests.test_borrowing_api import sample_borrowing
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        length = int(self.headers["Content-Length"])
+        payload = parse_qs(self.rfile.read(length).decode())
+        self.server.received.append((self.path, payload))
+        self.server.client_ports.append(self.client_address[1])
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        status_code = (
+            self.server.status_codes.pop(0) if self.server.status_codes else 200
+        )
+        body = {"ok": status_code == 200}
+        if status_code == 429:
+            body["parameters"] = {"retry_after": self.server.retry_after}
+        body = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address) -> None:
+        pass
+
+
+class FakeTelegramServerTestCase(TestCase):
+    def setUp(self) -> None:
+        self.server = FakeTelegramServer(("127.0.0.1", 0), FakeTelegramHandler)
+        self.server.received = []
+        self.server.status_codes = []
+        self.server.client_ports = []
+        self.server.delay = 0
+        self.server.retry_after = 1
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        settings_override = override_settings(
+            TELEGRAM_API_URL=f"http://127.0.0.1:{self.server.server_port}",
+            TELEGRAM_BOT_API_KEY="test-key",
+            TELEGRAM_CHAT_ID="42",
+            NOTIFICATION_MAX_ATTEMPTS=2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class NotificationWorkerTest(FakeTelegramServerTestCase):
+    def test_worker_sends_pending_notifications_in_one_message(self) -> None:
+        BorrowingNotification.objects.create(message="first")
+        BorrowingNotification.objects.create(message="second")
+
+        sent, failed = process_notification_batch(batch_size=10)
+
+        self.assertEqual((sent, failed), (2, 0))
+        self.assertEqual(
+            [payload["text"] for _, payload in self.server.received],
+            [["first\nsecond"]],
+        )
+        self.assertEqual(self.server.received[0][0], "/bottest-key/sendMessage")
+        self.assertEqual(self.server.received[0][1]["chat_id"], ["42"])
+        self.assertFalse(
+            BorrowingNotification.objects.exclude(
+                status=BorrowingNotification.StatusChoices.SENT
+            ).exists()
+        )
+
+    def test_worker_respects_batch_size(self) -> None:
+        for number in range(3):
+            BorrowingNotification.objects.create(message=str(number))
+
+        sent, failed = process_notification_batch(batch_size=2)
+
+        self.assertEqual((sent, failed), (2, 0))
+        self.assertEqual(
+            BorrowingNotification.objects.filter(
+                status=BorrowingNotification.StatusChoices.PENDING
+            ).count(),
+            1,
+        )
+
+    def test_worker_skips_not_due_notifications(self) -> None:
+        BorrowingNotification.objects.create(
+            message="later",
+            next_attempt_at=timezone.now() + timedelta(minutes=5),
+        )
+
+        self.assertEqual(process_notification_batch(batch_size=10), (0, 0))
+        self.assertEqual(self.server.received, [])
+
+    def test_failed_delivery_is_retried_with_backoff(self) -> None:
+        self.server.status_codes = [500]
+        notification = BorrowingNotification.objects.create(message="retry")
+
+        before = timezone.now()
+        sent, failed = process_notification_batch(batch_size=10)
+
+        self.assertEqual((sent, failed), (0, 1))
+        notification.refresh_from_db()
+        self.assertEqual(
+            notification.status, BorrowingNotification.StatusChoices.PENDING
+        )
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreaterEqual(
+            notification.next_attempt_at, before + get_retry_delay(1)
+        )
+        self.assertIn("500", notification.last_error)
+
+    def test_rate_limited_delivery_is_retried_after_retry_after(self) -> None:
+        self.server.status_codes = [429]
+        self.server.retry_after = 600
+        notification = BorrowingNotification.objects.create(message="flood")
+
+        before = timezone.now()
+        started = time.monotonic()
+        sent, failed = process_notification_batch(batch_size=10)
+
+        self.assertEqual((sent, failed), (0, 1))
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(len(self.server.received), 1)
+        notification.refresh_from_db()
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreaterEqual(
+            notification.next_attempt_at, before + timedelta(seconds=600)
+        )
+
+    def test_notification_fails_after_max_attempts(self) -> None:
+        self.server.status_codes = [500, 500]
+        notification = BorrowingNotification.objects.create(message="broken")
+
+        process_notification_batch(batch_size=10)
+        BorrowingNotification.objects.update(next_attempt_at=timezone.now())
+        process_notification_batch(batch_size=10)
+
+        notification.refresh_from_db()
+        self.assertEqual(
+            notification.status, BorrowingNotification.StatusChoices.FAILED
+        )
+        self.assertEqual(notification.attempts, 2)
+
+    @override_settings(TELEGRAM_MESSAGE_MAX_LENGTH=10)
+    def test_worker_splits_messages_exceeding_max_length(self) -> None:
+        BorrowingNotification.objects.create(message="a" * 6)
+        BorrowingNotification.objects.create(message="b" * 6)
+        self.server.status_codes = [200, 500]
+
+        sent, failed = process_notification_batch(batch_size=10)
+
+        self.assertEqual((sent, failed), (1, 1))
+        self.assertEqual(
+            list(
+                BorrowingNotification.objects.order_by("id").values_list(
+                    "status", flat=True
+                )
+            ),
+            [
+                BorrowingNotification.StatusChoices.SENT,
+                BorrowingNotification.StatusChoices.PENDING,
+            ],
+        )
+
+    @override_settings(TELEGRAM_MESSAGE_MAX_LENGTH=10)
+    def test_worker_truncates_single_message_exceeding_max_length(self) -> None:
+        BorrowingNotification.objects.create(message="a" * 25)
+
+        sent, failed = process_notification_batch(batch_size=10)
+
+        self.assertEqual((sent, failed), (1, 0))
+        self.assertEqual(self.server.received[0][1]["text"], ["a" * 9 + "…"])
+
+    def test_worker_splits_bulk_cart_exceeding_max_length(self) -> None:
+        user = get_user_model().objects.create_user(email="user@test.com")
+        borrowings = [
+            sample_borrowing(user=user, book=sample_book(title=f"{number:03}" * 33))
+            for number in range(40)
+        ]
+        enqueue_borrowings_notification(borrowings)
+
+        sent, failed = process_notification_batch(batch_size=100)
+
+        self.assertEqual((sent, failed), (40, 0))
+        texts = [payload["text"][0] for _, payload in self.server.received]
+        self.assertGreater(len(texts), 1)
+        for text in texts:
+            self.assertLessEqual(len(text), settings.TELEGRAM_MESSAGE_MAX_LENGTH)
+        for borrowing in borrowings:
+            self.assertIn(borrowing.book.title, "\n".join(texts))
+
+    @override_settings(TELEGRAM_MESSAGE_MAX_LENGTH=10, NOTIFICATION_SEND_CONCURRENCY=3)
+    def test_worker_sends_messages_concurrently(self) -> None:
+        for letter in "abc":
+            BorrowingNotification.objects.create(message=letter * 6)
+        self.server.delay = 0.2
+
+        sent, failed = process_notification_batch(batch_size=10)
+
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(
+            sorted(payload["text"][0] for _, payload in self.server.received),
+            ["aaaaaa", "bbbbbb", "cccccc"],
+        )
+        # Messages sent one after another would reuse a keep-alive connection.
+        self.assertEqual(len(set(self.server.client_ports)), 3)
+
+    def test_retry_delay_grows_exponentially_up_to_maximum(self) -> None:
+        with self.settings(
+            NOTIFICATION_RETRY_BASE_DELAY=10, NOTIFICATION_RETRY_MAX_DELAY=30
+        ):
+            self.assertEqual(get_retry_delay(1), timedelta(seconds=10))
+            self.assertEqual(get_retry_delay(2), timedelta(seconds=20))
+            self.assertEqual(get_retry_delay(3), timedelta(seconds=30))
+
+    def test_command_drains_outbox_once(self) -> None:
+        BorrowingNotification.objects.create(message="command")
+        out = StringIO()
+
+        call_command("send_borrowing_notifications", "--once", stdout=out)
+
+        self.assertIn("Sent: 1, failed: 0", out.getvalue())
+        self.assertEqual(len(self.server.received), 1)
@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from borrowing.holds import with_positions
+from borrowing.models import Hold
+from borrowing.tests.test_borrowing_api import BORROWING_LIST_URL
+from borrowing.views import BorrowingViewSet
+from user.models import User
+
+
+def get_list_queryset(user: User, **query_params) -> QuerySet:
+    """Build the queryset of the borrowing list endpoint
+    the same way as the view does, including filter backends."""
+    request = Request(APIRequestFactory().get(BORROWING_LIST_URL, query_params))
+    request.user = user
+    view = BorrowingViewSet(action="list", format_kwarg=None, request=request)
+    return view.filter_queryset(view.get_queryset())[:20]
+
+
+class BorrowingQueryPlanTest(TestCase):
+    """The hot borrowing list queries must be answered by an index
+    in the requested order, without a full scan and a sort."""
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(email="test@test.com")
+        self.admin = get_user_model().objects.create_superuser(email="admin@test.com")
+
+    def get_plan(self, queryset: QuerySet) -> str:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def assert_uses_index(self, queryset: QuerySet, index_name: str) -> None:
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest(f"Query plans are not checked on {connection.vendor}")
+
+        plan = self.get_plan(queryset)
+
+        self.assertIn(index_name, plan)
+        if connection.vendor == "sqlite":
+            self.assertNotIn("TEMP B-TREE", plan)
+        else:
+            self.assertNotIn("Sort", plan)
+
+    def test_own_borrowings_use_user_date_index(self) -> None:
+        self.assert_uses_index(get_list_queryset(self.user), "borrowing_user_date_idx")
+
+    def test_own_active_borrowings_use_partial_index(self) -> None:
+        self.assert_uses_index(
+            get_list_queryset(self.user, is_active=True),
+            "borrowing_active_user_idx",
+        )
+
+    def test_all_borrowings_use_date_index(self) -> None:
+        self.assert_uses_index(get_list_queryset(self.admin), "borrowing_date_idx")
+
+    def test_all_active_borrowings_use_partial_index(self) -> None:
+        self.assert_uses_index(
+            get_list_queryset(self.admin, is_active=True),
+            "borrowing_active_date_idx",
+        )
+
+    def test_filter_by_user_id_uses_user_date_index(self) -> None:
+        self.assert_uses_index(
+            get_list_queryset(self.admin, user_id=self.user.id),
+            "borrowing_user_date_idx",
+        )
+
+    def test_own_holds_use_user_index_and_queue_key(self) -> None:
+        queryset = with_positions(Hold.objects.filter(user=self.user))[:20]
+
+        self.assert_uses_index(queryset, "hold_user_idx")
+        self.assertNotIn("SCAN borrowing_holdqueue", self.get_plan(queryset))
+
+    def test_first_waiting_holds_use_ticket_index(self) -> None:
+        self.assert_uses_index(
+            Hold.objects.filter(
+                book_id=1,
+                ticket__gte=3,
+                ticket__lt=5,
+                status=Hold.StatusChoices.WAITING,
+            ).order_by("book_id", "ticket"),
+            "hold_waiting_ticket_idx",
+        )
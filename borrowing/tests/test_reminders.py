@@ -0,0 +1,108 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from borrowing.models import Borrowing, BorrowingNotification, OverdueNotificationRun
+from borrowing.reminders import enqueue_overdue_notifications
+from borrowing.tests.test_borrowing_api import make_overdue, sample_borrowing
+
+
+class OverdueNotificationTest(TestCase):
+    def setUp(self):
+        self.today = datetime.date.today()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+
+    def create_overdue(self, count: int) -> list[Borrowing]:
+        return [
+            make_overdue(sample_borrowing(user=self.user), days=2) for _ in range(count)
+        ]
+
+    def test_overdue_borrowings_are_enqueued(self) -> None:
+        (overdue,) = self.create_overdue(1)
+        sample_borrowing(user=self.user)
+        make_overdue(sample_borrowing(user=self.user), days=0)
+        returned = make_overdue(sample_borrowing(user=self.user), days=3)
+        Borrowing.objects.filter(pk=returned.pk).update(actual_return_date=self.today)
+
+        self.assertEqual(enqueue_overdue_notifications(), 1)
+
+        self.assertEqual(
+            BorrowingNotification.objects.get().message,
+            "Overdue borrowing:\n"
+            f"id: {overdue.id}\n"
+            f"expected_return_date: {overdue.expected_return_date}\n"
+            "days_overdue: 2\n"
+            f"book: {overdue.book.title}\n"
+            "user: user@test.com\n",
+        )
+        run = OverdueNotificationRun.objects.get()
+        self.assertEqual(run.date, self.today)
+        self.assertEqual(run.last_borrowing_id, overdue.id)
+        self.assertEqual(run.enqueued, 1)
+        self.assertIsNotNone(run.finished_at)
+
+    def test_books_and_users_are_joined(self) -> None:
+        self.create_overdue(5)
+
+        # Creating the run takes 4 queries, reading the borrowings 1, each of
+        # the 3 chunks 4 and finishing the run 1, whatever books or users.
+        with self.assertNumQueries(18):
+            enqueue_overdue_notifications(chunk_size=2)
+
+        self.assertEqual(BorrowingNotification.objects.count(), 5)
+
+    def test_finished_run_is_not_repeated(self) -> None:
+        self.create_overdue(2)
+        enqueue_overdue_notifications()
+
+        self.assertEqual(enqueue_overdue_notifications(), 0)
+        self.assertEqual(BorrowingNotification.objects.count(), 2)
+
+    def test_interrupted_run_is_resumed(self) -> None:
+        borrowings = self.create_overdue(5)
+        bulk_create = BorrowingNotification.objects.bulk_create
+        calls = []
+
+        def crash_on_second_chunk(objs):
+            calls.append(objs)
+            if len(calls) == 2:
+                raise RuntimeError("crash")
+            return bulk_create(objs)
+
+        with mock.patch.object(
+            BorrowingNotification.objects,
+            "bulk_create",
+            side_effect=crash_on_second_chunk,
+        ):
+            with self.assertRaises(RuntimeError):
+                enqueue_overdue_notifications(chunk_size=2)
+
+        run = OverdueNotificationRun.objects.get()
+        self.assertEqual(run.last_borrowing_id, borrowings[1].id)
+        self.assertIsNone(run.finished_at)
+        self.assertEqual(BorrowingNotification.objects.count(), 2)
+
+        self.assertEqual(enqueue_overdue_notifications(chunk_size=2), 3)
+        self.assertEqual(
+            [
+                int(message.split("\n")[1].removeprefix("id: "))
+                for message in BorrowingNotification.objects.values_list(
+                    "message", flat=True
+                )
+            ],
+            [borrowing.id for borrowing in borrowings],
+        )
+
+    def test_command(self) -> None:
+        self.create_overdue(2)
+        stdout = StringIO()
+
+        call_command(
+            "enqueue_overdue_notifications", "--date", str(self.today), stdout=stdout
+        )
+
+        self.assertEqual(stdout.getvalue().strip(), "Enqueued reminders: 2")
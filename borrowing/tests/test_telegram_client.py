@@ -0,0 +1,87 @@
+from django.test import override_settings
+from prometheus_client import REGISTRY
+
+from borrowing.telegram import TelegramNotificationError, get_telegram_client
+from borrowing.tests.test_notification_worker import FakeTelegramServerTestCase
+
+
+class TelegramClientTest(FakeTelegramServerTestCase):
+    def test_client_is_reused(self) -> None:
+        self.assertIs(get_telegram_client(), get_telegram_client())
+
+    def test_client_reuses_keep_alive_connection(self) -> None:
+        client = get_telegram_client()
+
+        client.send_message("first")
+        client.send_message("second")
+
+        self.assertEqual(len(set(self.server.client_ports)), 1)
+
+    def test_coalesce_respects_max_length(self) -> None:
+        client = get_telegram_client()
+        client.message_max_length = 7
+
+        chunks = client.coalesce(["abc", "def", "gh", "ijklmnopq"])
+
+        self.assertEqual(chunks, [["abc", "def"], ["gh"], ["ijklmn…"]])
+
+    def test_send_chunk_counts_sent_messages(self) -> None:
+        client = get_telegram_client()
+
+        client.send_chunk(["first", "second"])
+
+        self.assertEqual(client.stats, {"sent": 2, "failed": 0})
+        self.assertEqual(self.server.received[0][1]["text"], ["first\nsecond"])
+
+    def test_results_are_exported_to_prometheus(self) -> None:
+        def get_count(result: str) -> float:
+            return (
+                REGISTRY.get_sample_value(
+                    "library_notifications_total", {"result": result}
+                )
+                or 0
+            )
+
+        sent, failed = get_count("sent"), get_count("failed")
+        self.server.status_codes = [200, 400]
+        client = get_telegram_client()
+
+        client.send_chunk(["first", "second"])
+        with self.assertRaises(TelegramNotificationError):
+            client.send_message("bad request")
+
+        self.assertEqual(get_count("sent"), sent + 2)
+        self.assertEqual(get_count("failed"), failed + 1)
+
+    def test_errors_are_left_to_the_outbox_to_retry(self) -> None:
+        for status_code in [400, 502]:
+            self.server.status_codes = [status_code]
+            client = get_telegram_client()
+
+            with self.assertRaises(TelegramNotificationError) as context:
+                client.send_message("error")
+
+            self.assertIsNone(context.exception.retry_after)
+        self.assertEqual(len(self.server.received), 2)
+        self.assertEqual(client.stats, {"sent": 0, "failed": 2})
+
+    def test_rate_limit_error_carries_retry_after(self) -> None:
+        self.server.status_codes = [429]
+        self.server.retry_after = 30
+        client = get_telegram_client()
+
+        with self.assertRaises(TelegramNotificationError) as context:
+            client.send_message("flood")
+
+        self.assertEqual(context.exception.retry_after, 30)
+        self.assertEqual(len(self.server.received), 1)
+
+    @override_settings(TELEGRAM_READ_TIMEOUT=0.05)
+    def test_slow_response_times_out(self) -> None:
+        self.server.delay = 0.5
+        client = get_telegram_client()
+
+        with self.assertRaises(TelegramNotificationError):
+            client.send_message("slow")
+
+        self.assertEqual(client.stats["failed"], 1)
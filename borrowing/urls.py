@@ -1,8 +1,9 @@
 from rest_framework import routers
 
-from borrowing.views import BorrowingViewSet
+from borrowing.views import BorrowingViewSet, HoldViewSet
 
 router = routers.DefaultRouter()
+router.register("holds", HoldViewSet, basename="hold")
 router.register("", BorrowingViewSet, basename="borrowing")
 
 urlpatterns = router.urls
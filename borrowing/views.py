@@ -1,7 +1,9 @@
 from typing import Type, Any
 
+from django.conf import settings
 from django.db.models import QuerySet
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
@@ -10,15 +12,25 @@ from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 
 from borrowing.filters import IsBorrowingOwnerOrIsAdminFilterBackend, BorrowingFilter
-from borrowing.models import Borrowing
+from borrowing.holds import with_positions
+from borrowing.models import Borrowing, Hold
 from borrowing.serializers import (
     BorrowingSerializer,
+    BorrowingValuesSerializer,
     BorrowingCreateSerializer,
     BorrowingReturnSerializer,
+    BorrowingBulkItemSerializer,
+    BorrowingBulkReturnSerializer,
+    HoldSerializer,
+    HoldCreateSerializer,
+    HoldCancelSerializer,
 )
+from library_service.renderers import StreamingJSONResponse
+from library_service.viewsets import AsyncViewSetMixin
 
 
 class BorrowingViewSet(
+    AsyncViewSetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -31,10 +43,23 @@ class BorrowingViewSet(
         DjangoFilterBackend,
     ]
     filterset_class = BorrowingFilter
+    query_budgets = {
+        "list": 1,
+        "retrieve": 1,
+        "export": 1,
+        "create": 9,
+        "return_borrowing": 13,
+        "bulk_create": 8,
+        "bulk_return": 13,
+    }
+    throttle_scopes = {
+        "create": "borrow",
+        "bulk_create": "borrow",
+    }
 
     def get_queryset(self) -> QuerySet:
         qs = super().get_queryset()
-        if self.action == "list":
+        if self.action == "retrieve":
             return qs.select_related("book", "user")
         return qs
 
@@ -43,12 +68,46 @@ class BorrowingViewSet(
             return BorrowingCreateSerializer
         if self.action == "return_borrowing":
             return BorrowingReturnSerializer
+        if self.action == "bulk_create":
+            return BorrowingBulkItemSerializer
+        if self.action == "bulk_return":
+            return BorrowingBulkReturnSerializer
         return BorrowingSerializer
 
     def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """Return a list of own borrowings for an authenticated user.
         Return a list of all borrowings for an admin user."""
-        return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = BorrowingValuesSerializer.get_rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                BorrowingValuesSerializer.serialize(page)
+            )
+        return Response(BorrowingValuesSerializer.serialize(rows))
+
+    async def alist(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return await self.alist_values(request, BorrowingValuesSerializer)
+
+    @extend_schema(responses=BorrowingSerializer(many=True))
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path="export",
+        url_name="export",
+        pagination_class=None,
+    )
+    def export(self, request: Request) -> StreamingJSONResponse:
+        """Stream own borrowings for an authenticated user, or all borrowings
+        for an admin user, matching the filters as one JSON array,
+        without pagination."""
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = BorrowingValuesSerializer.get_rows(queryset)
+        return StreamingJSONResponse(
+            rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE),
+            BorrowingValuesSerializer.serialize,
+            settings.EXPORT_CHUNK_SIZE,
+        )
 
     def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """Returns a single borrowing by ID. Authenticated user have access to own borrowings.
@@ -74,3 +133,101 @@ class BorrowingViewSet(
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        methods=["post"],
+        detail=False,
+        url_path="bulk",
+        url_name="bulk-create",
+        serializer_class=BorrowingBulkItemSerializer,
+    )
+    def bulk_create(self, request: Request) -> Response:
+        """Create several borrowings at once from a list of books
+        and expected return dates. Either all borrowings are created
+        or none of them."""
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.BORROWING_BULK_MAX_ITEMS,
+        )
+        serializer.is_valid(raise_exception=True)
+        borrowings = serializer.save()
+        return Response(
+            BorrowingSerializer(borrowings, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(
+        methods=["post"],
+        detail=False,
+        url_path="bulk-return",
+        url_name="bulk-return",
+        serializer_class=BorrowingBulkReturnSerializer,
+    )
+    def bulk_return(self, request: Request) -> Response:
+        """Sets actual return date of several borrowings to the current date.
+        Returns an error if any of the borrowings is already returned."""
+        serializer = self.get_serializer(
+            data=request.data,
+            context={
+                **self.get_serializer_context(),
+                "queryset": self.filter_queryset(self.get_queryset()),
+            },
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class HoldViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = Hold.objects.select_related("user")
+    permission_classes = [IsAuthenticated]
+    filter_backends = [IsBorrowingOwnerOrIsAdminFilterBackend]
+    query_budgets = {
+        "list": 1,
+        "retrieve": 1,
+        "create": 8,
+        "cancel": 9,
+    }
+
+    def get_queryset(self) -> QuerySet:
+        return with_positions(super().get_queryset())
+
+    def get_serializer_class(self) -> Type[Serializer]:
+        if self.action == "create":
+            return HoldCreateSerializer
+        if self.action == "cancel":
+            return HoldCancelSerializer
+        return HoldSerializer
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """Return a list of own holds with their position in the queue of
+        the book for an authenticated user, and all holds for an admin."""
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """Queue for a book that has no copies available. The first copy
+        returned is kept for the first hold in the queue for
+        HOLD_PICKUP_DAYS, then given to the next one."""
+        return super().create(request, *args, **kwargs)
+
+    @action(
+        methods=["post"],
+        detail=True,
+        url_path="cancel",
+        url_name="cancel",
+        serializer_class=HoldCancelSerializer,
+    )
+    def cancel(self, request: Request, pk: int = None) -> Response:
+        """Cancel a waiting or ready hold. The copy of a ready hold is given
+        to the next hold in the queue."""
+        serializer = self.get_serializer(self.get_object(), data={})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)
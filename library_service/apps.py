@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class LibraryServiceConfig(AppConfig):
+    name = "library_service"
+
+    def ready(self) -> None:
+        from library_service import checks  # noqa: F401
+        from library_service.sqlite import configure_connection
+        from library_service.timing import install_query_timer
+
+        connection_created.connect(configure_connection)
+        connection_created.connect(install_query_timer)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_throttle_cache(app_configs, **kwargs) -> list[Error]:
+    """A throttle cache local to each process gives every worker a bucket of
+    its own, which multiplies the rates by the number of workers."""
+    backend = settings.CACHES.get("throttle", {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        Error(
+            f"The throttle cache uses {backend}, which is not shared "
+            "between processes.",
+            hint=(
+                "Set THROTTLE_CACHE_BACKEND and THROTTLE_CACHE_LOCATION, or "
+                "CACHE_BACKEND and CACHE_LOCATION, to a shared cache such as "
+                "Redis or the database cache."
+            ),
+            id="library_service.E001",
+        )
+    ]
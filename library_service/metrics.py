@@ -0,0 +1,142 @@
+"""Prometheus metrics of the library, served at /metrics.
+
+Counters and histograms are kept by every process. When the
+PROMETHEUS_MULTIPROC_DIR environment variable is set, prometheus_client
+writes them to files in that directory instead, and /metrics adds up the
+files of every gunicorn worker and of the notification worker. The
+directory must be shared by them and emptied before the server starts.
+
+The active loan and out of stock gauges are read from the availability
+columns the borrow and return transactions keep on the books, see
+borrowing/availability.py, with one aggregate over the books per scrape
+instead of counting the borrowings. Every worker reads the same rows, so
+they all report the same values."""
+
+import os
+import time
+from typing import Callable, Iterator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.http import HttpRequest, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    "library_request_duration_seconds",
+    "Time to serve API requests, by view and action.",
+    ["view", "action"],
+)
+BORROWING_OPERATIONS = Counter(
+    "library_borrowing_operations",
+    "Books borrowed and returned.",
+    ["operation"],
+)
+NOTIFICATIONS = Counter(
+    "library_notifications",
+    "Borrowing notifications sent to Telegram, by result.",
+    ["result"],
+)
+
+
+def count_borrowing_operation(operation: str, count: int = 1) -> None:
+    """Count borrowed or returned books once the transaction commits."""
+    transaction.on_commit(lambda: BORROWING_OPERATIONS.labels(operation).inc(count))
+
+
+def get_gauge_values() -> dict[str, int]:
+    from book.models import Book
+
+    return Book.objects.aggregate(
+        active_loans=Coalesce(Sum("copies_on_loan"), 0),
+        books_out_of_stock=Count("pk", filter=Q(inventory=0)),
+    )
+
+
+class LibraryCollector:
+    gauges = {
+        "active_loans": "Borrowings that are not returned yet.",
+        "books_out_of_stock": "Books with no copies left to borrow.",
+    }
+
+    def describe(self) -> list[GaugeMetricFamily]:
+        """Name the gauges without counting, when the collector is registered."""
+        return [
+            GaugeMetricFamily(f"library_{name}", documentation)
+            for name, documentation in self.gauges.items()
+        ]
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        values = get_gauge_values()
+        for name, documentation in self.gauges.items():
+            yield GaugeMetricFamily(
+                f"library_{name}", documentation, value=values[name]
+            )
+
+
+REGISTRY.register(LibraryCollector())
+
+
+def get_registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(LibraryCollector())
+    return registry
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
+
+
+class MetricsMiddleware:
+    """Observe the latency of the DRF views by view class and action.
+    Views of other kinds, e.g. the admin, are not observed."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    def observe(request: HttpRequest, seconds: float) -> None:
+        match = request.resolver_match
+        view_class = getattr(match.func, "cls", None) if match else None
+        if view_class is None:
+            return
+        method = request.method.lower()
+        actions = getattr(match.func, "actions", None) or {}
+        REQUEST_LATENCY.labels(
+            view_class.__name__, actions.get(method, method)
+        ).observe(seconds)
@@ -0,0 +1,186 @@
+import base64
+import json
+from typing import Any, Optional
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over a composite ordering key.
+
+    The cursor stores the values of every ordering field of the last item,
+    so the next page is a range condition on an index instead of an OFFSET,
+    and deep pages cost the same as the first one. The ordering is taken
+    from an explicit ``order_by()`` of the queryset, e.g. by an annotated
+    search rank, or else from the model Meta, and must end with a unique
+    field, e.g. ``["title", "id"]``.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = "The pagination cursor value."
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    page_size_query_description = "Number of results to return per page."
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_ordering(self, queryset: QuerySet) -> list[tuple[str, bool]]:
+        """Return ordering as a list of (field name, is descending) pairs."""
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return [(field.lstrip("-"), field.startswith("-")) for field in ordering]
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request: Request) -> Optional[tuple[list, bool]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position, reverse = cursor["p"], bool(cursor["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        cursor = json.dumps({"p": position, "r": int(reverse)}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+    def get_position(self, item: Any) -> list:
+        if isinstance(item, dict):
+            return [item[field] for field, _ in self.ordering]
+        return [getattr(item, field) for field, _ in self.ordering]
+
+    def get_keyset_filter(self, position: list, reverse: bool) -> Q:
+        """Build ``(a > x) OR (a = x AND b > y) ...`` for the ordering fields,
+        prefixed with ``a >= x`` so that the database can start an index
+        range scan at the cursor."""
+        condition = Q()
+        equal = Q()
+        for (field, descending), value in zip(self.ordering, position):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+
+        leading_field, leading_descending = self.ordering[0]
+        leading_lookup = "lte" if leading_descending != reverse else "gte"
+        return Q(**{f"{leading_field}__{leading_lookup}": position[0]}) & condition
+
+    def get_page_queryset(
+        self, queryset: QuerySet, request: Request
+    ) -> tuple[QuerySet, Optional[list], bool]:
+        """Return the queryset of the requested page, with one extra item
+        to tell whether there are more, and the decoded cursor."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset)
+        self.page_size_value = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        position, reverse = cursor if cursor else (None, False)
+
+        order_by = [
+            f"-{field}" if descending != reverse else field
+            for field, descending in self.ordering
+        ]
+        queryset = queryset.order_by(*order_by)
+        if position is not None:
+            # The lookups convert the cursor values to the types of the fields.
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(position, reverse))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        return queryset[: self.page_size_value + 1], position, reverse
+
+    def set_page(self, results: list, position: Optional[list], reverse: bool) -> list:
+        has_more = len(results) > self.page_size_value
+        results = results[: self.page_size_value]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> Optional[list]:
+        queryset, position, reverse = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset), position, reverse)
+
+    async def apaginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> Optional[list]:
+        """Fetch the page with the async ORM."""
+        queryset, position, reverse = self.get_page_queryset(queryset, request)
+        return self.set_page([item async for item in queryset], position, reverse)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        cursor = self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        cursor = self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data: list) -> Response:
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_query_description,
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.page_size_query_description,
+                "schema": {"type": "integer", "maximum": self.max_page_size},
+            },
+        ]
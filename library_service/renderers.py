@@ -0,0 +1,98 @@
+import json
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+from library_service.timing import timer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Datetimes are passed to the DRF encoder, which trims microseconds
+# to milliseconds and writes UTC as "Z", so the output stays identical.
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+)
+encode_default = encoders.JSONEncoder().default
+
+
+def dumps(data: Any) -> bytes:
+    """Encode data the way DRF JSONRenderer does with its default settings,
+    compact and not ASCII-escaped, using orjson if it is installed."""
+    if orjson is not None:
+        try:
+            ret = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Let the stdlib handle what orjson can't, e.g. integers
+            # over 64 bits, and raise the same errors as DRF.
+            pass
+        else:
+            # Line and paragraph separators are escaped by DRF for JavaScript.
+            if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+                ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+                ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+            return ret
+
+    ret = json.dumps(
+        data,
+        cls=encoders.JSONEncoder,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    )
+    return ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer producing the same bytes several times faster with orjson.
+
+    Falls back to the stdlib encoder of the parent class when orjson is not
+    installed, or for indented output and non-default JSON settings."""
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[dict] = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        with timer("render"):
+            if indent is not None or self.ensure_ascii or not self.compact:
+                return super().render(data, accepted_media_type, renderer_context)
+            return dumps(data)
+
+
+def iter_chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def stream_json_array(
+    rows: Iterable, serialize: Callable[[list], list], chunk_size: int
+) -> Iterator[bytes]:
+    """Yield a JSON array of serialized rows chunk by chunk, so that only
+    one chunk of rows is held in memory at a time."""
+    yield b"["
+    separator = b""
+    for chunk in iter_chunks(rows, chunk_size):
+        yield separator + dumps(serialize(chunk))[1:-1]
+        separator = b","
+    yield b"]"
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    def __init__(
+        self, rows: Iterable, serialize: Callable[[list], list], chunk_size: int
+    ) -> None:
+        super().__init__(
+            stream_json_array(rows, serialize, chunk_size),
+            content_type="application/json",
+        )
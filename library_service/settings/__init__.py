@@ -0,0 +1,5 @@
+"""Settings profiles.
+
+library_service.settings.dev is used by default, deployments set
+DJANGO_SETTINGS_MODULE to library_service.settings.prod.
+"""
@@ -0,0 +1,328 @@
+"""
+Django settings for library_service project shared by all profiles.
+Development and production profiles are in dev.py and prod.py.
+
+Generated by 'django-admin startproject' using Django 5.0.4.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.0/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.0/ref/settings/
+"""
+
+import os
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from library_service.settings.environment import (
+    get_bool,
+    get_decimal,
+    get_float,
+    get_int,
+    get_list,
+    get_str,
+    parse_database_url,
+)
+
+load_dotenv()
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.getenv("DJANGO_SECRET_KEY")
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = get_bool("DJANGO_DEBUG")
+
+ALLOWED_HOSTS = get_list("DJANGO_ALLOWED_HOSTS")
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "rest_framework",
+    "rest_framework_simplejwt",
+    "drf_spectacular",
+    "library_service",
+    "book",
+    "user",
+    "borrowing",
+    "django_filters",
+]
+
+MIDDLEWARE = [
+    "library_service.timing.ServerTimingMiddleware",
+    "library_service.metrics.MetricsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+# Share of the requests timed by ServerTimingMiddleware, from 0 to 1.
+SERVER_TIMING_SAMPLE_RATE = get_float("SERVER_TIMING_SAMPLE_RATE", 0)
+
+ROOT_URLCONF = "library_service.urls"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "library_service.wsgi.application"
+
+# Serve the async variants of viewset actions, set by asgi.py.
+ASYNC_VIEWS = get_bool("DJANGO_ASYNC_VIEWS")
+
+
+# Database
+# https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        **parse_database_url(
+            os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR / 'db.sqlite3'}")
+        ),
+        "CONN_MAX_AGE": get_int("DATABASE_CONN_MAX_AGE", 0),
+        "CONN_HEALTH_CHECKS": get_bool("DATABASE_CONN_HEALTH_CHECKS"),
+        "DISABLE_SERVER_SIDE_CURSORS": get_bool("DATABASE_DISABLE_SERVER_SIDE_CURSORS"),
+    }
+}
+
+# Applied to every new SQLite connection, see library_service/sqlite.py.
+# WAL lets readers run during a write, synchronous=NORMAL is durable in WAL
+# mode except on power loss, busy_timeout is in milliseconds, mmap_size in
+# bytes and a negative cache_size in KiB.
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": get_int("SQLITE_BUSY_TIMEOUT", 5000),
+    "mmap_size": 256 * 2**20,
+    "cache_size": -64 * 2**10,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHE_BACKEND = os.getenv(
+    "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+CACHE_LOCATION = os.getenv("CACHE_LOCATION", "")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": CACHE_LOCATION,
+    },
+    # The throttle buckets, which must be shared by every process, see
+    # library_service/checks.py. Same as the default cache unless set.
+    "throttle": {
+        "BACKEND": os.getenv("THROTTLE_CACHE_BACKEND", CACHE_BACKEND),
+        "LOCATION": os.getenv("THROTTLE_CACHE_LOCATION", CACHE_LOCATION),
+    },
+}
+
+BOOK_CACHE_TIMEOUT = 60 * 5
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
+
+AUTH_USER_MODEL = "user.User"
+
+# The first hasher hashes new passwords, the others verify older hashes,
+# which are rehashed with the first one on the next login. The defaults need
+# no extra libraries; user.hashers.Argon2PasswordHasher needs argon2-cffi and
+# django.contrib.auth.hashers.BCryptSHA256PasswordHasher needs bcrypt.
+PASSWORD_HASHERS = get_list(
+    "PASSWORD_HASHERS",
+    [
+        "user.hashers.ScryptPasswordHasher",
+        "user.hashers.PBKDF2PasswordHasher",
+        "user.hashers.PBKDF2SHA1PasswordHasher",
+    ],
+)
+
+# Scrypt cost: N = 2**14 takes about 16 MiB and 50 ms per hash.
+PASSWORD_SCRYPT_WORK_FACTOR = get_int("PASSWORD_SCRYPT_WORK_FACTOR", 2**14)
+
+# Threads hashing passwords at once, "none" hashes on the request thread,
+# and how many more logins may wait for them before getting a 503.
+PASSWORD_HASHING_WORKERS = get_int("PASSWORD_HASHING_WORKERS", os.cpu_count() or 1)
+PASSWORD_HASHING_BACKLOG = get_int("PASSWORD_HASHING_BACKLOG", 32)
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.0/topics/logging/
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "library_service.timing": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.0/topics/i18n/
+
+LANGUAGE_CODE = "en-us"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.0/howto/static-files/
+
+STATIC_URL = "static/"
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Token bucket rates of the throttle scopes, "<scope>_anon" per IP address
+# and "<scope>_user" per user. THROTTLE_RATE_<NAME> overrides a rate and
+# "none" turns it off.
+THROTTLE_RATES = {
+    name: get_str(f"THROTTLE_RATE_{name.upper()}", rate)
+    for name, rate in {
+        "token_anon": "20/min",
+        "signup_anon": "10/hour",
+        "signup_user": "10/hour",
+        "borrow_user": "30/min",
+    }.items()
+}
+
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "user.authentication.ClaimsJWTAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "library_service.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "library_service.pagination.KeysetPagination",
+    "PAGE_SIZE": 20,
+    "DEFAULT_THROTTLE_CLASSES": [
+        "library_service.throttling.ScopedTokenBucketThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": THROTTLE_RATES,
+    # Proxies in front of the app, so that throttles count clients by the
+    # X-Forwarded-For address instead of the proxy's.
+    "NUM_PROXIES": get_int("DJANGO_NUM_PROXIES", None),
+}
+
+SIMPLE_JWT = {
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "AUTH_HEADER_NAME": "HTTP_AUTHORIZE",
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.ClaimsTokenObtainPairSerializer",
+}
+
+# How long ClaimsJWTAuthentication trusts the cached claims of a user, so
+# the longest a revoked token can be used for when the cache isn't shared.
+AUTH_TOKEN_STATE_TIMEOUT = get_int("AUTH_TOKEN_STATE_TIMEOUT", 30)
+
+SPECTACULAR_SETTINGS = {
+    "TITLE": "Library API Service",
+    "DESCRIPTION": "Simple API service for managing books borrowing",
+    "VERSION": "1.0.0",
+    "SWAGGER_UI_SETTINGS": {
+        "deepLinking": True,
+        "persistAuthorization": True,
+    },
+}
+
+BORROWING_BULK_MAX_ITEMS = 50
+
+# Active borrowings a user may have at once, "none" for no limit.
+BORROWING_MAX_ACTIVE_PER_USER = get_int("BORROWING_MAX_ACTIVE_PER_USER", None)
+
+# Overdue fine per day is the daily fee of the book times the multiplier.
+BORROWING_FINE_MULTIPLIER = get_decimal("BORROWING_FINE_MULTIPLIER", Decimal("1"))
+
+# Days a returned copy is kept for the hold it was given to.
+HOLD_PICKUP_DAYS = get_int("HOLD_PICKUP_DAYS", 3)
+# Expired holds released per transaction.
+HOLD_EXPIRY_BATCH_SIZE = 1000
+
+EXPORT_CHUNK_SIZE = 1000
+
+TELEGRAM_BOT_API_KEY = os.getenv("TELEGRAM_BOT_API_KEY")
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_CONNECT_TIMEOUT = 3.05
+TELEGRAM_READ_TIMEOUT = 10
+TELEGRAM_POOL_SIZE = 10
+TELEGRAM_MESSAGE_MAX_LENGTH = 4096
+
+NOTIFICATION_BATCH_SIZE = 50
+NOTIFICATION_POLL_INTERVAL = 5
+NOTIFICATION_LEASE_SECONDS = 60
+NOTIFICATION_MAX_ATTEMPTS = 8
+NOTIFICATION_RETRY_BASE_DELAY = 30
+NOTIFICATION_RETRY_MAX_DELAY = 60 * 60
+# Telegram messages the worker sends at once. Telegram limits the messages
+# sent to a chat per second, so keep it low.
+NOTIFICATION_SEND_CONCURRENCY = get_int("NOTIFICATION_SEND_CONCURRENCY", 1)
+
+# Overdue borrowings read and enqueued per transaction by the daily reminders.
+OVERDUE_NOTIFICATION_CHUNK_SIZE = 1000
@@ -0,0 +1,16 @@
+"""Development profile: debug mode and the Django Debug Toolbar."""
+
+from library_service.settings.base import *  # noqa: F401, F403
+from library_service.settings.base import INSTALLED_APPS, MIDDLEWARE, get_bool
+
+DEBUG = get_bool("DJANGO_DEBUG", True)
+
+INTERNAL_IPS = ["127.0.0.1"]
+
+INSTALLED_APPS = [*INSTALLED_APPS, "debug_toolbar"]
+
+MIDDLEWARE = [
+    MIDDLEWARE[0],
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    *MIDDLEWARE[1:],
+]
@@ -0,0 +1,19 @@
+"""Tune SQLite connections for concurrent readers and writers.
+
+In WAL mode readers don't block the writer and the writer doesn't block
+readers, while the rollback journal locks the whole database for the
+duration of every write transaction. The pragmas are set on every new
+connection from the SQLITE_PRAGMAS setting, in order, so journal_mode
+should come first.
+"""
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+def configure_connection(sender, connection: BaseDatabaseWrapper, **kwargs) -> None:
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,74 @@
+"""Test helpers shared by the apps.
+
+Views declare how many queries each action may run in ``query_budgets``,
+keyed by the viewset action, or by the lowercase HTTP method for generic
+views. Budgets count the queries of a request with an access token whose
+claims are cached, and must not grow with the number of items returned.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.viewsets import ViewSetMixin
+
+from user.authentication import TOKEN_STATE_KEY, get_token_state
+from user.serializers import ClaimsTokenObtainPairSerializer
+
+VIEWSET_ACTIONS = ["list", "retrieve", "create", "update", "partial_update", "destroy"]
+
+
+def format_queries(queries: list[dict]) -> str:
+    return "\n".join(
+        f"{number}. {query['sql']}" for number, query in enumerate(queries, start=1)
+    )
+
+
+@contextmanager
+def assert_max_queries(
+    budget: int, using: str = DEFAULT_DB_ALIAS
+) -> Iterator[CaptureQueriesContext]:
+    """Fail listing the executed SQL if the block runs more than budget queries."""
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    if len(context) > budget:
+        raise AssertionError(
+            f"{len(context)} queries executed, the budget is {budget}:\n"
+            + format_queries(context.captured_queries)
+        )
+
+
+def get_view_actions(view_class) -> list[str]:
+    if issubclass(view_class, ViewSetMixin):
+        return [action for action in VIEWSET_ACTIONS if hasattr(view_class, action)] + [
+            action.__name__ for action in view_class.get_extra_actions()
+        ]
+    return [
+        method
+        for method in view_class.http_method_names
+        if method not in ("head", "options") and hasattr(view_class, method)
+    ]
+
+
+class QueryBudgetTestMixin:
+    def authenticate(self, user) -> None:
+        """Send an access token of the user, as clients do, with its claims
+        already cached, so that the budgets cover ClaimsJWTAuthentication
+        and the fields of the user it loads."""
+        cache.delete(TOKEN_STATE_KEY.format(user_id=user.pk))
+        get_token_state(user.pk)
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {token}")
+
+    def assertQueryBudget(self, view_class, action: str):
+        """Check the block against the budget of the view action."""
+        return assert_max_queries(view_class.query_budgets[action])
+
+    def assertQueryBudgetsDeclared(self, view_class) -> None:
+        self.assertCountEqual(
+            view_class.query_budgets,
+            get_view_actions(view_class),
+            f"{view_class.__name__}.query_budgets must list every action",
+        )
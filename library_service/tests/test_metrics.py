@@ -0,0 +1,131 @@
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.models import Book
+from book.tests.test_book_api import BOOK_LIST_URL
+from book.tests.test_book_pagination import create_books
+from borrowing.tests.test_borrowing_api import (
+    BORROWING_LIST_URL,
+    BORROWING_RETURN_VIEW_NAME,
+)
+
+METRICS_URL = reverse("metrics")
+
+
+def get_sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+
+    def test_gauges_are_read_from_book_availability(self) -> None:
+        books = create_books(3)
+        Book.objects.filter(pk=books[0].pk).update(copies_on_loan=2, inventory=0)
+        Book.objects.filter(pk=books[1].pk).update(copies_on_loan=1, inventory=0)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        content = response.content.decode()
+        self.assertIn("library_active_loans 3.0", content)
+        self.assertIn("library_books_out_of_stock 2.0", content)
+
+        Book.objects.filter(pk=books[2].pk).update(copies_on_loan=1)
+        content = self.client.get(METRICS_URL).content.decode()
+        self.assertIn("library_active_loans 4.0", content)
+
+    def test_request_latency_by_view_and_action(self) -> None:
+        labels = {"view": "BookViewSet", "action": "list"}
+        before = get_sample("library_request_duration_seconds_count", **labels)
+
+        self.client.get(BOOK_LIST_URL)
+
+        self.assertEqual(
+            get_sample("library_request_duration_seconds_count", **labels),
+            before + 1,
+        )
+
+    def test_token_view_latency_is_observed(self) -> None:
+        labels = {"view": "TokenObtainPairView", "action": "post"}
+        before = get_sample("library_request_duration_seconds_count", **labels)
+
+        self.client.post(
+            reverse("user:token_obtain_pair"), {"email": "x@test.com", "password": "x"}
+        )
+
+        self.assertEqual(
+            get_sample("library_request_duration_seconds_count", **labels),
+            before + 1,
+        )
+
+    def test_borrow_and_return_are_counted(self) -> None:
+        book = create_books(1)[0]
+        borrowed = get_sample("library_borrowing_operations_total", operation="borrow")
+        returned = get_sample("library_borrowing_operations_total", operation="return")
+        self.client.force_authenticate(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                BORROWING_LIST_URL,
+                {
+                    "book": book.id,
+                    "expected_return_date": datetime.date.today()
+                    + datetime.timedelta(days=3),
+                },
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse(BORROWING_RETURN_VIEW_NAME, args=[response.data["id"]])
+            )
+
+        self.assertEqual(
+            get_sample("library_borrowing_operations_total", operation="borrow"),
+            borrowed + 1,
+        )
+        self.assertEqual(
+            get_sample("library_borrowing_operations_total", operation="return"),
+            returned + 1,
+        )
+
+
+class MultiProcessMetricsTest(TestCase):
+    def test_counters_of_processes_add_up(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            for count in [2, 3]:
+                subprocess.run(
+                    [
+                        sys.executable,
+                        "-c",
+                        "from library_service.metrics import BORROWING_OPERATIONS;"
+                        f"BORROWING_OPERATIONS.labels('borrow').inc({count})",
+                    ],
+                    env={**os.environ, "PROMETHEUS_MULTIPROC_DIR": directory},
+                    check=True,
+                )
+
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry, path=directory)
+
+            self.assertEqual(
+                registry.get_sample_value(
+                    "library_borrowing_operations_total", {"operation": "borrow"}
+                ),
+                5,
+            )
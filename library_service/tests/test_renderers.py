@@ -0,0 +1,69 @@
+import datetime
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from library_service import renderers
+from library_service.renderers import FastJSONRenderer, stream_json_array
+
+SAMPLE_DATA = {
+    "int": 1,
+    "float": 0.1,
+    "big": 2**70,
+    "decimal": Decimal("12.50"),
+    "bool": True,
+    "none": None,
+    "text": 'Überbuch «déjà vu» "quoted" \\ \u2028\u2029 \U0001f4da',
+    "lazy": gettext_lazy("Hard"),
+    "date": datetime.date(2024, 5, 17),
+    "datetime": datetime.datetime(
+        2024, 5, 17, 10, 30, 15, 123456, tzinfo=datetime.timezone.utc
+    ),
+    "naive_datetime": datetime.datetime(2024, 5, 17, 10, 30, 15),
+    "time": datetime.time(10, 30, 15, 500),
+    "timedelta": datetime.timedelta(hours=1, microseconds=5),
+    "uuid": uuid.UUID(int=1),
+    "list": [1, "two", [3.5, {"four": None}]],
+    2: "non string key",
+}
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def assert_same_as_drf(self, data, accepted_media_type=None) -> None:
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_output_is_identical_to_drf_renderer(self) -> None:
+        self.assert_same_as_drf(SAMPLE_DATA)
+        self.assert_same_as_drf([SAMPLE_DATA, {"now": timezone.now()}])
+        self.assert_same_as_drf(None)
+
+    def test_indented_output_is_identical_to_drf_renderer(self) -> None:
+        self.assert_same_as_drf(SAMPLE_DATA, "application/json; indent=4")
+
+    def test_output_is_identical_without_orjson(self) -> None:
+        with mock.patch.object(renderers, "orjson", None):
+            self.assert_same_as_drf(SAMPLE_DATA)
+
+    def test_unsupported_type_raises_like_drf(self) -> None:
+        with self.assertRaises(TypeError):
+            FastJSONRenderer().render({"object": object()})
+
+
+class StreamJsonArrayTest(SimpleTestCase):
+    def test_rows_are_encoded_chunk_by_chunk(self) -> None:
+        chunks = list(stream_json_array(range(5), lambda rows: rows, chunk_size=2))
+
+        self.assertEqual(chunks, [b"[", b"0,1", b",2,3", b",4", b"]"])
+
+    def test_empty_rows_make_an_empty_array(self) -> None:
+        chunks = stream_json_array([], lambda rows: rows, chunk_size=2)
+
+        self.assertEqual(b"".join(chunks), b"[]")
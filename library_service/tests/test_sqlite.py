@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+
+class SQLitePragmasTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.wrapper = DatabaseWrapper(
+            {
+                **connection.settings_dict,
+                "NAME": os.path.join(directory.name, "db.sqlite3"),
+            },
+            alias="sqlite_pragmas",
+        )
+        self.addCleanup(self.wrapper.close)
+
+    def get_pragma(self, name: str):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_set_on_new_connections(self) -> None:
+        self.assertEqual(self.get_pragma("journal_mode"), "wal")
+        self.assertEqual(self.get_pragma("synchronous"), 1)
+        self.assertEqual(self.get_pragma("busy_timeout"), 5000)
+        self.assertEqual(self.get_pragma("cache_size"), -64 * 2**10)
+
+    @override_settings(SQLITE_PRAGMAS={"cache_size": -1024})
+    def test_pragmas_come_from_settings(self) -> None:
+        self.assertEqual(self.get_pragma("journal_mode"), "delete")
+        self.assertEqual(self.get_pragma("cache_size"), -1024)
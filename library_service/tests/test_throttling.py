@@ -0,0 +1,189 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from library_service.checks import check_throttle_cache
+from library_service.throttling import ScopedTokenBucketThrottle, parse_rate
+from user.tests.test_authentication import TOKEN_OBTAIN_ENDPOINT
+from user.tests.test_user_api import USER_REGISTRATION_ENDPOINT
+
+
+def throttle_rates(**rates) -> override_settings:
+    return override_settings(
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+    )
+
+
+class ParseRateTest(TestCase):
+    def test_parse_rate(self) -> None:
+        self.assertEqual(parse_rate("20/min"), (20, 3))
+        self.assertEqual(parse_rate("2/s"), (2, 0.5))
+        self.assertEqual(parse_rate("10/hour"), (10, 360))
+        self.assertIsNone(parse_rate(None))
+
+
+@throttle_rates(test_anon="3/min", test_user="2/min")
+class ScopedTokenBucketThrottleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1000.0
+        self.factory = APIRequestFactory()
+        self.view = SimpleNamespace(throttle_scope="test")
+
+    def make_request(self, user=None, address: str = "10.0.0.1") -> Request:
+        request = Request(self.factory.get("/", REMOTE_ADDR=address))
+        request.user = user or AnonymousUser()
+        return request
+
+    def allow(self, request: Request, view=None) -> ScopedTokenBucketThrottle:
+        throttle = ScopedTokenBucketThrottle()
+        throttle.timer = lambda: self.now
+        throttle.allowed = throttle.allow_request(request, view or self.view)
+        return throttle
+
+    def test_burst_up_to_capacity_then_wait_for_refill(self) -> None:
+        request = self.make_request()
+        for _ in range(3):
+            self.assertTrue(self.allow(request).allowed)
+
+        throttle = self.allow(request)
+        self.assertFalse(throttle.allowed)
+        self.assertAlmostEqual(throttle.wait(), 20)
+
+        self.now += 20
+        self.assertTrue(self.allow(request).allowed)
+        self.assertFalse(self.allow(request).allowed)
+
+    def test_idle_time_refills_up_to_capacity(self) -> None:
+        request = self.make_request()
+        self.allow(request)
+
+        self.now += 3600
+        allowed = [self.allow(request).allowed for _ in range(4)]
+
+        self.assertEqual(allowed, [True, True, True, False])
+
+    def test_users_and_addresses_have_own_buckets(self) -> None:
+        user = get_user_model().objects.create_user(email="user@test.com")
+        other_user = get_user_model().objects.create_user(email="other@test.com")
+
+        allowed = [self.allow(self.make_request(user)).allowed for _ in range(3)]
+        self.assertEqual(allowed, [True, True, False])
+        self.assertTrue(self.allow(self.make_request(other_user)).allowed)
+        self.assertTrue(self.allow(self.make_request()).allowed)
+        self.assertTrue(self.allow(self.make_request(address="10.0.0.2")).allowed)
+
+    def test_views_without_scope_or_rate_are_not_throttled(self) -> None:
+        request = self.make_request()
+        for view in [SimpleNamespace(), SimpleNamespace(throttle_scope="other")]:
+            for _ in range(5):
+                self.assertTrue(self.allow(request, view).allowed)
+
+        self.assertEqual(cache.get("throttle:other:10.0.0.1"), None)
+
+    def test_scope_by_viewset_action(self) -> None:
+        request = self.make_request()
+        view = SimpleNamespace(throttle_scopes={"create": "test"}, action="list")
+        for _ in range(5):
+            self.assertTrue(self.allow(request, view).allowed)
+
+        view.action = "create"
+        allowed = [self.allow(request, view).allowed for _ in range(4)]
+        self.assertEqual(allowed, [True, True, True, False])
+
+    def test_locked_bucket_is_throttled(self) -> None:
+        cache.add("throttle:test:10.0.0.1:lock", 1)
+
+        throttle = self.allow(self.make_request())
+
+        self.assertFalse(throttle.allowed)
+        self.assertAlmostEqual(throttle.wait(), 20)
+        self.assertIsNone(cache.get("throttle:test:10.0.0.1"))
+
+    @mock.patch("library_service.throttling.LOCK_ATTEMPTS", 1000)
+    def test_concurrent_requests_do_not_spend_the_same_token(self) -> None:
+        request = self.make_request()
+        get = ScopedTokenBucketThrottle().cache.get
+
+        def slow_get(*args, **kwargs):
+            # Let the other threads run between the read and the write back.
+            value = get(*args, **kwargs)
+            time.sleep(0.01)
+            return value
+
+        allowed = []
+
+        def send():
+            throttle = ScopedTokenBucketThrottle()
+            with mock.patch.object(throttle.cache, "get", slow_get):
+                allowed.append(throttle.allow_request(request, self.view))
+
+        threads = [threading.Thread(target=send) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(allowed.count(True), 3)
+
+
+class ThrottleCacheCheckTest(TestCase):
+    def caches(self, backend: str) -> override_settings:
+        return override_settings(
+            CACHES={**settings.CACHES, "throttle": {"BACKEND": backend}}
+        )
+
+    def test_process_local_throttle_cache_fails_the_deploy_check(self) -> None:
+        for backend in [
+            "django.core.cache.backends.locmem.LocMemCache",
+            "django.core.cache.backends.dummy.DummyCache",
+        ]:
+            with self.caches(backend):
+                errors = check_throttle_cache(None)
+            self.assertEqual([error.id for error in errors], ["library_service.E001"])
+
+    def test_shared_throttle_cache_passes_the_deploy_check(self) -> None:
+        with self.caches("django.core.cache.backends.redis.RedisCache"):
+            self.assertEqual(check_throttle_cache(None), [])
+
+
+class ThrottledEndpointsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    @throttle_rates(token_anon="2/min")
+    def test_token_endpoint_is_throttled(self) -> None:
+        payload = {"email": "user@test.com", "password": "wrong"}
+        for _ in range(2):
+            response = self.client.post(TOKEN_OBTAIN_ENDPOINT, payload)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(TOKEN_OBTAIN_ENDPOINT, payload)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "30")
+
+    @throttle_rates(signup_anon="1/hour")
+    def test_signup_is_throttled(self) -> None:
+        response = self.client.post(
+            USER_REGISTRATION_ENDPOINT,
+            {"email": "first@test.com", "password": "password12345"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(
+            USER_REGISTRATION_ENDPOINT,
+            {"email": "second@test.com", "password": "password12345"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
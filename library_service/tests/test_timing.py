@@ -0,0 +1,103 @@
+import json
+import re
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from book.models import Book
+from book.serializers import BookSerializer
+from book.tests.test_book_api import BOOK_LIST_URL
+from book.tests.test_book_pagination import create_books
+from library_service.timing import (
+    RequestTimings,
+    ServerTimingMiddleware,
+    current_timings,
+    timer,
+)
+
+
+def parse_server_timing(header: str) -> dict[str, str]:
+    return {
+        metric.split(";")[0]: metric for metric in re.split(r",\s*", header) if metric
+    }
+
+
+class ServerTimingMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        create_books(3)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_sampled_request_reports_timings(self) -> None:
+        with self.assertLogs("library_service.timing", "INFO") as logs:
+            response = self.client.get(BOOK_LIST_URL)
+
+        metrics = parse_server_timing(response["Server-Timing"])
+        self.assertEqual(list(metrics), ["db", "serialize", "render", "app", "total"])
+        self.assertIn('desc="1 queries"', metrics["db"])
+
+        (record,) = [json.loads(line.split(":", 2)[2]) for line in logs.output]
+        self.assertEqual(record["view"], "book:book-list")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["queries"], 1)
+        self.assertGreater(record["db_ms"], 0)
+        self.assertGreater(record["serialize_ms"], 0)
+        self.assertGreater(record["render_ms"], 0)
+        self.assertGreaterEqual(record["total_ms"], record["db_ms"])
+
+    def test_serializer_data_is_timed(self) -> None:
+        books = list(Book.objects.all())
+        for serializer in [BookSerializer(books[0]), BookSerializer(books, many=True)]:
+            with self.subTest(serializer=type(serializer).__name__):
+                timings = RequestTimings()
+                token = current_timings.set(timings)
+                try:
+                    serializer.data
+                finally:
+                    current_timings.reset(token)
+
+                self.assertGreater(timings.durations["serialize"], 0)
+                self.assertEqual(set(timings.durations), {"serialize"})
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_request_outside_sample_is_not_timed(self) -> None:
+        with self.assertNoLogs("library_service.timing"):
+            response = self.client.get(BOOK_LIST_URL)
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    async def test_async_middleware_counts_queries_in_threads(self) -> None:
+        async def get_response(request) -> HttpResponse:
+            await sync_to_async(Book.objects.count)()
+            await Book.objects.acount()
+            return HttpResponse()
+
+        middleware = ServerTimingMiddleware(get_response)
+        with self.assertLogs("library_service.timing", "INFO"):
+            response = await middleware(RequestFactory().get("/"))
+
+        self.assertIn('desc="2 queries"', response["Server-Timing"])
+
+    def test_timer_outside_request_does_nothing(self) -> None:
+        with timer("render"):
+            pass
+
+        self.assertIsNone(current_timings.get())
+
+    def test_timer_adds_up(self) -> None:
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            for _ in range(2):
+                with timer("render"):
+                    pass
+        finally:
+            current_timings.reset(token)
+
+        self.assertGreater(timings.durations["render"], 0)
+        self.assertEqual(set(timings.durations), {"render"})
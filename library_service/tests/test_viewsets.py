@@ -0,0 +1,130 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import resolve
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from book.tests.test_book_api import BOOK_LIST_URL
+from book.tests.test_book_pagination import create_books
+from book.views import BookViewSet
+from borrowing.tests.test_borrowing_api import BORROWING_LIST_URL, sample_borrowing
+from borrowing.views import BorrowingViewSet
+
+BOOK_PAYLOAD = {
+    "title": "Title",
+    "author": "Author",
+    "cover": 0,
+    "inventory": 1,
+    "daily_fee": "1.00",
+}
+
+
+class AsyncViewSetRoutesTest(TestCase):
+    def test_views_are_sync_by_default(self) -> None:
+        for url in [BOOK_LIST_URL, BORROWING_LIST_URL]:
+            self.assertFalse(asyncio.iscoroutinefunction(resolve(url).func), url)
+
+    @override_settings(ASYNC_VIEWS=True)
+    def test_routes_with_async_actions_are_async_views(self) -> None:
+        for view_class, actions in [
+            (BookViewSet, {"get": "list", "post": "create"}),
+            (BookViewSet, {"get": "retrieve", "delete": "destroy"}),
+            (BorrowingViewSet, {"get": "list", "post": "create"}),
+        ]:
+            self.assertTrue(
+                asyncio.iscoroutinefunction(view_class.as_view(actions)), actions
+            )
+        for view_class, actions in [
+            (BookViewSet, {"get": "export"}),
+            (BorrowingViewSet, {"get": "retrieve"}),
+        ]:
+            self.assertFalse(
+                asyncio.iscoroutinefunction(view_class.as_view(actions)), actions
+            )
+
+
+@override_settings(ASYNC_VIEWS=True)
+class AsyncViewSetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+        self.admin = get_user_model().objects.create_superuser(email="admin@test.com")
+        self.books = create_books(3)
+        self.borrowing = sample_borrowing(user=self.user, book=self.books[0])
+        sample_borrowing(user=self.admin, book=self.books[1])
+        with override_settings(ASYNC_VIEWS=False):
+            self.sync_book_list = BookViewSet.as_view({"get": "list"})(
+                self.factory.get(BOOK_LIST_URL, {"page_size": 2})
+            ).data
+        cache.clear()
+
+    async def get_response(self, view_class, actions, request, user=None, **kwargs):
+        if user is not None:
+            force_authenticate(request, user=user)
+        response = await view_class.as_view(actions)(request, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    async def test_book_list_matches_sync_view(self) -> None:
+        request = self.factory.get(BOOK_LIST_URL, {"page_size": 2})
+        response = await self.get_response(BookViewSet, {"get": "list"}, request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, self.sync_book_list)
+        self.assertIsNotNone(response.data["next"])
+
+        request = self.factory.get(
+            BOOK_LIST_URL, {"page_size": 2}, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        response = await self.get_response(BookViewSet, {"get": "list"}, request)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_book_retrieve(self) -> None:
+        book = self.books[0]
+        request = self.factory.get(f"{BOOK_LIST_URL}{book.id}/")
+
+        response = await self.get_response(
+            BookViewSet, {"get": "retrieve"}, request, pk=book.id
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], book.title)
+
+    async def test_book_retrieve_not_found(self) -> None:
+        for pk in [0, "abc"]:
+            request = self.factory.get(f"{BOOK_LIST_URL}{pk}/")
+            response = await self.get_response(
+                BookViewSet, {"get": "retrieve"}, request, pk=pk
+            )
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_sync_action_of_async_route(self) -> None:
+        actions = {"get": "list", "post": "create"}
+
+        request = self.factory.post(BOOK_LIST_URL, BOOK_PAYLOAD)
+        response = await self.get_response(BookViewSet, actions, request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        request = self.factory.post(BOOK_LIST_URL, BOOK_PAYLOAD)
+        response = await self.get_response(BookViewSet, actions, request, self.admin)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    async def test_borrowing_list(self) -> None:
+        request = self.factory.get(BORROWING_LIST_URL)
+        response = await self.get_response(BorrowingViewSet, {"get": "list"}, request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        request = self.factory.get(BORROWING_LIST_URL)
+        response = await self.get_response(
+            BorrowingViewSet, {"get": "list"}, request, self.user
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [borrowing["id"] for borrowing in response.data["results"]],
+            [self.borrowing.id],
+        )
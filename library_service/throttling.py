@@ -0,0 +1,112 @@
+import math
+import time
+from typing import Optional
+
+from django.core.cache import BaseCache, caches
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+# A bucket is locked while it is updated. A lock left by a crashed process
+# expires after LOCK_TIMEOUT seconds.
+LOCK_TIMEOUT = 5
+LOCK_ATTEMPTS = 5
+LOCK_RETRY_DELAY = 0.01
+
+
+def parse_rate(rate: Optional[str]) -> Optional[tuple[int, float]]:
+    """Split a rate like "20/min" into the bucket capacity and the seconds
+    it takes to refill one token."""
+    if rate is None:
+        return None
+    requests, period = rate.split("/")
+    capacity = int(requests)
+    return capacity, DURATIONS[period[0]] / capacity
+
+
+class ScopedTokenBucketThrottle(BaseThrottle):
+    """Throttle the views that have a scope with a token bucket per client.
+
+    A view sets throttle_scope, or a viewset sets throttle_scopes by action.
+    The rate of a scope is read from DEFAULT_THROTTLE_RATES under
+    "<scope>_user" for authenticated requests, counted per user, and under
+    "<scope>_anon" for anonymous ones, counted per IP address. A missing or
+    None rate doesn't throttle. With "20/min" a client can send 20 requests
+    at once and then one every 3 seconds.
+
+    The buckets are kept in the "throttle" cache, which has to be shared by
+    all processes in production, see library_service/checks.py. A bucket is
+    locked with cache.add() while it is read and written back, so concurrent
+    requests of one client can't spend the same token. A request that can't
+    get the lock after a few short retries is throttled for one interval.
+    """
+
+    timer = time.time
+    cache_format = "throttle:{scope}:{ident}"
+    lock_format = "{key}:lock"
+
+    def __init__(self) -> None:
+        self.wait_seconds = None
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches["throttle"]
+
+    def get_scope(self, view) -> Optional[str]:
+        scopes = getattr(view, "throttle_scopes", None)
+        if scopes is not None:
+            return scopes.get(getattr(view, "action", None))
+        return getattr(view, "throttle_scope", None)
+
+    def allow_request(self, request: Request, view) -> bool:
+        scope = self.get_scope(view)
+        if scope is None:
+            return True
+
+        if request.user and request.user.is_authenticated:
+            rate_name, ident = f"{scope}_user", request.user.pk
+        else:
+            rate_name, ident = f"{scope}_anon", self.get_ident(request)
+        rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(rate_name))
+        if rate is None:
+            return True
+        capacity, interval = rate
+
+        key = self.cache_format.format(scope=scope, ident=ident)
+        lock = self.lock_format.format(key=key)
+        if not self.acquire(lock):
+            self.wait_seconds = interval
+            return False
+        try:
+            return self.take_token(key, capacity, interval)
+        finally:
+            self.cache.delete(lock)
+
+    def acquire(self, lock: str) -> bool:
+        for attempt in range(LOCK_ATTEMPTS):
+            if attempt:
+                time.sleep(LOCK_RETRY_DELAY)
+            if self.cache.add(lock, 1, LOCK_TIMEOUT):
+                return True
+        return False
+
+    def take_token(self, key: str, capacity: int, interval: float) -> bool:
+        now = self.timer()
+        bucket = self.cache.get(key)
+        if bucket is None:
+            tokens = capacity
+        else:
+            tokens, updated = bucket
+            tokens = min(capacity, tokens + (now - updated) / interval)
+
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) * interval
+            return False
+        # A bucket that would be full again can expire.
+        self.cache.set(key, (tokens - 1, now), math.ceil(capacity * interval))
+        return True
+
+    def wait(self) -> Optional[float]:
+        return self.wait_seconds
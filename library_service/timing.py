@@ -0,0 +1,185 @@
+"""Sampled per-request timings, sent back in a Server-Timing header and
+logged as one JSON line per request.
+
+The middleware keeps a RequestTimings in a context variable for the
+sampled requests. Database queries, serialization and rendering add to it
+through timer() and time_query(), which do nothing outside of a sampled
+request. Context variables are copied into sync_to_async threads,
+so the async views are measured too."""
+
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# Timings reported separately, the rest of the request is "app".
+PHASES = ("db", "serialize", "render")
+
+
+@dataclass
+class RequestTimings:
+    start: float = field(default_factory=time.perf_counter)
+    durations: dict[str, float] = field(default_factory=dict)
+    queries: int = 0
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0) + seconds
+
+    def get_milliseconds(self) -> dict[str, float]:
+        total = time.perf_counter() - self.start
+        durations = {name: self.durations.get(name, 0) for name in PHASES}
+        durations["app"] = max(0, total - sum(durations.values()))
+        durations["total"] = total
+        return {name: round(seconds * 1000, 2) for name, seconds in durations.items()}
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "current_timings", default=None
+)
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self) -> serializers.ReturnList:
+        with timer("serialize"):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """Time ``serializer.data`` as the "serialize" phase, of lists too.
+    Nested serializers are timed as part of their parent."""
+
+    @property
+    def data(self) -> serializers.ReturnDict:
+        with timer("serialize"):
+            return super().data
+
+    @classmethod
+    def many_init(cls, *args: Any, **kwargs: Any) -> serializers.ListSerializer:
+        list_serializer = super().many_init(*args, **kwargs)
+        if type(list_serializer) is serializers.ListSerializer:
+            list_serializer.__class__ = TimedListSerializer
+        return list_serializer
+
+
+def time_query(
+    execute: Callable, sql: str, params: Any, many: bool, context: dict
+) -> Any:
+    """Database execute wrapper, see install_query_timer()."""
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add("db", time.perf_counter() - start)
+        timings.queries += 1
+
+
+def install_query_timer(sender, connection, **kwargs) -> None:
+    """Add time_query() to the execute wrappers of every new connection,
+    including the ones opened by sync_to_async threads, rather than
+    wrapping the connection of the request thread only."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def get_server_timing(milliseconds: dict[str, float], queries: int) -> str:
+    metrics = []
+    for name, duration in milliseconds.items():
+        metric = f"{name};dur={duration}"
+        if name == "db":
+            metric += f';desc="{queries} queries"'
+        metrics.append(metric)
+    return ", ".join(metrics)
+
+
+class ServerTimingMiddleware:
+    """Time a SERVER_TIMING_SAMPLE_RATE share of the requests. The other
+    requests only cost a random() call."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.is_sampled():
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        self.report(request, response, timings)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not self.is_sampled():
+            return await self.get_response(request)
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        self.report(request, response, timings)
+        return response
+
+    @staticmethod
+    def is_sampled() -> bool:
+        return random.random() < settings.SERVER_TIMING_SAMPLE_RATE
+
+    @staticmethod
+    def report(
+        request: HttpRequest, response: HttpResponse, timings: RequestTimings
+    ) -> None:
+        milliseconds = timings.get_milliseconds()
+        response["Server-Timing"] = get_server_timing(milliseconds, timings.queries)
+        match = request.resolver_match
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "view": match.view_name if match else None,
+                    "status": response.status_code,
+                    "queries": timings.queries,
+                    **{f"{name}_ms": value for name, value in milliseconds.items()},
+                }
+            )
+        )
@@ -0,0 +1,117 @@
+import asyncio
+import functools
+from typing import Any, Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Model, QuerySet
+from django.http import Http404, HttpRequest
+from django.shortcuts import aget_object_or_404
+from django.utils.decorators import classonlymethod
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+class AsyncViewSetMixin:
+    """Let a viewset serve actions with coroutines under ASGI.
+
+    An action can have an async variant named after it with an "a" prefix,
+    e.g. alist for list. When the ASYNC_VIEWS setting is on, which asgi.py
+    does, a route with such variants becomes an async view and runs on the
+    event loop. Authentication, permissions and the actions without a
+    variant run through sync_to_async. Otherwise the sync actions are
+    served as usual, so WSGI doesn't pay for async_to_sync on every request.
+    """
+
+    async_actions = False
+
+    @classonlymethod
+    def as_view(cls, actions: Optional[dict] = None, **initkwargs: Any):
+        if not settings.ASYNC_VIEWS or not any(
+            cls.get_async_handler(cls, action) for action in (actions or {}).values()
+        ):
+            return super().as_view(actions, **initkwargs)
+
+        view = super().as_view(actions, async_actions=True, **initkwargs)
+
+        @functools.wraps(view)
+        async def async_view(request: HttpRequest, *args: Any, **kwargs: Any):
+            return await view(request, *args, **kwargs)
+
+        return async_view
+
+    @staticmethod
+    def get_async_handler(view, action: Optional[str]) -> Optional[Callable]:
+        handler = getattr(view, f"a{action}", None) if action else None
+        return handler if asyncio.iscoroutinefunction(handler) else None
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any):
+        if self.async_actions:
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> Response:
+        """Mirror APIView.dispatch, awaiting the async variant of the action."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            async_handler = self.get_async_handler(self, self.action)
+            if async_handler is not None:
+                response = await async_handler(request, *args, **kwargs)
+            else:
+                if request.method.lower() in self.http_method_names:
+                    handler = getattr(
+                        self, request.method.lower(), self.http_method_not_allowed
+                    )
+                else:
+                    handler = self.http_method_not_allowed
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def afilter_queryset(self, queryset: QuerySet) -> QuerySet:
+        """Filter backends may run queries, e.g. the search fallback,
+        so they run in a thread."""
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def apaginate_queryset(self, queryset: QuerySet) -> Optional[list]:
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+    async def aget_object(self) -> Model:
+        """Mirror GenericAPIView.get_object with the async ORM."""
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await aget_object_or_404(queryset, **filter_kwargs)
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+    async def alist_values(self, request: Request, serializer) -> Response:
+        """List rows of a values serializer, like BookValuesSerializer,
+        with the async ORM."""
+        queryset = await self.afilter_queryset(self.get_queryset())
+        rows = serializer.get_rows(queryset)
+        page = await self.apaginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize([row async for row in rows]))
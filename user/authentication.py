@@ -0,0 +1,79 @@
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from user.models import ClaimsUser
+
+CLAIMS = ("email", "is_staff", "auth_hash")
+TOKEN_STATE_KEY = "user:{user_id}:token-state"
+
+
+def get_claims(user) -> dict:
+    """Claims embedded in the tokens issued for the user. auth_hash changes
+    with the password, like the hash Django keeps in the session."""
+    return {
+        "email": user.email,
+        "is_staff": user.is_staff,
+        "auth_hash": user.get_session_auth_hash(),
+    }
+
+
+def get_token_state(user_id: int) -> Optional[dict]:
+    """Return the current claims of an active user, or None for an inactive
+    or deleted one, cached for AUTH_TOKEN_STATE_TIMEOUT seconds."""
+    key = TOKEN_STATE_KEY.format(user_id=user_id)
+    state = cache.get(key)
+    if state is None:
+        user = (
+            get_user_model()
+            ._default_manager.filter(pk=user_id, is_active=True)
+            .only("email", "is_staff", "password")
+            .first()
+        )
+        state = get_claims(user) if user is not None else {}
+        cache.set(key, state, settings.AUTH_TOKEN_STATE_TIMEOUT)
+    return state or None
+
+
+def invalidate_token_state(user_id: int) -> None:
+    key = TOKEN_STATE_KEY.format(user_id=user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Authenticate from the claims of the access token instead of loading
+    the user on every request.
+
+    request.user is a ClaimsUser, which queries the database only when a
+    field other than id, email and is_staff is accessed. The claims are
+    compared to the current ones of the user from get_token_state, so
+    changing the password, email or is_staff, or deactivating the user,
+    revokes the tokens issued before. Tokens issued without the claims load
+    the user as before."""
+
+    def get_user(self, validated_token: Token):
+        if any(claim not in validated_token for claim in CLAIMS):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        state = get_token_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if any(state[claim] != validated_token[claim] for claim in CLAIMS):
+            raise AuthenticationFailed(_("Token is revoked"), code="token_revoked")
+
+        return ClaimsUser.from_claims(
+            user_id, validated_token["email"], validated_token["is_staff"]
+        )
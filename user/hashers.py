@@ -0,0 +1,127 @@
+"""Password hashers that take their cost from settings and hash on a
+bounded pool of threads."""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many passwords are being checked, try again later."
+    default_code = "password_hashing_busy"
+
+
+class HashingPool:
+    """Run password hashing on at most `workers` threads.
+
+    Callers wait for their result, so a burst of logins queues for the pool
+    instead of hashing on every request thread at once and the other
+    requests keep getting CPU time. Once `workers + backlog` jobs are in
+    flight, new ones fail with PasswordHashingBusy."""
+
+    def __init__(self, workers: int, backlog: int) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hashing"
+        )
+        self.slots = threading.BoundedSemaphore(workers + backlog)
+        self.local = threading.local()
+
+    def run(self, function: Callable, *args: Any, **kwargs: Any) -> Any:
+        # Hashers call each other, e.g. PBKDF2 verify calls encode.
+        if getattr(self.local, "in_worker", False):
+            return function(*args, **kwargs)
+        if not self.slots.acquire(blocking=False):
+            raise PasswordHashingBusy()
+        try:
+            return self.executor.submit(self.call, function, *args, **kwargs).result()
+        finally:
+            self.slots.release()
+
+    def call(self, function: Callable, *args: Any, **kwargs: Any) -> Any:
+        self.local.in_worker = True
+        return function(*args, **kwargs)
+
+
+_pool: Optional[HashingPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[HashingPool]:
+    """Return the pool, or None to hash on the calling thread when
+    PASSWORD_HASHING_WORKERS is None."""
+    global _pool
+    if settings.PASSWORD_HASHING_WORKERS is None:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    settings.PASSWORD_HASHING_WORKERS,
+                    settings.PASSWORD_HASHING_BACKLOG,
+                )
+    return _pool
+
+
+def reset_pool() -> None:
+    """Start a new pool on next use. Jobs in flight finish on the old one."""
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+# The threads of the pool don't survive a fork.
+os.register_at_fork(after_in_child=reset_pool)
+
+
+@receiver(setting_changed)
+def reset_pool_on_setting_changed(setting: str, **kwargs) -> None:
+    if setting.startswith("PASSWORD_HASHING_"):
+        reset_pool()
+
+
+def run_hashing(function: Callable, *args: Any, **kwargs: Any) -> Any:
+    pool = get_pool()
+    if pool is None:
+        return function(*args, **kwargs)
+    return pool.run(function, *args, **kwargs)
+
+
+class PooledHasherMixin:
+    def encode(self, password: str, salt: str, *args: Any, **kwargs: Any) -> str:
+        return run_hashing(super().encode, password, salt, *args, **kwargs)
+
+    def verify(self, password: str, encoded: str) -> bool:
+        return run_hashing(super().verify, password, encoded)
+
+    def harden_runtime(self, password: str, encoded: str) -> None:
+        run_hashing(super().harden_runtime, password, encoded)
+
+
+class ScryptPasswordHasher(PooledHasherMixin, hashers.ScryptPasswordHasher):
+    """Scrypt with the work factor from PASSWORD_SCRYPT_WORK_FACTOR. Hashes
+    with another work factor are rehashed on the next login."""
+
+    @property
+    def work_factor(self) -> int:
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+
+class Argon2PasswordHasher(PooledHasherMixin, hashers.Argon2PasswordHasher):
+    pass
+
+
+class PBKDF2PasswordHasher(PooledHasherMixin, hashers.PBKDF2PasswordHasher):
+    pass
+
+
+class PBKDF2SHA1PasswordHasher(PooledHasherMixin, hashers.PBKDF2SHA1PasswordHasher):
+    pass
@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import UserManager as DjangoUserManager
+from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
 
 
 class UserManager(DjangoUserManager):
@@ -31,3 +35,35 @@ class UserManager(DjangoUserManager):
             raise ValueError("Superuser must have is_superuser=True.")
 
         return self._create_user(email, password, **extra_fields)
+
+    def add_borrowings(self, user_id: int, count: int = 1) -> bool:
+        """Count new borrowings of the user in a single conditional UPDATE.
+        Returns False if the user would have more active borrowings than
+        BORROWING_MAX_ACTIVE_PER_USER, the caller is expected to roll back
+        the transaction in that case."""
+        users = self.filter(pk=user_id)
+        limit = settings.BORROWING_MAX_ACTIVE_PER_USER
+        if limit is not None:
+            users = users.filter(active_borrowings_count__lte=limit - count)
+        return bool(
+            users.update(
+                active_borrowings_count=F("active_borrowings_count") + count,
+                total_borrowings_count=F("total_borrowings_count") + count,
+            )
+        )
+
+    def remove_active_borrowings(self, amounts: dict[int, int]) -> None:
+        """Count returned borrowings of several users in a single UPDATE.
+        Counters that drifted below the returned amount stop at zero."""
+        amount = Case(
+            *[
+                When(pk=user_id, then=Value(amount))
+                for user_id, amount in amounts.items()
+            ],
+            output_field=models.PositiveIntegerField(),
+        )
+        self.filter(pk__in=amounts).update(
+            active_borrowings_count=Greatest(
+                F("active_borrowings_count") - amount, Value(0)
+            )
+        )
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:22
+
+import user.managers
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClaimsUser",
+            fields=[],
+            options={
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("user.user",),
+            managers=[
+                ("objects", user.managers.UserManager()),
+            ],
+        ),
+    ]
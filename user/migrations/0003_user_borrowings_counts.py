@@ -0,0 +1,47 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:58
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_borrowings(apps, schema_editor) -> None:
+    User = apps.get_model("user", "User")
+    Borrowing = apps.get_model("borrowing", "Borrowing")
+
+    def count(**filters) -> Coalesce:
+        borrowings = (
+            Borrowing.objects.filter(user=OuterRef("pk"), **filters)
+            .order_by()
+            .values("user")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return Coalesce(Subquery(borrowings), 0)
+
+    User.objects.using(schema_editor.connection.alias).update(
+        active_borrowings_count=count(actual_return_date__isnull=True),
+        total_borrowings_count=count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0002_claimsuser"),
+        ("borrowing", "0006_overduenotificationrun"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="active_borrowings_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="total_borrowings_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_borrowings, migrations.RunPython.noop),
+    ]
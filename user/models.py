@@ -9,6 +9,8 @@ class User(AbstractUser):
 
     username = None
     email = models.EmailField(_("email address"), unique=True)
+    active_borrowings_count = models.PositiveIntegerField(default=0)
+    total_borrowings_count = models.PositiveIntegerField(default=0)
 
     objects = UserManager()
 
@@ -20,3 +22,35 @@ class User(AbstractUser):
 
     def __str__(self) -> str:
         return f"ID:{self.pk} {self.email}"
+
+
+class ClaimsUser(User):
+    """User built from the claims of an access token.
+
+    Only id, email and is_staff come from the token and the user is known to
+    be active. The other fields are deferred and loaded together on the
+    first access to any of them."""
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id: int, email: str, is_staff: bool) -> "ClaimsUser":
+        values = {
+            "id": user_id,
+            "email": email,
+            "is_staff": is_staff,
+            "is_active": True,
+        }
+        field_names = [
+            field.attname
+            for field in cls._meta.concrete_fields
+            if field.attname in values
+        ]
+        return cls.from_db(None, field_names, [values[name] for name in field_names])
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs) -> None:
+        deferred_fields = self.get_deferred_fields()
+        if fields is not None and deferred_fields.issuperset(fields):
+            fields = deferred_fields
+        super().refresh_from_db(using, fields, **kwargs)
@@ -1,13 +1,26 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import Token
 
+from library_service.timing import TimedSerializerMixin
+from user.authentication import get_claims
 from user.models import User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
-        fields = ["email", "password", "first_name", "last_name"]
+        fields = [
+            "email",
+            "password",
+            "first_name",
+            "last_name",
+            "active_borrowings_count",
+            "total_borrowings_count",
+        ]
+        read_only_fields = ["active_borrowings_count", "total_borrowings_count"]
 
         extra_kwargs = {
             "password": {
@@ -17,21 +30,35 @@ class UserSerializer(serializers.ModelSerializer):
         }
 
     def create(self, validated_data: dict) -> User:
+        """Hash the password before the insert, so the user is saved once."""
         password = validated_data.pop("password", None)
-
-        user = super().create(validated_data)
         if password is not None:
-            user.set_password(password)
-            user.save()
-        return user
+            validated_data["password"] = make_password(password)
+
+        return super().create(validated_data)
 
     def update(self, instance, validated_data: dict) -> User:
+        """Save only the fields given, the borrowing counters of the loaded
+        instance may be out of date by then."""
         password = validated_data.pop("password", None)
+        update_fields = list(validated_data)
 
-        user = super().update(instance, validated_data)
-
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
         if password is not None:
-            user.set_password(password)
-            user.save()
+            instance.set_password(password)
+            update_fields.append("password")
+
+        instance.save(update_fields=update_fields)
+        return instance
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Embed the claims read by ClaimsJWTAuthentication in the tokens."""
 
-        return user
+    @classmethod
+    def get_token(cls, user: User) -> Token:
+        token = super().get_token(user)
+        for claim, value in get_claims(user).items():
+            token[claim] = value
+        return token
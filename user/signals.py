@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import invalidate_token_state
+from user.models import ClaimsUser, User
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=ClaimsUser)
+def invalidate_user_token_state(sender, instance: User, **kwargs) -> None:
+    invalidate_token_state(instance.pk)
@@ -0,0 +1,166 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from book.models import Book
+from borrowing.models import Borrowing
+from borrowing.tests.test_borrowing_api import BORROWING_LIST_URL
+from user.authentication import ClaimsJWTAuthentication
+from user.models import ClaimsUser
+from user.serializers import ClaimsTokenObtainPairSerializer
+from user.tests.test_user_api import USER_MANAGE_ENDPOINT
+
+TOKEN_OBTAIN_ENDPOINT = reverse("user:token_obtain_pair")
+TOKEN_REFRESH_ENDPOINT = reverse("user:token_refresh")
+
+
+def get_access_token(user) -> str:
+    return str(ClaimsTokenObtainPairSerializer.get_token(user).access_token)
+
+
+class ClaimsJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com",
+            password="password1234",
+            first_name="First",
+            last_name="Last",
+        )
+        self.authentication = ClaimsJWTAuthentication()
+        self.factory = APIRequestFactory()
+
+    def authenticate(self, token: str):
+        request = self.factory.get("/", HTTP_AUTHORIZE=f"Bearer {token}")
+        user, _ = self.authentication.authenticate(request)
+        return user
+
+    def test_token_obtain_embeds_claims(self) -> None:
+        response = self.client.post(
+            TOKEN_OBTAIN_ENDPOINT,
+            {"email": "user@test.com", "password": "password1234"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for name in ("access", "refresh"):
+            token = AccessToken(response.data[name], verify=False)
+            self.assertEqual(token["email"], self.user.email)
+            self.assertFalse(token["is_staff"])
+            self.assertEqual(token["auth_hash"], self.user.get_session_auth_hash())
+
+    def test_token_refresh_keeps_claims(self) -> None:
+        refresh = ClaimsTokenObtainPairSerializer.get_token(self.user)
+
+        response = self.client.post(TOKEN_REFRESH_ENDPOINT, {"refresh": str(refresh)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data["access"])["email"], self.user.email)
+
+    def test_user_is_not_loaded_once_claims_are_cached(self) -> None:
+        token = get_access_token(self.user)
+        with self.assertNumQueries(1):
+            self.authenticate(token)
+
+        with self.assertNumQueries(0):
+            user = self.authenticate(token)
+            self.assertIsInstance(user, ClaimsUser)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(user.email, self.user.email)
+            self.assertFalse(user.is_staff)
+            self.assertTrue(user.is_active)
+            self.assertTrue(user.is_authenticated)
+
+    def test_other_fields_are_loaded_together(self) -> None:
+        user = self.authenticate(get_access_token(self.user))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.first_name, "First")
+            self.assertEqual(user.last_name, "Last")
+            self.assertTrue(user.check_password("password1234"))
+
+    def test_token_without_claims_loads_user(self) -> None:
+        user = self.authenticate(str(AccessToken.for_user(self.user)))
+
+        self.assertIs(type(user), get_user_model())
+        self.assertEqual(user, self.user)
+
+    def test_password_change_revokes_token(self) -> None:
+        token = get_access_token(self.user)
+        self.authenticate(token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password("new-password1234")
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+        self.authenticate(get_access_token(self.user))
+
+    def test_is_staff_change_revokes_token(self) -> None:
+        token = get_access_token(self.user)
+        self.authenticate(token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_staff = True
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+        self.assertTrue(self.authenticate(get_access_token(self.user)).is_staff)
+
+    def test_deactivated_user_is_rejected(self) -> None:
+        token = get_access_token(self.user)
+        self.authenticate(token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_deleted_user_is_rejected(self) -> None:
+        token = get_access_token(self.user)
+        self.authenticate(token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_claims_user_manages_own_profile(self) -> None:
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {get_access_token(self.user)}")
+
+        response = self.client.patch(USER_MANAGE_ENDPOINT, {"first_name": "New"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["last_name"], "Last")
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "New")
+        self.assertTrue(self.user.check_password("password1234"))
+
+    def test_claims_user_borrows_book(self) -> None:
+        book = Book.objects.create(
+            title="Book", author="Author", cover=0, inventory=1, daily_fee=1
+        )
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {get_access_token(self.user)}")
+
+        response = self.client.post(
+            BORROWING_LIST_URL,
+            {
+                "book": book.id,
+                "expected_return_date": datetime.date.today()
+                + datetime.timedelta(days=7),
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Borrowing.objects.get().user, self.user)
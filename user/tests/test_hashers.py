@@ -0,0 +1,117 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hashers, identify_hasher, make_password
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.hashers import HashingPool, PasswordHashingBusy, run_hashing
+from user.serializers import UserSerializer
+from user.tests.test_authentication import TOKEN_OBTAIN_ENDPOINT
+
+PASSWORD = "password1234"
+
+
+@override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2**10)
+class PasswordHasherTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def login(self, email: str) -> None:
+        response = self.client.post(
+            TOKEN_OBTAIN_ENDPOINT, {"email": email, "password": PASSWORD}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_new_passwords_use_scrypt_with_configured_work_factor(self) -> None:
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password=PASSWORD
+        )
+
+        self.assertEqual(identify_hasher(user.password).algorithm, "scrypt")
+        self.assertIn("$1024$", user.password)
+        self.assertTrue(user.check_password(PASSWORD))
+
+    def test_hashers_have_their_libraries_installed(self) -> None:
+        for hasher in get_hashers():
+            if hasher.library:
+                hasher._load_library()
+
+    def test_login_rehashes_pbkdf2_password(self) -> None:
+        user = get_user_model().objects.create(
+            email="user@test.com",
+            password=make_password(PASSWORD, hasher="pbkdf2_sha256"),
+        )
+
+        self.login(user.email)
+
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, "scrypt")
+        self.assertTrue(user.check_password(PASSWORD))
+
+    def test_login_rehashes_password_with_old_work_factor(self) -> None:
+        with self.settings(PASSWORD_SCRYPT_WORK_FACTOR=2**11):
+            user = get_user_model().objects.create_user(
+                email="user@test.com", password=PASSWORD
+            )
+
+        self.login(user.email)
+
+        user.refresh_from_db()
+        self.assertIn("$1024$", user.password)
+
+    def test_serializer_creates_user_with_one_write(self) -> None:
+        serializer = UserSerializer(
+            data={"email": "user@test.com", "password": PASSWORD}
+        )
+        self.assertTrue(serializer.is_valid())
+
+        with self.assertNumQueries(1):
+            user = serializer.save()
+
+        self.assertTrue(user.check_password(PASSWORD))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=None)
+    def test_hashing_without_pool_runs_on_calling_thread(self) -> None:
+        self.assertEqual(
+            run_hashing(threading.current_thread), threading.current_thread()
+        )
+
+
+class HashingPoolTest(TestCase):
+    def test_runs_on_worker_thread(self) -> None:
+        pool = HashingPool(workers=1, backlog=0)
+
+        thread = pool.run(threading.current_thread)
+
+        self.assertTrue(thread.name.startswith("password-hashing"))
+
+    def test_nested_runs_stay_on_worker(self) -> None:
+        pool = HashingPool(workers=1, backlog=0)
+
+        thread = pool.run(pool.run, threading.current_thread)
+
+        self.assertTrue(thread.name.startswith("password-hashing"))
+
+    def test_full_pool_rejects_jobs(self) -> None:
+        pool = HashingPool(workers=1, backlog=0)
+        started = threading.Event()
+        release = threading.Event()
+
+        def block() -> None:
+            started.set()
+            release.wait()
+
+        thread = threading.Thread(target=pool.run, args=(block,))
+        thread.start()
+        started.wait()
+
+        try:
+            with self.assertRaises(PasswordHashingBusy):
+                pool.run(block)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(pool.run(lambda: 1), 1)
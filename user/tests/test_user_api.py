@@ -86,6 +86,19 @@ class AuthenticatedUserManageApiTest(APITestCase):
         self.assertEqual(user.email, payload["email"])
         self.assertTrue(user.check_password(payload["password"]))
 
+    def test_update_keeps_borrowing_counters_changed_meanwhile(self) -> None:
+        get_user_model().objects.add_borrowings(self.user.pk, 2)
+
+        response = self.client.put(
+            USER_MANAGE_ENDPOINT,
+            data={"email": "test@test.com", "password": "new_password1234"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.active_borrowings_count, 2)
+        self.assertEqual(self.user.total_borrowings_count, 2)
+
     def test_patch_user(self) -> None:
         user = self.user
         payload = {
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from library_service.testing import QueryBudgetTestMixin
+from user.tests.test_user_api import USER_MANAGE_ENDPOINT, USER_REGISTRATION_ENDPOINT
+from user.views import UserCreateAPIView, UserManageAPIView
+
+
+class UserQueryBudgetTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@test.com")
+
+    def test_budgets_are_declared_for_every_action(self) -> None:
+        self.assertQueryBudgetsDeclared(UserCreateAPIView)
+        self.assertQueryBudgetsDeclared(UserManageAPIView)
+
+    def test_create(self) -> None:
+        with self.assertQueryBudget(UserCreateAPIView, "post"):
+            response = self.client.post(
+                USER_REGISTRATION_ENDPOINT,
+                {"email": "new@test.com", "password": "password12345"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_manage(self) -> None:
+        for method, payload in [
+            ("get", None),
+            ("put", {"email": "user@test.com", "password": "password12345"}),
+            ("patch", {"first_name": "First"}),
+        ]:
+            # The new password of the PUT revokes the tokens issued before.
+            self.user.refresh_from_db()
+            self.authenticate(self.user)
+            with self.assertQueryBudget(UserManageAPIView, method):
+                response = getattr(self.client, method)(USER_MANAGE_ENDPOINT, payload)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -1,7 +1,7 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
 
-from user.views import UserCreateAPIView, UserManageAPIView
+from user.views import TokenObtainPairView, UserCreateAPIView, UserManageAPIView
 
 urlpatterns = [
     path("", UserCreateAPIView.as_view(), name="user_create"),
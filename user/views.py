@@ -5,6 +5,7 @@ from rest_framework import generics
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework_simplejwt import views as jwt_views
 
 from user.models import User
 from user.serializers import UserSerializer
@@ -14,6 +15,8 @@ class UserCreateAPIView(generics.CreateAPIView):
     queryset = get_user_model().objects.all()
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
+    throttle_scope = "signup"
+    query_budgets = {"post": 2}
 
     def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """Create a new user."""
@@ -23,6 +26,7 @@ class UserCreateAPIView(generics.CreateAPIView):
 class UserManageAPIView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {"get": 1, "put": 3, "patch": 2}
 
     def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """Return the authenticated user detail"""
@@ -38,3 +42,7 @@ class UserManageAPIView(generics.RetrieveUpdateAPIView):
 
     def get_object(self) -> User:
         return self.request.user
+
+
+class TokenObtainPairView(jwt_views.TokenObtainPairView):
+    throttle_scope = "token"